@@ -22,6 +22,7 @@ from django.contrib import admin
 from django.contrib.auth.admin import GroupAdmin as BaseGroupAdmin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import Group
+from django.db.models import F
 from unfold.admin import ModelAdmin
 from unfold.forms import AdminPasswordChangeForm, UserChangeForm, UserCreationForm
 
@@ -36,6 +37,8 @@ from .models import (
     User,
     Visit,
 )
+from .outbox import record_event
+from .serializers import PatientSerializer
 
 admin.site.unregister(Group)
 
@@ -104,6 +107,8 @@ class PatientAdmin(ModelAdmin):
     - Patient status tracking
     - Creation time monitoring
     - Hierarchical date-based navigation
+    - Version advanced on every change, invalidating API clients' If-Match
+    - Outbox event per saved patient
     """
 
     list_display = ["id", "first", "last", "date_of_birth", "status", "created_at"]
@@ -112,6 +117,23 @@ class PatientAdmin(ModelAdmin):
     ordering = ["-created_at"]
     date_hierarchy = "created_at"
 
+    def save_model(self, request, obj, form, change):
+        if change:
+            obj.version = F("version") + 1
+        super().save_model(request, obj, form, change)
+        if change:
+            obj.refresh_from_db(fields=["version"])
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        # Published once relations are saved, in the admin's transaction
+        record_event(
+            "patient",
+            form.instance.pk,
+            "updated" if change else "created",
+            PatientSerializer(form.instance).data,
+        )
+
 
 @admin.register(CustomFieldDefinition)
 class CustomFieldDefinitionAdmin(ModelAdmin):
@@ -0,0 +1,448 @@
+"""
+This module provides sleep study analytics: cohort statistics and treatment
+efficacy.
+
+A cohort is the set of patients matching some filters. The metrics of its
+sleep studies are read in one columnar query (values_list) into a NumPy
+array, and every statistic is computed on whole columns at once, so even a
+cohort of hundreds of thousands of studies is summarized in well under a
+second.
+
+Treatment efficacy compares, for each patient on a treatment type, the AHI
+of the last study before the treatment started with that of the first study
+on or after its start. Studies and treatments are joined for all patients at
+once: studies sorted by (patient, date) are searched with searchsorted for
+every treatment start. Its result is stored on its own, not per patient list
+version, and recomputed once older than TREATMENT_EFFICACY_MAX_AGE, so
+editing a patient does not make the next request pay for it.
+
+Features:
+- Cohorts by patient status, age band, insurance provider and treatment type
+- Mean, standard deviation, extremes and percentiles of each metric
+- Histograms over fixed bins, comparable across cohorts
+- AHI severity buckets (normal, mild, moderate, severe)
+- AHI before and after the start of each treatment type, and its change
+- Cohort results cached until any patient or record changes
+- Treatment efficacy stored until it is outdated, recomputed by one request
+  at a time while the others are served the previous result (or wait for
+  the first)
+
+Configuration (settings):
+- ANALYTICS_CACHE_TIMEOUT: Seconds cached cohort results are kept
+- TREATMENT_EFFICACY_MAX_AGE: Seconds after which treatment efficacy is
+  recomputed
+
+Notes:
+- Studies belong to the patient they are linked to first (see
+  SleepStudy.patient); studies linked to no patient are in no cohort
+- Ages are on the current date, in the server's time zone
+- Efficacy uses each patient's first treatment of a type; a follow-up study
+  after the treatment ended does not count
+- NumPy is imported by the functions using it, so workers load it with the
+  first analytics request rather than with the URLconf
+"""
+
+import json
+import logging
+import math
+import time
+from datetime import timedelta
+from itertools import chain
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+
+from .cache import cached_value, get_patient_list_version
+from .exceptions import ResultPending
+from .models import Insurance, SleepStudy, Treatment
+
+logger = logging.getLogger(__name__)
+
+# Cache key of the stored treatment efficacy, and of the lock of its computation
+EFFICACY_CACHE_KEY = "analytics:efficacy"
+EFFICACY_LOCK_KEY = "analytics:efficacy:lock"
+
+# Seconds after which a computation of treatment efficacy is presumed dead
+EFFICACY_LOCK_TIMEOUT = 300
+
+# Seconds a request waits for the first efficacy result computed by another,
+# checking every EFFICACY_POLL_INTERVAL seconds, and the Retry-After after
+EFFICACY_WAIT_TIMEOUT = 5
+EFFICACY_POLL_INTERVAL = 0.1
+EFFICACY_RETRY_AFTER = 5
+
+# Sleep study metrics, in the column order of the loaded arrays
+METRICS = ("ahi", "sleep_efficiency", "rem_latency")
+
+PERCENTILES = [5, 25, 50, 75, 95]
+
+# Histogram bin edges of each metric; the last bin includes its upper edge
+HISTOGRAM_EDGES = {
+    "ahi": [0, 5, 10, 15, 20, 25, 30, 40, 50, 60, math.inf],
+    "sleep_efficiency": [0, 10, 20, 30, 40, 50, 60, 70, 80, 90, 100],
+    "rem_latency": [0, 15, 30, 45, 60, 90, 120, 180, math.inf],
+}
+
+# AHI severity buckets: below 5, 5 to below 15, 15 to below 30, 30 and above
+SEVERITY_LABELS = ["normal", "mild", "moderate", "severe"]
+SEVERITY_THRESHOLDS = [5, 15, 30]
+
+# Columns of studies loaded for efficacy analyses
+STUDY_DTYPE = [("patient", "int64"), ("date", "datetime64[D]"), ("ahi", "float64")]
+
+# Age bands of cohorts: {band: (min age, max age or None)}, ages inclusive
+AGE_BANDS = {
+    "0-17": (0, 17),
+    "18-39": (18, 39),
+    "40-64": (40, 64),
+    "65+": (65, None),
+}
+
+
+def _years_before(day, years):
+    """Returns the date the given number of years before day (Feb 29 -> 28)."""
+    try:
+        return day.replace(year=day.year - years)
+    except ValueError:
+        return day.replace(year=day.year - years, day=28)
+
+
+def _age_band_condition(band, today):
+    """Returns the condition on date_of_birth of the patients in an age band."""
+    min_age, max_age = AGE_BANDS[band]
+    condition = Q(patient__date_of_birth__lte=_years_before(today, min_age))
+    if max_age is not None:
+        # Born after the day one turns max_age + 1
+        condition &= Q(patient__date_of_birth__gt=_years_before(today, max_age + 1))
+    return condition
+
+
+def get_cohort_studies(cohort, today=None):
+    """
+    Returns the sleep studies of a cohort.
+
+    cohort maps filters to lists of values, any of which matches:
+    - status: Patient statuses
+    - age: Age bands (see AGE_BANDS)
+    - insurance_provider: Providers of any of the patient's insurance
+    - treatment_type: Types of any of the patient's treatments, past or present
+    """
+    today = today or timezone.localdate()
+    studies = SleepStudy.objects.filter(patient__isnull=False)
+    if cohort.get("status"):
+        studies = studies.filter(patient__status__in=cohort["status"])
+    if cohort.get("age"):
+        condition = Q()
+        for band in cohort["age"]:
+            condition |= _age_band_condition(band, today)
+        studies = studies.filter(condition)
+    if cohort.get("insurance_provider"):
+        studies = studies.filter(
+            patient_id__in=Insurance.objects.filter(
+                provider__in=cohort["insurance_provider"]
+            ).values("patient_id")
+        )
+    if cohort.get("treatment_type"):
+        studies = studies.filter(
+            patient_id__in=Treatment.objects.filter(
+                type__in=cohort["treatment_type"]
+            ).values("patient_id")
+        )
+    return studies
+
+
+def load_metrics(studies):
+    """
+    Returns the metrics of sleep studies as an array, one row per study.
+
+    The columns are METRICS, followed by the study's patient ID.
+    """
+    import numpy as np
+
+    rows = studies.values_list(*METRICS, "patient_id")
+    values = np.fromiter(
+        chain.from_iterable(rows.iterator(chunk_size=10000)), dtype=np.float64
+    )
+    return values.reshape(-1, len(METRICS) + 1)
+
+
+def _histogram(column, edges):
+    import numpy as np
+
+    counts, _ = np.histogram(column, bins=edges)
+    return [
+        {
+            "from": edges[index],
+            "to": None if math.isinf(edges[index + 1]) else edges[index + 1],
+            "count": count,
+        }
+        for index, count in enumerate(counts.tolist())
+    ]
+
+
+def _distribution(values):
+    """Returns the mean, std and percentiles of an array, or None if empty."""
+    import numpy as np
+
+    if not len(values):
+        return None
+    return {
+        "mean": values.mean().item(),
+        "std": values.std().item(),
+        "percentiles": dict(
+            zip(
+                (f"p{percentile}" for percentile in PERCENTILES),
+                np.percentile(values, PERCENTILES).tolist(),
+                strict=True,
+            )
+        ),
+    }
+
+
+def compute_statistics(values):
+    """Returns the statistics of an array of study metrics (see load_metrics())."""
+    import numpy as np
+
+    study_count = len(values)
+    statistics = {
+        "studies": study_count,
+        "patients": len(np.unique(values[:, -1])),
+        "metrics": dict.fromkeys(METRICS),
+        "severity": dict.fromkeys(SEVERITY_LABELS, 0),
+    }
+    if not study_count:
+        return statistics
+
+    metrics = values[:, : len(METRICS)]
+    means = metrics.mean(axis=0).tolist()
+    deviations = metrics.std(axis=0).tolist()
+    minimums = metrics.min(axis=0).tolist()
+    maximums = metrics.max(axis=0).tolist()
+    # One row per percentile, one column per metric
+    percentiles = np.percentile(metrics, PERCENTILES, axis=0).T.tolist()
+    for index, metric in enumerate(METRICS):
+        statistics["metrics"][metric] = {
+            "mean": means[index],
+            "std": deviations[index],
+            "min": minimums[index],
+            "max": maximums[index],
+            "percentiles": {
+                f"p{percentile}": value
+                for percentile, value in zip(
+                    PERCENTILES, percentiles[index], strict=True
+                )
+            },
+            "histogram": _histogram(metrics[:, index], HISTOGRAM_EDGES[metric]),
+        }
+
+    buckets = np.digitize(metrics[:, METRICS.index("ahi")], SEVERITY_THRESHOLDS)
+    counts = np.bincount(buckets, minlength=len(SEVERITY_LABELS)).tolist()
+    statistics["severity"] = dict(zip(SEVERITY_LABELS, counts, strict=True))
+    return statistics
+
+
+def get_cohort_statistics(cohort):
+    """
+    Returns the sleep study statistics of a cohort (see get_cohort_studies()).
+
+    Results are cached under the cohort's canonical key, until a patient or
+    record changes (see api.cache) or ANALYTICS_CACHE_TIMEOUT passes.
+    """
+    today = timezone.localdate()
+    # Equal cohorts share one key, whatever the order of their values; ages
+    # depend on the date
+    key = json.dumps(
+        {
+            "cohort": {name: sorted(set(values)) for name, values in cohort.items()},
+            "date": today.isoformat(),
+        },
+        sort_keys=True,
+    )
+    version = get_patient_list_version()
+
+    def compute():
+        values = load_metrics(get_cohort_studies(cohort, today))
+        logger.info(f"Computing statistics of {len(values)} studies for {key}")
+        return compute_statistics(values)
+
+    return cached_value(
+        "analytics:studies", version, key, compute, settings.ANALYTICS_CACHE_TIMEOUT
+    )
+
+
+def load_studies():
+    """Returns the studies linked to patients, sorted by patient and date."""
+    import numpy as np
+
+    rows = SleepStudy.objects.filter(patient__isnull=False).values_list(
+        "patient_id", "date", "ahi"
+    )
+    studies = np.fromiter(rows.iterator(chunk_size=10000), dtype=STUDY_DTYPE)
+    return studies[np.lexsort((studies["date"], studies["patient"]))]
+
+
+def pair_studies(studies, patients, days):
+    """
+    Returns the studies around the given days of the given patients.
+
+    studies are sorted as by load_studies(). For each (patient, day), returns
+    the index of the patient's last study before day and of their first
+    study on or after day, or -1 where there is none.
+    """
+    import numpy as np
+
+    if not len(studies) or not len(days):
+        missing = np.full(len(days), -1)
+        return missing, missing
+
+    # One sortable key per (patient, day): patient-major, then day
+    study_days = studies["date"].astype(np.int64)
+    days = days.astype(np.int64)
+    first_day = min(study_days.min(), days.min())
+    span = max(study_days.max(), days.max()) - first_day + 1
+    study_keys = studies["patient"] * span + (study_days - first_day)
+    keys = patients * span + (days - first_day)
+
+    after = np.searchsorted(study_keys, keys, side="left")
+    before = after - 1
+    last = len(studies) - 1
+    has_before = (before >= 0) & (studies["patient"][before.clip(0)] == patients)
+    has_after = (after <= last) & (studies["patient"][after.clip(0, last)] == patients)
+    return np.where(has_before, before, -1), np.where(has_after, after, -1)
+
+
+def compute_treatment_efficacy():
+    """
+    Returns the AHI before and after treatment starts, by treatment type.
+
+    For each type: the number of patients on it, and of those with a study
+    before and after the start (paired); the AHI distributions before and
+    after, and of the change; how many improved, and how many went from an
+    AHI of 5 or more to below 5 (resolved); and the days from the start to
+    the follow-up study.
+    """
+    import numpy as np
+
+    started = time.perf_counter()
+    studies = load_studies()
+    rows = list(
+        Treatment.objects.filter(patient__isnull=False).values_list(
+            "type", "patient_id", "start_date", "end_date"
+        )
+    )
+    if not rows:
+        return {}
+    names, patients, starts, ends = zip(*rows, strict=True)
+    type_names, types = np.unique(np.array(names), return_inverse=True)
+    patients = np.array(patients, dtype=np.int64)
+    starts = np.array(starts, dtype="datetime64[D]")
+    ends = np.array(ends, dtype="datetime64[D]")
+
+    # The first treatment of each type of each patient
+    order = np.lexsort((starts, patients, types))
+    types, patients, starts, ends = (
+        types[order],
+        patients[order],
+        starts[order],
+        ends[order],
+    )
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = (types[1:] != types[:-1]) | (patients[1:] != patients[:-1])
+    types, patients, starts, ends = (
+        types[first],
+        patients[first],
+        starts[first],
+        ends[first],
+    )
+    patient_counts = np.bincount(types, minlength=len(type_names))
+
+    before, after = pair_studies(studies, patients, starts)
+    # Follow-ups must be taken while on the treatment
+    after_dates = studies["date"][after.clip(0)] if len(studies) else starts
+    paired = (before >= 0) & (after >= 0) & (np.isnat(ends) | (after_dates <= ends))
+    types = types[paired]
+    ahi_before = studies["ahi"][before[paired]]
+    ahi_after = studies["ahi"][after[paired]]
+    change = ahi_after - ahi_before
+    follow_up_days = (after_dates[paired] - starts[paired]).astype(np.int64)
+
+    efficacy = {}
+    for index, name in enumerate(type_names.tolist()):
+        of_type = types == index
+        efficacy[name] = {
+            "patients": patient_counts[index].item(),
+            "paired": int(of_type.sum()),
+            "before": _distribution(ahi_before[of_type]),
+            "after": _distribution(ahi_after[of_type]),
+            "change": _distribution(change[of_type]),
+            "improved": int((change[of_type] < 0).sum()),
+            "resolved": int(
+                ((ahi_before[of_type] >= 5) & (ahi_after[of_type] < 5)).sum()
+            ),
+            "days_to_follow_up": _distribution(follow_up_days[of_type]),
+        }
+    logger.info(
+        f"Computed treatment efficacy of {len(rows)} treatments and "
+        f"{len(studies)} studies in {(time.perf_counter() - started) * 1000:.0f}ms"
+    )
+    return efficacy
+
+
+def refresh_treatment_efficacy():
+    """
+    Computes and stores the treatment efficacy of every type.
+
+    Returns the stored result: the efficacy by type (types) and when it was
+    computed (computed_at).
+    """
+    result = {"computed_at": timezone.now(), "types": compute_treatment_efficacy()}
+    cache.set(EFFICACY_CACHE_KEY, result, None)
+    return result
+
+
+def _wait_for_treatment_efficacy():
+    """
+    Returns the first treatment efficacy, being computed by another request.
+
+    Raises ResultPending if it is not stored within EFFICACY_WAIT_TIMEOUT.
+    """
+    deadline = time.monotonic() + EFFICACY_WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(EFFICACY_POLL_INTERVAL)
+        result = cache.get(EFFICACY_CACHE_KEY)
+        if result is not None:
+            return result
+    logger.info("Treatment efficacy is still being computed")
+    raise ResultPending(wait=EFFICACY_RETRY_AFTER)
+
+
+def get_treatment_efficacy(types=None):
+    """
+    Returns the stored treatment efficacy of the given types, or of every type.
+
+    The result is recomputed when missing or older than
+    TREATMENT_EFFICACY_MAX_AGE, by one request at a time: while it is
+    recomputed, the others are served the outdated result, or wait for the
+    first one (see _wait_for_treatment_efficacy()).
+    """
+    result = cache.get(EFFICACY_CACHE_KEY)
+    max_age = timedelta(seconds=settings.TREATMENT_EFFICACY_MAX_AGE)
+    if result is None or timezone.now() - result["computed_at"] > max_age:
+        if cache.add(EFFICACY_LOCK_KEY, True, EFFICACY_LOCK_TIMEOUT):
+            try:
+                result = refresh_treatment_efficacy()
+            finally:
+                cache.delete(EFFICACY_LOCK_KEY)
+        elif result is None:
+            result = _wait_for_treatment_efficacy()
+        else:
+            logger.info("Serving outdated treatment efficacy during its refresh")
+    if types is None:
+        return result
+    efficacy = result["types"]
+    return {
+        "computed_at": result["computed_at"],
+        "types": {name: efficacy[name] for name in types if name in efficacy},
+    }
@@ -134,22 +134,20 @@ class UserViewSet(
 
         All operations are restricted to the authenticated user's own data.
         """
+        # request.user may be backed by token claims; load the full row
+        user = self.get_queryset().get()
         if request.method == "GET":
-            serializer = self.get_serializer(self.request.user)
+            serializer = self.get_serializer(user)
             return Response(serializer.data)
         elif request.method == "PUT":
             # Full update - all fields required
-            serializer = self.get_serializer(
-                self.request.user, data=request.data, partial=False
-            )
+            serializer = self.get_serializer(user, data=request.data, partial=False)
             serializer.is_valid(raise_exception=True)
             serializer.save()
             return Response(serializer.data)
         elif request.method == "PATCH":
             # Partial update - only specified fields updated
-            serializer = self.get_serializer(
-                self.request.user, data=request.data, partial=True
-            )
+            serializer = self.get_serializer(user, data=request.data, partial=True)
             serializer.is_valid(raise_exception=True)
             serializer.save()
             return Response(serializer.data)
@@ -175,8 +173,9 @@ class UserViewSet(
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        self.request.user.set_password(serializer.data["password_new"])
-        self.request.user.save()
+        user = self.get_queryset().get()
+        user.set_password(serializer.data["password_new"])
+        user.save()
 
         return Response(status=status.HTTP_204_NO_CONTENT)
 
@@ -191,5 +190,5 @@ class UserViewSet(
         Returns:
             204: Account successfully deleted
         """
-        self.request.user.delete()
+        self.get_queryset().get().delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
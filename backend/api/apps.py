@@ -0,0 +1,21 @@
+from django.apps import AppConfig, apps
+
+
+class ApiConfig(AppConfig):
+    """
+    Application configuration for the StellarCare API.
+
+    Connects the signal receivers (see api.signals), registers the system
+    checks (see api.checks) and the OpenAPI extensions (see api.schema) once
+    the app registry is ready.
+    The extensions are only registered where drf_spectacular is installed,
+    so API-only workers (api.settings_api) never load it.
+    """
+
+    name = "api"
+
+    def ready(self):
+        from . import checks, signals  # noqa: F401
+
+        if apps.is_installed("drf_spectacular"):
+            from . import schema  # noqa: F401
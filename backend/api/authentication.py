@@ -0,0 +1,217 @@
+"""
+This module provides stateless JSON web token authentication.
+
+The default simplejwt authentication loads the user row on every request.
+Here the request user is built from signed token claims instead, and the
+full row is only loaded if a view needs an attribute the token lacks.
+
+Features:
+- Claims-backed user objects without a per-request user lookup
+- Lazy loading of the full user on demand
+- Token revocation through a compact, cached denylist
+- Refresh tokens that embed and renew the user claims
+"""
+
+import logging
+from datetime import UTC, datetime
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+DENYLIST_CACHE_KEY = "auth:revoked-jtis"
+
+# Bounds how long a worker may miss a revocation if the cache was refilled
+# from a read that raced with the revoking transaction
+DENYLIST_CACHE_TIMEOUT = 60
+
+
+def get_revoked_jtis():
+    """
+    Returns the JTIs of revoked tokens that have not expired yet.
+
+    The set is loaded from the database once and shared through the cache,
+    so checking a token costs a cache lookup rather than a query.
+    """
+    jtis = cache.get(DENYLIST_CACHE_KEY)
+    if jtis is None:
+        jtis = frozenset(
+            RevokedToken.objects.filter(expires_at__gt=timezone.now()).values_list(
+                "jti", flat=True
+            )
+        )
+        cache.set(DENYLIST_CACHE_KEY, jtis, DENYLIST_CACHE_TIMEOUT)
+    return jtis
+
+
+def is_token_revoked(token):
+    """Returns whether the given validated token has been revoked."""
+    return token.get(api_settings.JTI_CLAIM) in get_revoked_jtis()
+
+
+def revoke_token(token):
+    """
+    Adds a validated token to the denylist.
+
+    Expired entries are pruned at the same time, and the cached denylist is
+    dropped once the transaction commits.
+    """
+    expires_at = datetime.fromtimestamp(token["exp"], tz=UTC)
+    with transaction.atomic():
+        RevokedToken.objects.get_or_create(
+            jti=token[api_settings.JTI_CLAIM], defaults={"expires_at": expires_at}
+        )
+        RevokedToken.objects.filter(expires_at__lte=timezone.now()).delete()
+        transaction.on_commit(lambda: cache.delete(DENYLIST_CACHE_KEY))
+    logger.info(f"Revoked token {token[api_settings.JTI_CLAIM]}")
+
+
+def add_user_claims(token, user):
+    """Embeds the claims read by ClaimsUser into a token."""
+    token["username"] = user.get_username()
+    token["is_staff"] = user.is_staff
+    token["is_superuser"] = user.is_superuser
+    token["custom_field_ids"] = list(
+        user.available_custom_fields.values_list("id", flat=True)
+    )
+    return token
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """
+    Refresh token carrying the user claims.
+
+    Claims are copied into access tokens as usual, but re-read from the user
+    whenever a new access token is issued, so changes to a user's flags or
+    custom field assignments apply from their next token refresh.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        return add_user_claims(super().for_user(user), user)
+
+    @property
+    def access_token(self):
+        access = super().access_token
+        user = (
+            get_user_model()
+            .objects.filter(
+                **{api_settings.USER_ID_FIELD: self[api_settings.USER_ID_CLAIM]}
+            )
+            .first()
+        )
+        if user is not None:
+            add_user_claims(access, user)
+        return access
+
+
+class ClaimsUser:
+    """
+    Lightweight authenticated user built from access token claims.
+
+    Provides without any query:
+    - id / pk
+    - username
+    - is_staff / is_superuser
+    - available_custom_field_ids (assigned custom fields at token issue time)
+
+    Tokens are only issued to active users, so is_active is assumed; a
+    deactivated user keeps access until their access token expires.
+
+    Any other attribute (email, related managers, save(), ...) transparently
+    loads the full User row once and is read from it.
+    """
+
+    is_active = True
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, token):
+        self.token = token
+        self.id = token[api_settings.USER_ID_CLAIM]
+        self.pk = self.id
+
+    def __str__(self):
+        return self.username
+
+    def __eq__(self, other):
+        return getattr(other, "pk", None) == self.pk
+
+    def __hash__(self):
+        return hash(self.pk)
+
+    def _claim(self, name, attribute=None):
+        """Returns a claim, falling back to the full user for older tokens."""
+        if name in self.token:
+            return self.token[name]
+        return getattr(self.get_user(), attribute or name)
+
+    @property
+    def username(self):
+        return self._claim("username")
+
+    @property
+    def is_staff(self):
+        return self._claim("is_staff")
+
+    @property
+    def is_superuser(self):
+        return self._claim("is_superuser")
+
+    @property
+    def available_custom_field_ids(self):
+        if "custom_field_ids" in self.token:
+            return self.token["custom_field_ids"]
+        return list(
+            self.get_user().available_custom_fields.values_list("id", flat=True)
+        )
+
+    def get_username(self):
+        return self.username
+
+    def get_user(self):
+        """Loads and memoizes the full User row."""
+        user = self.__dict__.get("_user")
+        if user is None:
+            user = get_user_model().objects.get(pk=self.pk)
+            self.__dict__["_user"] = user
+        return user
+
+    def __getattr__(self, name):
+        if name.startswith("__") or name in ("token", "_user"):
+            raise AttributeError(name)
+        return getattr(self.get_user(), name)
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that does not query the user table.
+
+    Features:
+    - Signature and expiry validation as in JWTAuthentication
+    - Rejection of revoked tokens via the cached denylist
+    - ClaimsUser instead of a User instance as request.user
+    """
+
+    def get_validated_token(self, raw_token):
+        """Validates the token and rejects it if it has been revoked."""
+        token = super().get_validated_token(raw_token)
+        if is_token_revoked(token):
+            raise InvalidToken(_("Token has been revoked"))
+        return token
+
+    def get_user(self, validated_token):
+        """Returns a user backed by the token claims."""
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+        return ClaimsUser(validated_token)
@@ -0,0 +1,174 @@
+"""
+This module provides the patient response cache.
+
+Serialized patient detail and list responses are cached through Django's
+cache framework. Instead of deleting entries on change, every entry is keyed
+by version tokens which signals (see api.signals) replace once a change is
+committed, so a changed chart is never served from the cache again.
+
+Features:
+- Per-patient version tokens for detail responses
+- A list version token for list pages, replaced on any patient change
+- A global generation token for changes affecting every patient
+- Versions usable as HTTP validators (token and time of the last change)
+- Response variants keyed by the full request URI
+- No cache fills while read replicas may still return the old data
+- Computed values (e.g. analytics) cached under the same version tokens
+
+Configuration (settings):
+- PATIENT_CACHE_TIMEOUT: Seconds a cached response is kept
+"""
+
+import hashlib
+import logging
+import time
+import uuid
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+GENERATION_VERSION_KEY = "patient:version:all"
+LIST_VERSION_KEY = "patient:version:list"
+
+
+class Version(NamedTuple):
+    """Identifies the current state of cached data."""
+
+    token: str
+    # Epoch seconds at which the state last changed (or an upper bound)
+    changed_at: float
+
+
+def _patient_version_key(patient_id):
+    return f"patient:version:{patient_id}"
+
+
+def _new_version():
+    """Returns a fresh version token and the time it was issued."""
+    return (uuid.uuid4().hex, time.time())
+
+
+def _get_version(keys):
+    """
+    Returns the combined version of the given version token keys.
+
+    A missing token (never set, or evicted) is replaced by a fresh one rather
+    than a constant, so entries cached under an evicted token can never be
+    served again.
+    """
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, _new_version(), None)
+            versions[key] = cache.get(key) or _new_version()
+    return Version(
+        token=":".join(versions[key][0] for key in keys),
+        changed_at=max(versions[key][1] for key in keys),
+    )
+
+
+def get_patient_version(patient_id):
+    """Returns the version of a patient's chart, changed by any chart update."""
+    return _get_version([_patient_version_key(patient_id), GENERATION_VERSION_KEY])
+
+
+def get_patient_list_version():
+    """Returns the version of the patient lists, changed by any patient update."""
+    return _get_version([LIST_VERSION_KEY, GENERATION_VERSION_KEY])
+
+
+def _set_versions(keys):
+    cache.set_many({key: _new_version() for key in keys}, None)
+
+
+def invalidate_patients(patient_ids):
+    """
+    Invalidates the cached responses of the given patients and all lists.
+
+    Takes effect when the current transaction commits, so no request can
+    cache the old data again under the new version.
+    """
+    keys = [_patient_version_key(patient_id) for patient_id in set(patient_ids)]
+    keys.append(LIST_VERSION_KEY)
+    transaction.on_commit(lambda: _set_versions(keys))
+
+
+def invalidate_patient_lists():
+    """
+    Invalidates the cached patient lists once the transaction commits.
+
+    For changes that leave every patient's chart unchanged but may change
+    the order or filtering of lists (see PatientSummary).
+    """
+    transaction.on_commit(lambda: _set_versions([LIST_VERSION_KEY]))
+
+
+def invalidate_all_patients():
+    """Invalidates every cached patient response once the transaction commits."""
+    keys = [GENERATION_VERSION_KEY, LIST_VERSION_KEY]
+    transaction.on_commit(lambda: _set_versions(keys))
+
+
+def _can_fill(version):
+    """
+    Returns whether a response read now may be cached.
+
+    With read replicas, a read shortly after a change may still see the old
+    data; such reads are served but not cached.
+    """
+    if not settings.REPLICA_DATABASES:
+        return True
+    settle_seconds = (
+        settings.REPLICA_MAX_LAG_SECONDS + settings.REPLICA_LAG_CHECK_INTERVAL
+    )
+    return time.time() - version.changed_at > settle_seconds
+
+
+def _variant(request):
+    """Identifies the representation requested (path, query, host and scheme)."""
+    return hashlib.sha256(request.build_absolute_uri().encode()).hexdigest()[:32]
+
+
+def cached_response(request, prefix, version, get_response):
+    """
+    Returns a response for the given version, from the cache when possible.
+
+    The version must be read before the response is built (see
+    get_patient_version()): if the data changes meanwhile, the response is
+    cached under the old, unreachable version and is never served.
+    """
+    key = f"{prefix}:{version.token}:{_variant(request)}"
+
+    data = cache.get(key)
+    if data is not None:
+        return Response(data)
+
+    response = get_response()
+    if response.status_code == 200 and _can_fill(version):
+        cache.set(key, response.data, settings.PATIENT_CACHE_TIMEOUT)
+    return response
+
+
+def cached_value(prefix, version, key, compute, timeout):
+    """
+    Returns compute() for the given version and key, from the cache when possible.
+
+    key identifies the computation (e.g. a cohort); as with cached_response(),
+    the version must be read before computing.
+    """
+    digest = hashlib.sha256(key.encode()).hexdigest()[:32]
+    cache_key = f"{prefix}:{version.token}:{digest}"
+
+    value = cache.get(cache_key)
+    if value is not None:
+        return value
+
+    value = compute()
+    if _can_fill(version):
+        cache.set(cache_key, value, timeout)
+    return value
@@ -0,0 +1,145 @@
+"""
+This module provides the patient change log used for incremental sync.
+
+Every committed patient change leaves a PatientChange row, written by the
+signal receivers in api.signals in the same transaction as the change.
+Clients keep a sync token and fetch only the patients changed since.
+
+Row IDs are assigned when rows are inserted, not when they commit, so a row
+with a lower ID can become visible after a higher one. Rows are therefore
+read in the order of their writing transaction, and only from transactions
+older than the oldest one still running (the snapshot's xmin). No such row
+can appear later, so a token never skips a change.
+
+Features:
+- Change rows written atomically with the change
+- Monotonic sync tokens, safe against out-of-order commits
+- Tombstones for deleted patients
+- Reset markers for changes affecting every patient
+- Pruning that sends clients behind it a reset marker
+
+Configuration (settings):
+- PATIENT_CHANGES_RETENTION_DAYS: Days change rows are kept
+"""
+
+import logging
+from typing import NamedTuple
+
+from django.db import connections, router, transaction
+from django.db.models import Q
+
+from .models import PatientChange
+
+logger = logging.getLogger(__name__)
+
+
+class ChangeToken(NamedTuple):
+    """Position in the change log: every row up to it has been read."""
+
+    transaction_id: int
+    id: int
+
+    def __str__(self):
+        return f"{self.transaction_id}-{self.id}"
+
+    @classmethod
+    def parse(cls, value):
+        """Parses a token returned by str(); raises ValueError if invalid."""
+        transaction_id, _, row_id = value.partition("-")
+        return cls(int(transaction_id), int(row_id))
+
+
+def record_patient_changes(patient_ids):
+    """Logs changes to the given patients in the current transaction."""
+    PatientChange.objects.bulk_create(
+        PatientChange(patient_id=patient_id) for patient_id in set(patient_ids)
+    )
+
+
+def record_all_patients_changed():
+    """Logs a change affecting every patient, sending clients a reset marker."""
+    PatientChange.objects.create(patient_id=None)
+
+
+def get_transaction_horizon(using):
+    """
+    Returns the ID of the oldest transaction still running.
+
+    Every transaction with a lower ID has committed or rolled back, so its
+    log rows are visible to any later query, or will never exist.
+    """
+    with connections[using].cursor() as cursor:
+        cursor.execute("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint")
+        return cursor.fetchone()[0]
+
+
+def get_current_token(using=None):
+    """Returns a token positioned after every change visible now."""
+    using = using or router.db_for_read(PatientChange)
+    return ChangeToken(get_transaction_horizon(using), 0)
+
+
+def read_log(queryset, token, limit, using):
+    """
+    Returns up to limit rows of a transaction-ordered log after the token.
+
+    The queryset's model must have transaction_id (see CurrentTransactionId)
+    and an auto-incrementing ID. Returns (rows, next_token, has_more). The
+    horizon and the rows must come from the same database.
+    """
+    horizon = get_transaction_horizon(using)
+    rows = list(
+        queryset.using(using)
+        .filter(
+            Q(transaction_id__gt=token.transaction_id)
+            | Q(transaction_id=token.transaction_id, id__gt=token.id),
+            transaction_id__lt=horizon,
+        )
+        .order_by("transaction_id", "id")[:limit]
+    )
+    has_more = len(rows) == limit
+    if has_more:
+        next_token = ChangeToken(rows[-1].transaction_id, rows[-1].id)
+    else:
+        # Caught up; a lagging replica must not move the token backwards
+        next_token = max(token, ChangeToken(horizon, 0))
+    return rows, next_token, has_more
+
+
+def get_changes(token, limit, using=None):
+    """
+    Returns the changes logged after the given token.
+
+    Returns (patient_ids, reset, next_token, has_more): the IDs of changed
+    patients in log order, whether a reset marker was passed, the token to
+    continue from, and whether more changes are ready. At most limit rows
+    are read.
+    """
+    using = using or router.db_for_read(PatientChange)
+    rows, next_token, has_more = read_log(
+        PatientChange.objects.only("transaction_id", "patient_id"), token, limit, using
+    )
+    patient_ids = list(
+        dict.fromkeys(row.patient_id for row in rows if row.patient_id is not None)
+    )
+    reset = any(row.patient_id is None for row in rows)
+    return patient_ids, reset, next_token, has_more
+
+
+def prune_changes(before):
+    """
+    Deletes change rows logged before the given time.
+
+    The newest pruned row is kept as a reset marker, so clients whose token
+    predates it reload all patients instead of missing the pruned changes.
+    Returns the number of rows deleted.
+    """
+    with transaction.atomic():
+        old_changes = PatientChange.objects.filter(changed_at__lt=before)
+        last = old_changes.order_by("-transaction_id", "-id").first()
+        if last is None:
+            return 0
+        PatientChange.objects.filter(pk=last.pk).update(patient_id=None)
+        deleted, _ = old_changes.exclude(pk=last.pk).delete()
+    logger.info(f"Pruned {deleted} patient changes logged before {before}")
+    return deleted
@@ -0,0 +1,164 @@
+"""
+This module provides precomputed patient chart documents.
+
+A chart document holds a patient with their addresses, custom fields,
+every linked record and their visit series, encoded as JSON once and
+stored in PatientChart, so opening a chart costs one query and no
+serialization.
+
+Changes to any part of a chart request a rebuild in the changing transaction
+(see api.signals); the chart builder (manage.py build_patient_charts)
+rebuilds requested charts in the background, oldest request first.
+
+Features:
+- Chart documents versioned by their rebuild request count
+- Rebuild requests atomic with the change
+- Rebuilds that never overwrite a newer document
+- On-demand builds for charts that are missing or not rebuilt yet
+"""
+
+import logging
+
+from django.db import DEFAULT_DB_ALIAS, connection
+from django.db.models import F, Prefetch
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from .models import (
+    Insurance,
+    Patient,
+    PatientChart,
+    SleepStudy,
+    Treatment,
+    Visit,
+    VisitSeries,
+)
+from .serializers import (
+    InsuranceSerializer,
+    PatientSerializer,
+    SleepStudySerializer,
+    TreatmentSerializer,
+    VisitSerializer,
+    VisitSeriesSerializer,
+)
+
+logger = logging.getLogger(__name__)
+
+# Record relations of a chart: {document key: (relation, model, serializer)}
+CHART_RECORDS = {
+    "studies": ("studies", SleepStudy, SleepStudySerializer),
+    "treatments": ("treatments", Treatment, TreatmentSerializer),
+    "insurance": ("insurance", Insurance, InsuranceSerializer),
+    "appointments": ("appointments", Visit, VisitSerializer),
+    "visit_series": ("visit_series", VisitSeries, VisitSeriesSerializer),
+}
+
+# A chart's requested_at is when it became outdated, so that a patient
+# changing continuously is not rebuilt last
+REQUEST_BUILDS_SQL = """
+    INSERT INTO api_patientchart AS chart (patient_id, requested, built, requested_at)
+    SELECT id, 1, 0, now() FROM api_patient WHERE id = ANY(%s) ORDER BY id
+    ON CONFLICT (patient_id) DO UPDATE SET
+        requested = chart.requested + 1,
+        requested_at = CASE
+            WHEN chart.built < chart.requested THEN chart.requested_at
+            ELSE now()
+        END
+"""
+
+REQUEST_ALL_BUILDS_SQL = """
+    UPDATE api_patientchart SET
+        requested = requested + 1,
+        requested_at = CASE WHEN built < requested THEN requested_at ELSE now() END
+"""
+
+
+def request_chart_builds(patient_ids):
+    """
+    Requests a rebuild of the given patients' charts in the current transaction.
+
+    Deleted patients are skipped; their charts are deleted with them.
+    """
+    patient_ids = sorted(set(patient_ids))
+    if patient_ids:
+        with connection.cursor() as cursor:
+            cursor.execute(REQUEST_BUILDS_SQL, [patient_ids])
+
+
+def request_all_chart_builds():
+    """Requests a rebuild of every existing chart in the current transaction."""
+    with connection.cursor() as cursor:
+        cursor.execute(REQUEST_ALL_BUILDS_SQL)
+
+
+def encode_chart(patient_id, version):
+    """Returns the encoded chart document of a patient, or None if not found."""
+    patient = (
+        Patient.objects.using(DEFAULT_DB_ALIAS)
+        .prefetch_related(
+            "addresses",
+            "patient_custom_fields",
+            "patient_custom_fields__field_definition",
+            *(
+                Prefetch(relation, queryset=model.objects.order_by("id"))
+                for relation, model, _ in CHART_RECORDS.values()
+            ),
+        )
+        .filter(pk=patient_id)
+        .first()
+    )
+    if patient is None:
+        return None
+
+    document = {
+        "patient_id": patient.pk,
+        "version": version,
+        "built_at": timezone.now(),
+        "patient": PatientSerializer(patient).data,
+    }
+    for key, (relation, _, serializer_class) in CHART_RECORDS.items():
+        records = getattr(patient, relation).all()
+        document[key] = serializer_class(records, many=True).data
+    return JSONRenderer().render(document)
+
+
+def build_chart(patient_id):
+    """
+    Builds and stores the chart of a patient for its latest request.
+
+    The data is read after the request count, so it includes every change
+    counted. A change committing during the build requests another build.
+    Returns (version, document), or None if the patient does not exist.
+    """
+    charts = PatientChart.objects.using(DEFAULT_DB_ALIAS).filter(patient_id=patient_id)
+    version = charts.values_list("requested", flat=True).first()
+    if version is None:
+        request_chart_builds([patient_id])
+        version = charts.values_list("requested", flat=True).first()
+        if version is None:
+            return None
+    document = encode_chart(patient_id, version)
+    if document is None:
+        return None
+    # Another build may have stored a newer version meanwhile
+    PatientChart.objects.filter(patient_id=patient_id, built__lt=version).update(
+        built=version, built_at=timezone.now(), document=document
+    )
+    return version, document
+
+
+def build_requested_charts(batch_size):
+    """
+    Builds the charts with pending rebuild requests, oldest request first.
+
+    Returns the number of charts built and whether more are pending.
+    """
+    patient_ids = list(
+        PatientChart.objects.using(DEFAULT_DB_ALIAS)
+        .filter(built__lt=F("requested"))
+        .order_by("requested_at")
+        .values_list("patient_id", flat=True)[:batch_size]
+    )
+    for patient_id in patient_ids:
+        build_chart(patient_id)
+    return len(patient_ids), len(patient_ids) == batch_size
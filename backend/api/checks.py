@@ -0,0 +1,75 @@
+"""
+This module provides system checks for the StellarCare application.
+
+Features:
+- Middleware checks for bearer token API requests, which skip the session,
+  auth and message middleware (see api.middleware):
+    - api.E001: middleware needing the session runs without it
+    - api.W001: session middleware still runs for bearer token requests
+"""
+
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.messages.middleware import MessageMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core import checks
+from django.utils.module_loading import import_string
+
+from .middleware import TokenRequestExemptMixin
+
+# Middleware bearer token API requests skip, with its token-exempt version
+SESSION_MIDDLEWARE = {
+    SessionMiddleware: "api.middleware.SessionMiddleware",
+    AuthenticationMiddleware: "api.middleware.AuthenticationMiddleware",
+    MessageMiddleware: "api.middleware.MessageMiddleware",
+}
+
+
+@checks.register()
+def check_session_middleware(app_configs, **kwargs):
+    """
+    Checks that MIDDLEWARE skips the session middleware consistently.
+
+    Once the session middleware is skipped for bearer token API requests,
+    the auth and message middleware must be skipped too, as they need the
+    session (api.E001). Otherwise, stock session middleware only misses the
+    fast path (api.W001).
+    """
+    classes = {}
+    for path in settings.MIDDLEWARE:
+        try:
+            classes[path] = import_string(path)
+        except ImportError:
+            continue  # Reported when the handler loads MIDDLEWARE
+    session_skipped = any(
+        issubclass(cls, SessionMiddleware) and issubclass(cls, TokenRequestExemptMixin)
+        for cls in classes.values()
+    )
+
+    errors = []
+    for path, cls in classes.items():
+        if issubclass(cls, TokenRequestExemptMixin):
+            continue
+        for base, replacement in SESSION_MIDDLEWARE.items():
+            if not issubclass(cls, base):
+                continue
+            hint = f"Use {replacement} (or a subclass) instead."
+            if session_skipped and base is not SessionMiddleware:
+                errors.append(
+                    checks.Error(
+                        f"{path} needs the session, which is not set for bearer "
+                        "token API requests.",
+                        hint=hint,
+                        id="api.E001",
+                    )
+                )
+            else:
+                errors.append(
+                    checks.Warning(
+                        f"{path} runs for bearer token API requests, which "
+                        "never use the session.",
+                        hint=hint,
+                        id="api.W001",
+                    )
+                )
+    return errors
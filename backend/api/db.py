@@ -0,0 +1,55 @@
+"""
+This module provides helpers for database connection management.
+
+Features:
+- Connection pool statistics (wait time, saturation, errors)
+- Pool shutdown for process forking
+"""
+
+from django.db import connections
+
+
+def get_pool_stats():
+    """
+    Returns connection pool statistics for every pooled database alias.
+
+    Besides the raw psycopg_pool counters, each entry includes:
+    - in_use: Connections currently checked out
+    - saturation: Share of the maximum pool size currently in use
+    - avg_wait_ms: Average time queued requests waited for a connection
+
+    Counters are cumulative since the pool was opened in this process.
+    """
+    stats = {}
+    for connection in connections.all():
+        pool = getattr(connection, "pool", None)
+        if pool is None:
+            continue
+
+        raw = pool.get_stats()
+        size = raw.get("pool_size", 0)
+        available = raw.get("pool_available", 0)
+        max_size = raw.get("pool_max", pool.max_size)
+        queued = raw.get("requests_queued", 0)
+        wait_ms = raw.get("requests_wait_ms", 0)
+
+        stats[connection.alias] = {
+            **raw,
+            "in_use": size - available,
+            "saturation": round((size - available) / max_size, 3) if max_size else 0,
+            "avg_wait_ms": round(wait_ms / queued, 3) if queued else 0.0,
+        }
+    return stats
+
+
+def close_pools():
+    """
+    Closes the connection pools of every database alias.
+
+    Pools own background threads and sockets that must not be shared across
+    a fork, so the application server master calls this before forking.
+    """
+    for connection in connections.all():
+        connection.close()
+        if getattr(connection, "pool", None) is not None:
+            connection.close_pool()
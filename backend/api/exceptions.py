@@ -0,0 +1,66 @@
+"""
+This module provides API exceptions of the StellarCare application.
+
+Features:
+- Exceptions for HTTP errors without a REST framework counterpart
+"""
+
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class PreconditionFailed(APIException):
+    """
+    Raised when a conditional request's precondition does not hold.
+
+    Used for optimistic concurrency control: the resource was changed since
+    the client read the version it sent in If-Match.
+    """
+
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = _("The resource has been changed since it was read.")
+    default_code = "precondition_failed"
+
+
+class PreconditionRequired(APIException):
+    """
+    Raised when an update that must be conditional has no If-Match header.
+
+    Unconditional updates could silently overwrite changes made since the
+    client read the resource (lost updates).
+    """
+
+    status_code = status.HTTP_428_PRECONDITION_REQUIRED
+    default_detail = _("This request must be conditional (If-Match).")
+    default_code = "precondition_required"
+
+
+class SlotUnavailable(APIException):
+    """
+    Raised when a visit is booked at a time the clinic is already full.
+
+    Another visit took the time since it was offered; the client should
+    search for free slots again.
+    """
+
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = _("The requested time is no longer available.")
+    default_code = "slot_unavailable"
+
+
+class ResultPending(APIException):
+    """
+    Raised when a result is still being computed by another request.
+
+    Answered with 503 Service Unavailable and a Retry-After of wait seconds,
+    rather than computing the same result once more.
+    """
+
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = _("The result is being computed, retry shortly.")
+    default_code = "result_pending"
+
+    def __init__(self, wait, detail=None, code=None):
+        super().__init__(detail, code)
+        self.wait = wait
@@ -0,0 +1,35 @@
+"""
+This module provides keyset (seek) conditions for paging through ordered rows.
+
+Keyset pages continue after the key of the last row read, rather than
+skipping rows with an offset, so each page is one index range scan.
+
+Features:
+- Row comparisons over any fields, in ascending or descending order
+
+Notes:
+- The fields must be backed by an index in the same order, whose last
+  field is unique, for the comparison to be a range scan
+"""
+
+from django.db.models import BooleanField
+from django.db.models.expressions import RawSQL
+
+
+def seek_condition(model, fields, after, descending=False):
+    """
+    Returns the condition selecting the rows of model after the key after.
+
+    fields are the model fields of the key, after their values; descending
+    selects the rows before the key instead.
+    """
+    # A row comparison, which Postgres answers with one index range scan
+    table = model._meta.db_table
+    columns = ", ".join(f'"{table}"."{field.column}"' for field in fields)
+    placeholders = ", ".join(["%s"] * len(after))
+    operator = "<" if descending else ">"
+    return RawSQL(
+        f"({columns}) {operator} ({placeholders})",
+        after,
+        output_field=BooleanField(),
+    )
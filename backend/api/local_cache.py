@@ -0,0 +1,169 @@
+"""
+This module provides per-process caches kept coherent across workers.
+
+Data that rarely changes but is read on many requests (e.g. custom field
+definitions) is cached in the memory of each worker process. Writers
+advance the changed model's CacheVersion and send a notification on the
+model's channel in the same transaction; every process listening (see
+api.notifications) evicts the caches depending on that model once the
+transaction commits.
+
+Features:
+- In-process reads, without a cache server round trip
+- Eviction by Postgres NOTIFY on channels named after models
+- Fallback polling of the model versions, covering missed notifications
+  (e.g. while the listener reconnects)
+- Immediate eviction in the writing process on commit
+- No stale fills: values are loaded from the primary, and values loaded
+  while an eviction happened are not kept
+- Bounded size: the least recently used entries are dropped first
+
+Configuration (settings):
+- LOCAL_CACHE_POLL_INTERVAL: Seconds between version checks of each cache
+- LOCAL_CACHE_MAX_ENTRIES: Entries each cache keeps per process
+
+Notes:
+- Changes made without signals (QuerySet.update(), raw SQL) must call
+  notify_model_changed() themselves
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import partial
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connection, transaction
+
+from .models import CacheVersion
+from .notifications import listener
+from .routers import use_primary
+
+logger = logging.getLogger(__name__)
+
+# Caches by the label of every model they depend on
+_caches_by_model = {}
+
+
+def _channel(label):
+    return f"cache:{label}"
+
+
+def notify_model_changed(model):
+    """
+    Invalidates the per-process caches depending on a model.
+
+    Advances the model's version and notifies every process, both taking
+    effect when the current transaction commits.
+    """
+    label = model._meta.label_lower
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            WITH changed AS (
+                INSERT INTO {CacheVersion._meta.db_table} (model, version)
+                VALUES (%s, 1)
+                ON CONFLICT (model)
+                DO UPDATE SET version = {CacheVersion._meta.db_table}.version + 1
+                RETURNING version
+            )
+            SELECT pg_notify(%s, version::text) FROM changed
+            """,
+            [label, _channel(label)],
+        )
+    # The writing process must not serve its own stale entries until the
+    # notification arrives
+    transaction.on_commit(lambda: _evict_model(label))
+
+
+def _evict_model(label):
+    for cache in _caches_by_model.get(label, []):
+        cache.clear()
+
+
+class LocalCache:
+    """
+    A per-process cache evicted when any of the given models changes.
+
+    Keys may come from requests (e.g. their URI), so at most max_entries
+    (default: LOCAL_CACHE_MAX_ENTRIES) are kept, least recently used first
+    out.
+
+    Usage:
+        definitions = LocalCache("definitions", [CustomFieldDefinition])
+        data = definitions.get_or_set(key, load)
+    """
+
+    def __init__(self, name, models, max_entries=None):
+        self.name = name
+        self.labels = [model._meta.label_lower for model in models]
+        self.max_entries = max_entries or settings.LOCAL_CACHE_MAX_ENTRIES
+        self._entries = OrderedDict()
+        self._versions = {}
+        # Advanced by every eviction; fills started before one are dropped
+        self._generation = 0
+        self._checked_at = 0.0
+        self._pid = None
+        self._lock = threading.Lock()
+        self._handlers = {label: partial(self._notify, label) for label in self.labels}
+        for label in self.labels:
+            _caches_by_model.setdefault(label, []).append(self)
+
+    def get_or_set(self, key, load):
+        """Returns the cached value of key, calling load() to fill it if missing."""
+        self._check()
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            generation = self._generation
+        # A replica may still return the data an eviction was meant to drop
+        with use_primary():
+            value = load()
+        with self._lock:
+            if self._generation == generation:
+                self._entries[key] = value
+                if len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def _check(self):
+        """Starts listening in this process and polls the versions when due."""
+        if self._pid != os.getpid():
+            # New process, or forked from one: entries may be stale already
+            self._pid = os.getpid()
+            self._versions = {}
+            self._checked_at = 0.0
+            self.clear()
+            for label, handler in self._handlers.items():
+                listener.subscribe(_channel(label), handler)
+        if time.monotonic() - self._checked_at > settings.LOCAL_CACHE_POLL_INTERVAL:
+            self._poll()
+
+    def _poll(self):
+        versions = dict(
+            CacheVersion.objects.using(DEFAULT_DB_ALIAS)
+            .filter(model__in=self.labels)
+            .values_list("model", "version")
+        )
+        self._checked_at = time.monotonic()
+        if versions != self._versions:
+            if self._versions:
+                logger.info(f"Local cache {self.name} missed a change, clearing it")
+            self._versions = versions
+            self.clear()
+
+    def _notify(self, label, payload):
+        # Called in the listener thread; None means changes may have been missed
+        if payload is None:
+            self._checked_at = 0.0
+        else:
+            self._versions[label] = max(self._versions.get(label, 0), int(payload))
+        self.clear()
@@ -0,0 +1,66 @@
+"""
+This module provides a Django management command reporting treatment efficacy.
+
+Compares the AHI of each patient's last sleep study before a treatment started
+with the first one after (see api.analytics), for every treatment type at once,
+and stores the result served by /api/analytics/treatment-efficacy/. Run it for
+reports, and periodically (e.g. from cron, more often than
+TREATMENT_EFFICACY_MAX_AGE) so that requests never recompute it.
+
+Usage:
+    python manage.py analyze_treatment_efficacy
+    python manage.py analyze_treatment_efficacy --type CPAP --type BiPAP
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.analytics import refresh_treatment_efficacy
+
+
+class Command(BaseCommand):
+    """
+    Django management command recomputing and printing treatment efficacy.
+
+    Prints per type the patients on it and with paired studies, the median
+    AHI before and after and its median change, and the share of paired
+    patients who improved or went below an AHI of 5.
+    """
+
+    help = "Reports the AHI before and after treatment starts, by treatment type"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--type",
+            action="append",
+            dest="types",
+            help="Treatment type to report (repeatable; default: all)",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        efficacy = refresh_treatment_efficacy()["types"]
+        elapsed = time.perf_counter() - started
+        if options["types"] is not None:
+            efficacy = {
+                name: efficacy[name] for name in options["types"] if name in efficacy
+            }
+
+        for name, result in efficacy.items():
+            paired = result["paired"]
+            line = f"{name}: {result['patients']} patients, {paired} paired"
+            if paired:
+                line += (
+                    f", median AHI {result['before']['percentiles']['p50']:.1f}"
+                    f" -> {result['after']['percentiles']['p50']:.1f}"
+                    f" (change {result['change']['percentiles']['p50']:+.1f})"
+                    f", {result['improved'] / paired:.0%} improved"
+                    f", {result['resolved'] / paired:.0%} resolved"
+                )
+            self.stdout.write(line)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Analyzed {len(efficacy)} treatment types in {elapsed:.2f}s"
+            )
+        )
@@ -0,0 +1,180 @@
+"""
+This module provides a Django management command to benchmark API throughput over HTTP.
+
+It drives concurrent keep-alive clients against a running server so that different
+serving modes (``runserver``, gunicorn WSGI workers, uvicorn ASGI workers) can be
+compared on the same endpoints.
+
+Usage:
+    python manage.py benchmark_http --url http://localhost:8000 \
+        --username admin --password secret --path /api/patients/ \
+        --requests 2000 --concurrency 32 --label gunicorn
+
+Reports for each path:
+- Throughput (requests per second)
+- Latency percentiles (p50, p95, p99) and maximum
+- Error count and status code breakdown
+"""
+
+import http.client
+import json
+import statistics
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    """
+    Django management command to benchmark HTTP throughput of the API.
+
+    Each worker thread holds one persistent connection and issues requests
+    back to back, so the results reflect server capacity rather than client
+    connection setup cost.
+    """
+
+    help = "Benchmarks API throughput and latency over HTTP"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://localhost:8000")
+        parser.add_argument(
+            "--path",
+            action="append",
+            dest="paths",
+            help="Path to request; may be given several times",
+        )
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument("--token", help="JWT access token to send")
+        parser.add_argument("--username", help="Obtain a token for this user")
+        parser.add_argument("--password", help="Password used to obtain a token")
+        parser.add_argument("--label", default="", help="Label printed with results")
+
+    def handle(self, *args, **options):
+        """
+        Execute the benchmark.
+
+        Process:
+        1. Obtains an access token if credentials are given
+        2. Runs a short warm-up against each path
+        3. Runs the measured requests with the configured concurrency
+        4. Prints throughput and latency statistics
+        """
+        target = urlsplit(options["url"])
+        if target.scheme not in ("http", "https"):
+            raise CommandError("--url must be an http(s) URL")
+
+        headers = {"Accept": "application/json", "Connection": "keep-alive"}
+        token = options["token"]
+        if not token and options["username"]:
+            token = self._obtain_token(
+                target, options["username"], options["password"] or ""
+            )
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+
+        for path in options["paths"] or ["/api/patients/"]:
+            self._run(
+                target,
+                path,
+                headers,
+                options["requests"],
+                options["concurrency"],
+                options["label"],
+            )
+
+    def _connect(self, target):
+        """Opens a persistent connection to the target server."""
+        connection_class = (
+            http.client.HTTPSConnection
+            if target.scheme == "https"
+            else http.client.HTTPConnection
+        )
+        return connection_class(target.hostname, target.port, timeout=60)
+
+    def _obtain_token(self, target, username, password):
+        """Obtains a JWT access token from the token endpoint."""
+        connection = self._connect(target)
+        body = json.dumps({"username": username, "password": password})
+        connection.request(
+            "POST",
+            "/api/token/",
+            body=body,
+            headers={"Content-Type": "application/json"},
+        )
+        response = connection.getresponse()
+        payload = response.read()
+        connection.close()
+        if response.status != 200:
+            raise CommandError(f"Could not obtain token: {response.status}")
+        return json.loads(payload)["access"]
+
+    def _run(self, target, path, headers, total, concurrency, label):
+        """Runs the measured requests for a single path and prints statistics."""
+        remaining = iter(range(total))
+        lock = threading.Lock()
+        latencies = []
+        statuses = Counter()
+
+        def worker():
+            connection = self._connect(target)
+            local_latencies = []
+            local_statuses = Counter()
+            while True:
+                with lock:
+                    if next(remaining, None) is None:
+                        break
+                started = time.perf_counter()
+                try:
+                    connection.request("GET", path, headers=headers)
+                    response = connection.getresponse()
+                    response.read()
+                    local_statuses[response.status] += 1
+                except (OSError, http.client.HTTPException):
+                    local_statuses["error"] += 1
+                    connection.close()
+                    connection = self._connect(target)
+                    continue
+                local_latencies.append(time.perf_counter() - started)
+            connection.close()
+            with lock:
+                latencies.extend(local_latencies)
+                statuses.update(local_statuses)
+
+        # Warm-up so connection setup and first-request costs are not measured
+        warm_up = self._connect(target)
+        for _ in range(min(concurrency, 10)):
+            warm_up.request("GET", path, headers=headers)
+            warm_up.getresponse().read()
+        warm_up.close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for _ in range(concurrency):
+                executor.submit(worker)
+        elapsed = time.perf_counter() - started
+
+        if not latencies:
+            raise CommandError(f"No successful requests for {path}: {dict(statuses)}")
+
+        quantiles = statistics.quantiles(latencies, n=100)
+        errors = sum(
+            count for code, count in statuses.items() if code == "error" or code >= 400
+        )
+        prefix = f"[{label}] " if label else ""
+        self.stdout.write(
+            f"{prefix}GET {path}: {len(latencies) / elapsed:.1f} req/s over "
+            f"{elapsed:.2f}s (concurrency={concurrency})"
+        )
+        self.stdout.write(
+            f"  latency ms: p50={quantiles[49] * 1000:.1f} "
+            f"p95={quantiles[94] * 1000:.1f} p99={quantiles[98] * 1000:.1f} "
+            f"max={max(latencies) * 1000:.1f}"
+        )
+        self.stdout.write(f"  status codes: {dict(statuses)}")
+        if errors:
+            self.stdout.write(self.style.WARNING(f"  {errors} failed requests"))
@@ -0,0 +1,112 @@
+"""
+This module provides a Django management command to benchmark worker cold starts.
+
+Each settings profile is started in fresh Python processes that load Django and run
+the same warm-up as a gunicorn worker, so profiles (e.g. the full api.settings and
+the API-only api.settings_api) can be compared on startup time and memory.
+
+Usage:
+    python manage.py benchmark_startup --runs 5
+    python manage.py benchmark_startup --settings-module api.settings_api
+
+Reports for each settings profile:
+- Cold-start time to a warmed-up application (median and best)
+- Resident set size (RSS) of the process once ready
+- Number of loaded Python modules
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+# Run in a fresh interpreter per measurement; prints its results as JSON
+STARTUP_SCRIPT = """
+import json, resource, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+from api.warmup import warm_up
+warm_up()
+ready_ms = (time.perf_counter() - started) * 1000
+try:
+    with open("/proc/self/status") as status:
+        rss_kb = int(status.read().split("VmRSS:")[1].split()[0])
+except OSError:
+    # Peak rather than current RSS, and includes the parent's peak on Linux
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({"ready_ms": ready_ms, "rss_kb": rss_kb, "modules": len(sys.modules)}))
+"""
+
+DEFAULT_PROFILES = ["api.settings", "api.settings_api"]
+
+
+class Command(BaseCommand):
+    """
+    Django management command to compare cold-start cost of settings profiles.
+
+    Measures the application load only; the interpreter start itself is
+    reported separately as part of the total process time.
+    """
+
+    help = "Benchmarks worker cold-start time and memory per settings profile"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--settings-module",
+            action="append",
+            dest="profiles",
+            help="Settings module to measure; may be given several times",
+        )
+        parser.add_argument("--runs", type=int, default=5)
+
+    def handle(self, *args, **options):
+        """
+        Execute the benchmark.
+
+        Process:
+        1. Starts a fresh process per run and settings profile
+        2. Loads Django, the WSGI application and runs the warm-up
+        3. Prints startup time, RSS and module count per profile
+        """
+        profiles = options["profiles"] or DEFAULT_PROFILES
+        runs = options["runs"]
+
+        self.stdout.write(
+            f"{'profile':<20} {'ready ms':>9} {'best ms':>9} {'process ms':>11} "
+            f"{'RSS MB':>7} {'modules':>8}"
+        )
+        for profile in profiles:
+            results = [self._run(profile) for _ in range(runs)]
+            ready = [result["ready_ms"] for result in results]
+            total = [result["total_ms"] for result in results]
+            rss = statistics.median(result["rss_kb"] for result in results) / 1024
+            self.stdout.write(
+                f"{profile:<20} {statistics.median(ready):9.0f} {min(ready):9.0f} "
+                f"{statistics.median(total):11.0f} {rss:7.1f} "
+                f"{results[0]['modules']:8d}"
+            )
+
+    def _run(self, profile):
+        """Starts one process with the given settings profile."""
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": profile}
+        started = time.perf_counter()
+        completed = subprocess.run(
+            [sys.executable, "-c", STARTUP_SCRIPT],
+            capture_output=True,
+            env=env,
+            text=True,
+        )
+        total_ms = (time.perf_counter() - started) * 1000
+        if completed.returncode != 0:
+            raise CommandError(f"{profile} failed to start:\n{completed.stderr}")
+
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        result["total_ms"] = total_ms
+        return result
@@ -0,0 +1,83 @@
+"""
+This module provides a Django management command building patient chart documents.
+
+Runs as a long-lived worker rebuilding the charts whose patients changed (see
+api.charts). Several builders may run at once; a build never overwrites a newer chart.
+
+Usage:
+    python manage.py build_patient_charts
+    python manage.py build_patient_charts --batch-size 200 --interval 0.5
+    python manage.py build_patient_charts --all --once
+"""
+
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.charts import build_requested_charts, request_chart_builds
+from api.models import Patient
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Django management command to build requested patient charts.
+
+    Builds the oldest requests first. Database errors end the command so
+    that its supervisor restarts it.
+    """
+
+    help = "Builds patient chart documents whose patients changed"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=100, help="Charts per batch"
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1.0,
+            help="Seconds to wait for new requests when idle",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Request a rebuild of every chart first",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once every requested chart is built",
+        )
+
+    def handle(self, *args, **options):
+        """
+        Execute the build loop.
+
+        Process:
+        1. Requests a chart of every patient with --all
+        2. Builds batches until no requests are pending
+        3. Waits for new requests
+        """
+        if options["all"]:
+            with transaction.atomic():
+                request_chart_builds(Patient.objects.values_list("pk", flat=True))
+        self.stdout.write("Building requested patient charts")
+
+        while True:
+            started = time.perf_counter()
+            built, has_more = build_requested_charts(options["batch_size"])
+            if built:
+                logger.info(
+                    f"Built {built} patient charts in "
+                    f"{(time.perf_counter() - started) * 1000:.0f}ms"
+                )
+            if not has_more:
+                if options["once"]:
+                    break
+                time.sleep(options["interval"])
+
+        self.stdout.write(self.style.SUCCESS("Every requested chart is built"))
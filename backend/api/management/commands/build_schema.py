@@ -0,0 +1,64 @@
+"""
+This module provides a Django management command to precompute the OpenAPI schema.
+
+Run at deploy time so that no request has to wait for schema generation. The schema
+is written to SCHEMA_CACHE_DIR under the current code version; artifacts of other
+versions are removed.
+
+Usage:
+    python manage.py build_schema
+    python manage.py build_schema --force
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.schema import (
+    SCHEMA_RENDERERS,
+    build_schema,
+    get_code_version,
+    get_schema,
+    prune_schemas,
+)
+
+
+class Command(BaseCommand):
+    """
+    Django management command to build the schema artifacts of the running code.
+
+    Existing artifacts of the current code version are kept unless --force is
+    given, so running it on every start is cheap.
+    """
+
+    help = "Precomputes the OpenAPI schema for the current code version"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Rebuild even if the current version has been built",
+        )
+
+    def handle(self, *args, **options):
+        """
+        Execute the build.
+
+        Process:
+        1. Builds (or, without --force, loads) the schema in every format
+        2. Removes artifacts of other code versions
+        """
+        self.stdout.write(f"Code version {get_code_version()}")
+        for schema_format in SCHEMA_RENDERERS:
+            started = time.perf_counter()
+            if options["force"]:
+                artifact = build_schema(schema_format)
+            else:
+                artifact = get_schema(schema_format)
+            self.stdout.write(
+                f"  {schema_format}: {len(artifact.content)} bytes "
+                f"({len(artifact.gzip_content)} gzipped) in "
+                f"{(time.perf_counter() - started) * 1000:.0f}ms"
+            )
+        prune_schemas()
+        self.stdout.write(self.style.SUCCESS("Schema is up to date"))
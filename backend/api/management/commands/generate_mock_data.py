@@ -38,6 +38,7 @@ All generated data uses the Faker library to create realistic-looking values.
 import random
 
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from faker import Faker
 
 from api.models import (
@@ -66,6 +67,7 @@ class Command(BaseCommand):
 
     help = "Generates mock data for the application"
 
+    @transaction.atomic
     def handle(self, *args, **kwargs):
         """
         Execute the command to generate mock data.
@@ -76,7 +78,8 @@ class Command(BaseCommand):
         3. Create patients and link them to all related records
 
         The method ensures referential integrity and creates realistic relationships
-        between different types of records.
+        between different types of records. Everything is created in one transaction,
+        which the outbox events of the records are written in (see api.outbox).
         """
 
         self.stdout.write("Generating mock data...")
@@ -0,0 +1,44 @@
+"""
+This module provides a Django management command to prune the patient change log.
+
+Run periodically (e.g. daily from cron). Sync clients whose token predates the pruned
+rows receive a reset marker and reload all patients.
+
+Usage:
+    python manage.py prune_patient_changes
+    python manage.py prune_patient_changes --days 7
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.changes import prune_changes
+
+
+class Command(BaseCommand):
+    """
+    Django management command to delete old patient change log rows.
+
+    Keeps PATIENT_CHANGES_RETENTION_DAYS days of changes unless --days is
+    given.
+    """
+
+    help = "Deletes patient change log rows older than the retention period"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.PATIENT_CHANGES_RETENTION_DAYS,
+            help="Days of changes to keep",
+        )
+
+    def handle(self, *args, **options):
+        before = timezone.now() - timedelta(days=options["days"])
+        deleted = prune_changes(before)
+        self.stdout.write(
+            self.style.SUCCESS(f"Deleted {deleted} changes logged before {before}")
+        )
@@ -0,0 +1,49 @@
+"""
+This module provides a Django management command to refresh patient summaries.
+
+Patient summaries are maintained by database triggers, but some figures change with
+the date alone: a scheduled visit passes, a treatment starts or ends. Run daily, shortly
+after midnight UTC (e.g. from cron), to refresh the summaries outdated since.
+
+Usage:
+    python manage.py refresh_patient_summaries
+    python manage.py refresh_patient_summaries --all
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from api.cache import invalidate_patient_lists
+
+
+class Command(BaseCommand):
+    """
+    Django management command to refresh outdated patient summaries.
+
+    Refreshes the summaries whose expires_on has been reached, or every
+    summary with --all (e.g. after changing api_refresh_patient_summary()),
+    and invalidates the cached patient lists.
+    """
+
+    help = "Refreshes patient summaries outdated by the date"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Refresh every summary",
+        )
+
+    def handle(self, *args, **options):
+        condition = "" if options["all"] else "WHERE expires_on <= CURRENT_DATE"
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT api_refresh_patient_summary(patient_id) "
+                f"FROM api_patientsummary {condition}"
+            )
+            refreshed = cursor.rowcount
+            if refreshed:
+                invalidate_patient_lists()
+        self.stdout.write(
+            self.style.SUCCESS(f"Refreshed {refreshed} patient summaries")
+        )
@@ -0,0 +1,122 @@
+"""
+This module provides a Django management command relaying outbox events to consumers.
+
+Runs as a long-lived worker publishing new events to the sink of every consumer in
+OUTBOX_CONSUMERS (see api.outbox). Delivery is at least once: a batch is retried
+until its sink accepts it, and consumers deduplicate by event ID.
+
+Usage:
+    python manage.py relay_outbox
+    python manage.py relay_outbox --consumer billing --batch-size 500
+    python manage.py relay_outbox --once
+"""
+
+import logging
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError
+
+from api.outbox import acquire_consumer_lock, get_sink, prune_events, relay_batch
+
+logger = logging.getLogger(__name__)
+
+# Seconds between pruning runs, and the longest back-off after sink failures
+PRUNE_INTERVAL = 3600
+MAX_RETRY_DELAY = 60
+
+
+class Command(BaseCommand):
+    """
+    Django management command to publish outbox events.
+
+    Each consumer is served by at most one relay process at a time, enforced
+    by a Postgres advisory lock. Sink failures back off exponentially per
+    consumer without delaying the others; database errors end the command
+    so that its supervisor restarts it.
+    """
+
+    help = "Publishes outbox events to the configured consumers"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--consumer",
+            action="append",
+            choices=list(settings.OUTBOX_CONSUMERS),
+            help="Consumer to serve (repeatable, default: all)",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=100, help="Events per batch"
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1.0,
+            help="Seconds to wait for new events when idle",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once every consumer is caught up",
+        )
+
+    def handle(self, *args, **options):
+        """
+        Execute the relay loop.
+
+        Process:
+        1. Locks every served consumer
+        2. Publishes batches until no consumer has pending events
+        3. Waits for new events, pruning delivered ones periodically
+        """
+        consumers = options["consumer"] or list(settings.OUTBOX_CONSUMERS)
+        for consumer in consumers:
+            if not acquire_consumer_lock(consumer):
+                raise CommandError(f"Another relay is serving consumer {consumer}")
+        sinks = {consumer: get_sink(consumer) for consumer in consumers}
+        failures = dict.fromkeys(consumers, 0)
+        retry_at = dict.fromkeys(consumers, 0.0)
+        pruned_at = 0.0
+        self.stdout.write(f"Relaying outbox events to {', '.join(consumers)}")
+
+        while True:
+            busy = False
+            for consumer, sink in sinks.items():
+                if time.monotonic() < retry_at[consumer]:
+                    continue
+                try:
+                    published, has_more = relay_batch(
+                        consumer, sink, options["batch_size"]
+                    )
+                except DatabaseError:
+                    raise
+                except Exception as e:
+                    if options["once"]:
+                        raise CommandError(
+                            f"Publishing to {consumer} failed: {e}"
+                        ) from e
+                    failures[consumer] += 1
+                    delay = min(
+                        options["interval"] * 2 ** failures[consumer], MAX_RETRY_DELAY
+                    )
+                    retry_at[consumer] = time.monotonic() + delay
+                    logger.error(
+                        f"Publishing to {consumer} failed, retrying in {delay:.0f}s: {e}"
+                    )
+                    continue
+
+                failures[consumer] = 0
+                busy = busy or has_more
+                if published:
+                    logger.info(f"Published {published} outbox events to {consumer}")
+
+            if time.monotonic() - pruned_at > PRUNE_INTERVAL:
+                prune_events()
+                pruned_at = time.monotonic()
+            if not busy:
+                if options["once"]:
+                    break
+                time.sleep(options["interval"])
+
+        self.stdout.write(self.style.SUCCESS("Every consumer is caught up"))
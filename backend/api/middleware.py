@@ -0,0 +1,94 @@
+"""
+This module provides middleware for the StellarCare application.
+
+Features:
+- Session middleware skipped for token-authenticated API requests
+- Read replica routing for safe API requests
+- Read-your-writes stickiness after successful writes
+- Sync and async request handling
+"""
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.contrib.auth import middleware as auth
+from django.contrib.messages import middleware as messages
+from django.contrib.sessions import middleware as sessions
+
+from . import routers
+
+
+def is_token_api_request(request):
+    """
+    Returns whether a request can skip the session middleware.
+
+    API requests carrying a bearer token are authenticated by DRF from the
+    token alone and never use the session, the request user or messages.
+    """
+    return request.path.startswith("/api/") and request.headers.get(
+        "Authorization", ""
+    ).startswith("Bearer ")
+
+
+class TokenRequestExemptMixin:
+    """
+    Skips a middleware for bearer token API requests (see is_token_api_request).
+
+    The middleware keeps running for everything else, e.g. the admin and
+    session users. Works in sync and async mode, as the wrapped middleware's
+    get_response is returned as is.
+    """
+
+    def __call__(self, request):
+        if is_token_api_request(request):
+            return self.get_response(request)
+        return super().__call__(request)
+
+
+class SessionMiddleware(TokenRequestExemptMixin, sessions.SessionMiddleware):
+    """Django's SessionMiddleware, skipped for bearer token API requests."""
+
+
+class AuthenticationMiddleware(TokenRequestExemptMixin, auth.AuthenticationMiddleware):
+    """Django's AuthenticationMiddleware, skipped for bearer token API requests."""
+
+
+class MessageMiddleware(TokenRequestExemptMixin, messages.MessageMiddleware):
+    """Django's MessageMiddleware, skipped for bearer token API requests."""
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Scopes database routing decisions to the current request.
+
+    Safe API requests may read from replicas (see api.routers.ReplicaRouter).
+    After a successful write the requesting user is pinned to the primary,
+    so their next reads see their own changes.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        token = routers.begin_request(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            routers.end_request(token)
+        routers.record_write(request, response)
+        return response
+
+    async def __acall__(self, request):
+        token = routers.begin_request(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            routers.end_request(token)
+        await sync_to_async(routers.record_write)(request, response)
+        return response
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0004_record_modified_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="patient",
+            name="version",
+            field=models.PositiveIntegerField(
+                default=1,
+                editable=False,
+                help_text="Incremented on every update, for optimistic concurrency control",
+            ),
+        ),
+    ]
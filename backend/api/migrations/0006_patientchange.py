@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:29
+
+from django.db import migrations, models
+
+import api.models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0005_patient_version"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PatientChange",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "transaction_id",
+                    models.BigIntegerField(
+                        db_default=api.models.CurrentTransactionId()
+                    ),
+                ),
+                ("patient_id", models.IntegerField(blank=True, null=True)),
+                ("changed_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["transaction_id", "id"], name="patientchange_cursor_idx"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,88 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:32
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+import api.models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0006_patientchange"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OutboxOffset",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("consumer", models.CharField(max_length=100, unique=True)),
+                ("transaction_id", models.BigIntegerField(default=0)),
+                ("event_id", models.BigIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="OutboxEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "transaction_id",
+                    models.BigIntegerField(
+                        db_default=api.models.CurrentTransactionId()
+                    ),
+                ),
+                (
+                    "topic",
+                    models.CharField(
+                        help_text="Type of the changed object", max_length=50
+                    ),
+                ),
+                ("object_id", models.IntegerField()),
+                (
+                    "event",
+                    models.CharField(
+                        choices=[
+                            ("created", "Created"),
+                            ("updated", "Updated"),
+                            ("deleted", "Deleted"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "payload",
+                    models.JSONField(
+                        blank=True,
+                        encoder=django.core.serializers.json.DjangoJSONEncoder,
+                        help_text="API representation of the object; empty for deletions",
+                        null=True,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["transaction_id", "id"], name="outboxevent_cursor_idx"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,74 @@
+from django.db import migrations
+
+# Sends a notification on the stellarcare_changes channel for every patient and
+# visit change, delivered to listeners when the transaction commits (see
+# api.notifications). Links between patients and visits are sent as visit
+# inserts and deletes for the linked patient, so that streams following a
+# patient see visits added to and removed from it.
+CREATE_SQL = """
+CREATE FUNCTION api_notify_change() RETURNS trigger AS $$
+DECLARE
+    changed record;
+    patient_ids integer[];
+    topic text := 'visit';
+    object_id integer;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        changed := OLD;
+    ELSE
+        changed := NEW;
+    END IF;
+
+    IF TG_TABLE_NAME = 'api_patient' THEN
+        topic := 'patient';
+        object_id := changed.id;
+        patient_ids := ARRAY[changed.id];
+    ELSIF TG_TABLE_NAME = 'api_visit' THEN
+        object_id := changed.id;
+        SELECT coalesce(array_agg(patient_id), '{}') INTO patient_ids
+        FROM api_patient_appointments
+        WHERE visit_id = changed.id;
+    ELSE
+        object_id := changed.visit_id;
+        patient_ids := ARRAY[changed.patient_id];
+    END IF;
+
+    PERFORM pg_notify(
+        'stellarcare_changes',
+        json_build_object(
+            'topic', topic, 'op', TG_OP, 'id', object_id, 'patients', patient_ids
+        )::text
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER api_patient_notify
+AFTER INSERT OR UPDATE OR DELETE ON api_patient
+FOR EACH ROW EXECUTE FUNCTION api_notify_change();
+
+CREATE TRIGGER api_visit_notify
+AFTER INSERT OR UPDATE OR DELETE ON api_visit
+FOR EACH ROW EXECUTE FUNCTION api_notify_change();
+
+CREATE TRIGGER api_patient_appointments_notify
+AFTER INSERT OR DELETE ON api_patient_appointments
+FOR EACH ROW EXECUTE FUNCTION api_notify_change();
+"""
+
+DROP_SQL = """
+DROP TRIGGER api_patient_appointments_notify ON api_patient_appointments;
+DROP TRIGGER api_visit_notify ON api_visit;
+DROP TRIGGER api_patient_notify ON api_patient;
+DROP FUNCTION api_notify_change();
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0007_outbox"),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_SQL, DROP_SQL),
+    ]
@@ -0,0 +1,239 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# api_refresh_patient_summary() recomputes the summary of a patient. Triggers
+# call it whenever a patient's records, or their links to the patient,
+# change; summaries of new patients are created by a trigger on api_patient.
+# CURRENT_DATE is the date in the session time zone (UTC, set by Django).
+CREATE_SQL = """
+CREATE FUNCTION api_refresh_patient_summary(target integer) RETURNS void AS $$
+DECLARE
+    study record;
+    visit record;
+    treatments record;
+    coverage record;
+BEGIN
+    SELECT s.ahi, s.date INTO study
+    FROM api_sleepstudy s
+    JOIN api_patient_studies l ON l.sleepstudy_id = s.id
+    WHERE l.patient_id = target
+    ORDER BY s.date DESC, s.id DESC
+    LIMIT 1;
+
+    SELECT v.date, v.time INTO visit
+    FROM api_visit v
+    JOIN api_patient_appointments l ON l.visit_id = v.id
+    WHERE l.patient_id = target
+        AND v.status = 'Scheduled'
+        AND v.date >= CURRENT_DATE
+    ORDER BY v.date, v.time, v.id
+    LIMIT 1;
+
+    -- changes_on: the next start or end of a treatment
+    SELECT
+        count(*) FILTER (
+            WHERE t.start_date <= CURRENT_DATE
+                AND (t.end_date IS NULL OR t.end_date >= CURRENT_DATE)
+        ) AS active,
+        min(CASE
+            WHEN t.start_date > CURRENT_DATE THEN t.start_date
+            WHEN t.end_date >= CURRENT_DATE THEN t.end_date + 1
+        END) AS changes_on
+    INTO treatments
+    FROM api_treatment t
+    JOIN api_patient_treatments l ON l.treatment_id = t.id
+    WHERE l.patient_id = target;
+
+    SELECT i.authorization_status, i.authorization_expiry INTO coverage
+    FROM api_insurance i
+    JOIN api_patient_insurance l ON l.insurance_id = i.id
+    WHERE l.patient_id = target
+    ORDER BY i.authorization_expiry DESC NULLS LAST, i.id DESC
+    LIMIT 1;
+
+    -- Only existing summaries are updated: a patient being deleted loses its
+    -- summary before its links
+    UPDATE api_patientsummary SET
+        latest_ahi = study.ahi,
+        latest_study_date = study.date,
+        next_visit_date = visit.date,
+        next_visit_time = visit.time,
+        active_treatment_count = treatments.active,
+        authorization_status = coverage.authorization_status,
+        authorization_expiry = coverage.authorization_expiry,
+        expires_on = LEAST(visit.date + 1, treatments.changes_on)
+    WHERE patient_id = target;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE FUNCTION api_create_patient_summary() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO api_patientsummary (patient_id) VALUES (NEW.id);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER api_patient_summary
+AFTER INSERT ON api_patient
+FOR EACH ROW EXECUTE FUNCTION api_create_patient_summary();
+
+-- A record linked to or unlinked from a patient
+CREATE FUNCTION api_refresh_linked_patient() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        PERFORM api_refresh_patient_summary(OLD.patient_id);
+    ELSE
+        PERFORM api_refresh_patient_summary(NEW.patient_id);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- A record updated: refreshes its patients, found through the link table
+-- and record column given as trigger arguments
+CREATE FUNCTION api_refresh_record_patients() RETURNS trigger AS $$
+BEGIN
+    EXECUTE format(
+        'SELECT api_refresh_patient_summary(patient_id) FROM %I WHERE %I = $1',
+        TG_ARGV[0],
+        TG_ARGV[1]
+    ) USING NEW.id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# Record tables, the columns the summary depends on, and their link tables
+SUMMARY_RECORDS = [
+    ("api_sleepstudy", "date, ahi", "api_patient_studies", "sleepstudy_id"),
+    ("api_visit", "date, time, status", "api_patient_appointments", "visit_id"),
+    ("api_treatment", "start_date, end_date", "api_patient_treatments", "treatment_id"),
+    (
+        "api_insurance",
+        "authorization_status, authorization_expiry",
+        "api_patient_insurance",
+        "insurance_id",
+    ),
+]
+
+for record_table, columns, link_table, record_column in SUMMARY_RECORDS:
+    CREATE_SQL += f"""
+CREATE TRIGGER {link_table}_summary
+AFTER INSERT OR DELETE ON {link_table}
+FOR EACH ROW EXECUTE FUNCTION api_refresh_linked_patient();
+
+CREATE TRIGGER {record_table}_summary
+AFTER UPDATE OF {columns} ON {record_table}
+FOR EACH ROW EXECUTE FUNCTION api_refresh_record_patients(
+    '{link_table}', '{record_column}'
+);
+"""
+
+BACKFILL_SQL = """
+INSERT INTO api_patientsummary (patient_id) SELECT id FROM api_patient;
+SELECT api_refresh_patient_summary(patient_id) FROM api_patientsummary;
+"""
+
+DROP_SQL = "".join(
+    f"""
+DROP TRIGGER {link_table}_summary ON {link_table};
+DROP TRIGGER {record_table}_summary ON {record_table};
+"""
+    for record_table, _, link_table, _ in SUMMARY_RECORDS
+)
+DROP_SQL += """
+DROP TRIGGER api_patient_summary ON api_patient;
+DROP FUNCTION api_refresh_record_patients();
+DROP FUNCTION api_refresh_linked_patient();
+DROP FUNCTION api_create_patient_summary();
+DROP FUNCTION api_refresh_patient_summary(integer);
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0009_cacheversion"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PatientSummary",
+            fields=[
+                (
+                    "patient",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="summary",
+                        serialize=False,
+                        to="api.patient",
+                    ),
+                ),
+                (
+                    "latest_ahi",
+                    models.FloatField(
+                        blank=True,
+                        help_text="AHI of the most recent sleep study",
+                        null=True,
+                    ),
+                ),
+                ("latest_study_date", models.DateField(blank=True, null=True)),
+                (
+                    "next_visit_date",
+                    models.DateField(
+                        blank=True,
+                        help_text="Date of the next scheduled visit",
+                        null=True,
+                    ),
+                ),
+                ("next_visit_time", models.TimeField(blank=True, null=True)),
+                ("active_treatment_count", models.PositiveIntegerField(db_default=0)),
+                (
+                    "authorization_status",
+                    models.CharField(
+                        blank=True,
+                        help_text="Authorization status of the insurance authorized the longest",
+                        max_length=50,
+                        null=True,
+                    ),
+                ),
+                ("authorization_expiry", models.DateField(blank=True, null=True)),
+                (
+                    "expires_on",
+                    models.DateField(
+                        blank=True,
+                        help_text="Date from which the figures are outdated by the date alone",
+                        null=True,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        models.OrderBy(
+                            models.F("latest_ahi"), descending=True, nulls_last=True
+                        ),
+                        name="patientsummary_ahi_idx",
+                    ),
+                    models.Index(
+                        fields=["next_visit_date", "next_visit_time"],
+                        name="patientsummary_next_visit_idx",
+                    ),
+                    models.Index(
+                        fields=["active_treatment_count"],
+                        name="patientsummary_treatments_idx",
+                    ),
+                    models.Index(
+                        fields=["authorization_status"], name="patientsummary_auth_idx"
+                    ),
+                    models.Index(
+                        fields=["expires_on"], name="patientsummary_expires_idx"
+                    ),
+                ],
+            },
+        ),
+        migrations.RunSQL(CREATE_SQL, DROP_SQL),
+        migrations.RunSQL(BACKFILL_SQL, migrations.RunSQL.noop),
+    ]
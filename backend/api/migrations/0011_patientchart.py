@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Requests a chart of every existing patient, built by the chart builder
+REQUEST_CHARTS_SQL = """
+INSERT INTO api_patientchart (patient_id, requested, built, requested_at)
+SELECT id, 1, 0, now() FROM api_patient
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0010_patientsummary"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PatientChart",
+            fields=[
+                (
+                    "patient",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="chart",
+                        serialize=False,
+                        to="api.patient",
+                    ),
+                ),
+                ("requested", models.PositiveBigIntegerField(default=1)),
+                ("built", models.PositiveBigIntegerField(default=0)),
+                ("requested_at", models.DateTimeField()),
+                ("built_at", models.DateTimeField(blank=True, null=True)),
+                ("document", models.BinaryField(blank=True, null=True)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("built__lt", models.F("requested"))),
+                        fields=["requested_at"],
+                        name="patientchart_stale_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.RunSQL(REQUEST_CHARTS_SQL, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,138 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Record tables, their link tables to patients, and the link tables' record column
+RECORD_LINKS = [
+    ("api_sleepstudy", "api_patient_studies", "sleepstudy_id"),
+    ("api_treatment", "api_patient_treatments", "treatment_id"),
+    ("api_insurance", "api_patient_insurance", "insurance_id"),
+    ("api_visit", "api_patient_appointments", "visit_id"),
+]
+
+# A record's patient is the patient it was first linked to. Unlinked from
+# that patient, it moves to the remaining linked patient with the lowest id,
+# or to none; the condition on NULL covers the patient being deleted, whose
+# records Django sets to NULL before or after deleting the links.
+CREATE_SQL = ""
+DROP_SQL = ""
+for record_table, link_table, record_column in RECORD_LINKS:
+    CREATE_SQL += f"""
+CREATE FUNCTION {record_table}_sync_patient() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE {record_table} SET patient_id = NEW.patient_id
+        WHERE id = NEW.{record_column} AND patient_id IS NULL;
+    ELSE
+        UPDATE {record_table} r SET patient_id = l.patient_id
+        FROM (
+            SELECT min(patient_id) AS patient_id
+            FROM {link_table} WHERE {record_column} = OLD.{record_column}
+        ) l
+        WHERE r.id = OLD.{record_column}
+            AND (r.patient_id = OLD.patient_id OR r.patient_id IS NULL)
+            AND r.patient_id IS DISTINCT FROM l.patient_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER {link_table}_record_patient
+AFTER INSERT OR DELETE ON {link_table}
+FOR EACH ROW EXECUTE FUNCTION {record_table}_sync_patient();
+"""
+    DROP_SQL += f"""
+DROP TRIGGER {link_table}_record_patient ON {link_table};
+DROP FUNCTION {record_table}_sync_patient();
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0011_patientchart"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="insurance",
+            name="patient",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                help_text="Patient the insurance is linked to, kept in sync with the patient's insurance",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="api.patient",
+            ),
+        ),
+        migrations.AddField(
+            model_name="sleepstudy",
+            name="patient",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                help_text="Patient the study is linked to, kept in sync with the patient's studies",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="api.patient",
+            ),
+        ),
+        migrations.AddField(
+            model_name="treatment",
+            name="patient",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                help_text="Patient the treatment is linked to, kept in sync with the patient's treatments",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="api.patient",
+            ),
+        ),
+        migrations.AddField(
+            model_name="visit",
+            name="patient",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                help_text="Patient the visit is linked to, kept in sync with the patient's appointments",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="api.patient",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="patient",
+            name="appointments",
+            field=models.ManyToManyField(
+                blank=True, related_query_name="patients", to="api.visit"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="patient",
+            name="insurance",
+            field=models.ManyToManyField(
+                blank=True, related_query_name="patients", to="api.insurance"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="patient",
+            name="studies",
+            field=models.ManyToManyField(
+                blank=True, related_query_name="patients", to="api.sleepstudy"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="patient",
+            name="treatments",
+            field=models.ManyToManyField(
+                blank=True, related_query_name="patients", to="api.treatment"
+            ),
+        ),
+        migrations.RunSQL(CREATE_SQL, DROP_SQL),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:48
+
+from django.db import migrations
+
+BATCH_SIZE = 5000
+
+# Record tables, their link tables to patients, and the link tables' record column
+RECORD_LINKS = [
+    ("api_sleepstudy", "api_patient_studies", "sleepstudy_id"),
+    ("api_treatment", "api_patient_treatments", "treatment_id"),
+    ("api_insurance", "api_patient_insurance", "insurance_id"),
+    ("api_visit", "api_patient_appointments", "visit_id"),
+]
+
+
+def backfill_record_patients(apps, schema_editor):
+    """
+    Sets the patient of the records linked before the sync triggers existed.
+
+    Runs outside a transaction, one batch of record ids per statement, so
+    that each batch commits on its own and locks its rows only briefly.
+    Records already set (e.g. linked since by the triggers) are skipped,
+    so an interrupted backfill can simply be run again.
+    """
+    with schema_editor.connection.cursor() as cursor:
+        for record_table, link_table, record_column in RECORD_LINKS:
+            cursor.execute(
+                f"SELECT min({record_column}), max({record_column}) FROM {link_table}"
+            )
+            first, last = cursor.fetchone()
+            if first is None:
+                continue
+            for start in range(first, last + 1, BATCH_SIZE):
+                cursor.execute(
+                    f"""
+                    UPDATE {record_table} r SET patient_id = l.patient_id
+                    FROM (
+                        SELECT {record_column} AS record_id, min(patient_id) AS patient_id
+                        FROM {link_table}
+                        WHERE {record_column} >= %s AND {record_column} < %s
+                        GROUP BY {record_column}
+                    ) l
+                    WHERE r.id = l.record_id AND r.patient_id IS NULL
+                    """,
+                    [start, start + BATCH_SIZE],
+                )
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("api", "0012_record_patient"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_record_patients, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0013_backfill_record_patient"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="visit",
+            index=models.Index(
+                fields=["date", "time", "id"], name="visit_calendar_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="visit",
+            index=models.Index(
+                fields=["status", "date", "time", "id"],
+                name="visit_status_calendar_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,106 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:53
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0014_visit_calendar_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="visit",
+            name="occurrence_date",
+            field=models.DateField(
+                blank=True,
+                help_text="Date of the replaced occurrence, which the visit may have moved from",
+                null=True,
+            ),
+        ),
+        migrations.CreateModel(
+            name="VisitSeries",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "type",
+                    models.CharField(
+                        choices=[
+                            ("In-Person", "In-Person"),
+                            ("Telehealth", "Telehealth"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("time", models.TimeField()),
+                (
+                    "start_date",
+                    models.DateField(help_text="Date of the first occurrence"),
+                ),
+                (
+                    "interval_days",
+                    models.PositiveIntegerField(
+                        help_text="Days between occurrences",
+                        validators=[django.core.validators.MinValueValidator(1)],
+                    ),
+                ),
+                (
+                    "end_date",
+                    models.DateField(
+                        blank=True,
+                        help_text="No occurrences after this date; leave empty for open-ended series",
+                        null=True,
+                    ),
+                ),
+                ("notes", models.TextField(blank=True, null=True)),
+                ("zoom_link", models.URLField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("modified_at", models.DateTimeField(auto_now=True)),
+                (
+                    "patient",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="visit_series",
+                        to="api.patient",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "visit series",
+            },
+        ),
+        migrations.AddField(
+            model_name="visit",
+            name="series",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="Series of the occurrence this visit replaces",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="visits",
+                to="api.visitseries",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="visit",
+            constraint=models.UniqueConstraint(
+                fields=("series", "occurrence_date"), name="visit_unique_occurrence"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="visitseries",
+            index=models.Index(
+                fields=["start_date", "end_date"], name="visitseries_range_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:56
+
+import django.contrib.postgres.fields.ranges
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0015_visitseries"),
+    ]
+
+    operations = [
+        # Rows ending before they start could not be given a period
+        migrations.AddConstraint(
+            model_name="treatment",
+            constraint=models.CheckConstraint(
+                condition=models.Q(
+                    ("end_date__isnull", True),
+                    ("end_date__gte", models.F("start_date")),
+                    _connector="OR",
+                ),
+                name="treatment_end_after_start",
+            ),
+        ),
+        migrations.AddField(
+            model_name="treatment",
+            name="period",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=models.Func(
+                    models.F("start_date"),
+                    models.F("end_date"),
+                    models.Value("[]"),
+                    function="daterange",
+                ),
+                help_text="Days of the treatment, both dates included; unbounded while ongoing",
+                output_field=django.contrib.postgres.fields.ranges.DateRangeField(),
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="treatment",
+            index=django.contrib.postgres.indexes.GistIndex(
+                fields=["period"], name="treatment_period_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="treatment",
+            index=models.Index(fields=["start_date", "id"], name="treatment_start_idx"),
+        ),
+    ]
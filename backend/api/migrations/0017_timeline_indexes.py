@@ -0,0 +1,81 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0016_treatment_period"),
+    ]
+
+    operations = [
+        # The composite indexes replace the patient indexes, so are built first
+        migrations.AddIndex(
+            model_name="sleepstudy",
+            index=models.Index(
+                fields=["patient", "date", "id"], name="sleepstudy_patient_date_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="treatment",
+            index=models.Index(
+                fields=["patient", "start_date", "id"],
+                name="treatment_patient_start_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="treatment",
+            index=models.Index(
+                fields=["patient", "end_date", "id"], name="treatment_patient_end_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="visit",
+            index=models.Index(
+                fields=["patient", "date", "time", "id"], name="visit_patient_date_idx"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="sleepstudy",
+            name="patient",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                editable=False,
+                help_text="Patient the study is linked to, kept in sync with the patient's studies",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="api.patient",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="treatment",
+            name="patient",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                editable=False,
+                help_text="Patient the treatment is linked to, kept in sync with the patient's treatments",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="api.patient",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="visit",
+            name="patient",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                editable=False,
+                help_text="Patient the visit is linked to, kept in sync with the patient's appointments",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="api.patient",
+            ),
+        ),
+    ]
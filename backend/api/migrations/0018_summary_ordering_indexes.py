@@ -0,0 +1,123 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0017_timeline_indexes"),
+    ]
+
+    operations = [
+        # The new indexes are built before the ones they replace are dropped
+        migrations.AddIndex(
+            model_name="patientsummary",
+            index=models.Index(
+                models.OrderBy(models.F("latest_ahi"), nulls_last=True),
+                models.OrderBy(models.F("patient")),
+                name="patientsummary_ahi_asc_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="patientsummary",
+            index=models.Index(
+                models.OrderBy(
+                    models.F("latest_ahi"), descending=True, nulls_last=True
+                ),
+                models.OrderBy(models.F("patient"), descending=True),
+                name="patientsummary_ahi_desc_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="patientsummary",
+            index=models.Index(
+                models.OrderBy(models.F("next_visit_date"), nulls_last=True),
+                models.OrderBy(models.F("next_visit_time"), nulls_last=True),
+                models.OrderBy(models.F("patient")),
+                name="patientsummary_visit_asc_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="patientsummary",
+            index=models.Index(
+                models.OrderBy(
+                    models.F("next_visit_date"), descending=True, nulls_last=True
+                ),
+                models.OrderBy(
+                    models.F("next_visit_time"), descending=True, nulls_last=True
+                ),
+                models.OrderBy(models.F("patient"), descending=True),
+                name="patientsummary_visit_desc_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="patientsummary",
+            index=models.Index(
+                models.OrderBy(models.F("active_treatment_count"), nulls_last=True),
+                models.OrderBy(models.F("patient")),
+                name="patientsummary_treat_asc_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="patientsummary",
+            index=models.Index(
+                models.OrderBy(
+                    models.F("active_treatment_count"), descending=True, nulls_last=True
+                ),
+                models.OrderBy(models.F("patient"), descending=True),
+                name="patientsummary_treat_desc_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="patientsummary",
+            index=models.Index(
+                models.OrderBy(models.F("authorization_status"), nulls_last=True),
+                models.OrderBy(models.F("patient")),
+                name="patientsummary_auth_asc_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="patientsummary",
+            index=models.Index(
+                models.OrderBy(
+                    models.F("authorization_status"), descending=True, nulls_last=True
+                ),
+                models.OrderBy(models.F("patient"), descending=True),
+                name="patientsummary_auth_desc_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="patientsummary",
+            index=models.Index(
+                models.OrderBy(models.F("authorization_expiry"), nulls_last=True),
+                models.OrderBy(models.F("patient")),
+                name="patientsummary_expiry_asc_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="patientsummary",
+            index=models.Index(
+                models.OrderBy(
+                    models.F("authorization_expiry"), descending=True, nulls_last=True
+                ),
+                models.OrderBy(models.F("patient"), descending=True),
+                name="patientsummary_expiry_desc_idx",
+            ),
+        ),
+        migrations.RemoveIndex(
+            model_name="patientsummary",
+            name="patientsummary_ahi_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="patientsummary",
+            name="patientsummary_next_visit_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="patientsummary",
+            name="patientsummary_treatments_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="patientsummary",
+            name="patientsummary_auth_idx",
+        ),
+    ]
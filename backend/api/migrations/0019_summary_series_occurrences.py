@@ -0,0 +1,217 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:12
+
+from django.db import migrations
+
+# api_refresh_patient_summary() of 0010_patientsummary, whose next visit now
+# includes the unwritten occurrences of the patient's visit series. Triggers
+# refresh the patient of a series when it changes, and when a written
+# occurrence is deleted or detached (its occurrence is then unwritten again).
+REFRESH_SQL = """
+CREATE OR REPLACE FUNCTION api_refresh_patient_summary(target integer) RETURNS void AS $$
+DECLARE
+    study record;
+    visit record;
+    treatments record;
+    coverage record;
+BEGIN
+    SELECT s.ahi, s.date INTO study
+    FROM api_sleepstudy s
+    JOIN api_patient_studies l ON l.sleepstudy_id = s.id
+    WHERE l.patient_id = target
+    ORDER BY s.date DESC, s.id DESC
+    LIMIT 1;
+
+    -- The next scheduled visit or unwritten occurrence of a visit series. Of
+    -- each series, its occurrences from the first on or after today are tried,
+    -- one more than its occurrences written since, so one is unwritten unless
+    -- the series ends first
+    SELECT upcoming.date, upcoming.time INTO visit
+    FROM (
+        SELECT v.date, v.time
+        FROM api_visit v
+        JOIN api_patient_appointments l ON l.visit_id = v.id
+        WHERE l.patient_id = target
+            AND v.status = 'Scheduled'
+            AND v.date >= CURRENT_DATE
+        UNION ALL
+        SELECT o.date, s.time
+        FROM api_visitseries s
+        CROSS JOIN LATERAL (
+            SELECT
+                (GREATEST(CURRENT_DATE - s.start_date, 0) + s.interval_days - 1)
+                    / s.interval_days AS first,
+                (
+                    SELECT count(*)::integer
+                    FROM api_visit w
+                    WHERE w.series_id = s.id AND w.occurrence_date >= CURRENT_DATE
+                ) AS written
+        ) f
+        CROSS JOIN LATERAL generate_series(f.first, f.first + f.written) n
+        CROSS JOIN LATERAL (SELECT s.start_date + n * s.interval_days AS date) o
+        WHERE s.patient_id = target
+            AND (s.end_date IS NULL OR o.date <= s.end_date)
+            AND NOT EXISTS (
+                SELECT 1
+                FROM api_visit w
+                WHERE w.series_id = s.id AND w.occurrence_date = o.date
+            )
+    ) upcoming
+    ORDER BY upcoming.date, upcoming.time
+    LIMIT 1;
+
+    -- changes_on: the next start or end of a treatment
+    SELECT
+        count(*) FILTER (
+            WHERE t.start_date <= CURRENT_DATE
+                AND (t.end_date IS NULL OR t.end_date >= CURRENT_DATE)
+        ) AS active,
+        min(CASE
+            WHEN t.start_date > CURRENT_DATE THEN t.start_date
+            WHEN t.end_date >= CURRENT_DATE THEN t.end_date + 1
+        END) AS changes_on
+    INTO treatments
+    FROM api_treatment t
+    JOIN api_patient_treatments l ON l.treatment_id = t.id
+    WHERE l.patient_id = target;
+
+    SELECT i.authorization_status, i.authorization_expiry INTO coverage
+    FROM api_insurance i
+    JOIN api_patient_insurance l ON l.insurance_id = i.id
+    WHERE l.patient_id = target
+    ORDER BY i.authorization_expiry DESC NULLS LAST, i.id DESC
+    LIMIT 1;
+
+    -- Only existing summaries are updated: a patient being deleted loses its
+    -- summary before its links
+    UPDATE api_patientsummary SET
+        latest_ahi = study.ahi,
+        latest_study_date = study.date,
+        next_visit_date = visit.date,
+        next_visit_time = visit.time,
+        active_treatment_count = treatments.active,
+        authorization_status = coverage.authorization_status,
+        authorization_expiry = coverage.authorization_expiry,
+        expires_on = LEAST(visit.date + 1, treatments.changes_on)
+    WHERE patient_id = target;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+REFRESH_TRIGGERS_SQL = """
+CREATE FUNCTION api_refresh_series_patient() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM api_refresh_patient_summary(OLD.patient_id);
+    END IF;
+    IF TG_OP = 'INSERT' OR (TG_OP = 'UPDATE' AND NEW.patient_id <> OLD.patient_id) THEN
+        PERFORM api_refresh_patient_summary(NEW.patient_id);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER api_visitseries_summary
+AFTER INSERT OR DELETE
+    OR UPDATE OF patient_id, time, start_date, interval_days, end_date
+ON api_visitseries
+FOR EACH ROW EXECUTE FUNCTION api_refresh_series_patient();
+
+-- OLD and NEW are null in DELETE and INSERT triggers respectively
+CREATE FUNCTION api_refresh_occurrence_patient() RETURNS trigger AS $$
+BEGIN
+    PERFORM api_refresh_patient_summary(s.patient_id)
+    FROM api_visitseries s
+    WHERE s.id IN (OLD.series_id, NEW.series_id);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER api_visit_occurrence_summary
+AFTER DELETE OR UPDATE OF series_id, occurrence_date ON api_visit
+FOR EACH ROW EXECUTE FUNCTION api_refresh_occurrence_patient();
+"""
+
+DROP_TRIGGERS_SQL = """
+DROP TRIGGER api_visit_occurrence_summary ON api_visit;
+DROP FUNCTION api_refresh_occurrence_patient();
+DROP TRIGGER api_visitseries_summary ON api_visitseries;
+DROP FUNCTION api_refresh_series_patient();
+"""
+
+RESTORE_SQL = """
+CREATE OR REPLACE FUNCTION api_refresh_patient_summary(target integer) RETURNS void AS $$
+DECLARE
+    study record;
+    visit record;
+    treatments record;
+    coverage record;
+BEGIN
+    SELECT s.ahi, s.date INTO study
+    FROM api_sleepstudy s
+    JOIN api_patient_studies l ON l.sleepstudy_id = s.id
+    WHERE l.patient_id = target
+    ORDER BY s.date DESC, s.id DESC
+    LIMIT 1;
+
+    SELECT v.date, v.time INTO visit
+    FROM api_visit v
+    JOIN api_patient_appointments l ON l.visit_id = v.id
+    WHERE l.patient_id = target
+        AND v.status = 'Scheduled'
+        AND v.date >= CURRENT_DATE
+    ORDER BY v.date, v.time, v.id
+    LIMIT 1;
+
+    -- changes_on: the next start or end of a treatment
+    SELECT
+        count(*) FILTER (
+            WHERE t.start_date <= CURRENT_DATE
+                AND (t.end_date IS NULL OR t.end_date >= CURRENT_DATE)
+        ) AS active,
+        min(CASE
+            WHEN t.start_date > CURRENT_DATE THEN t.start_date
+            WHEN t.end_date >= CURRENT_DATE THEN t.end_date + 1
+        END) AS changes_on
+    INTO treatments
+    FROM api_treatment t
+    JOIN api_patient_treatments l ON l.treatment_id = t.id
+    WHERE l.patient_id = target;
+
+    SELECT i.authorization_status, i.authorization_expiry INTO coverage
+    FROM api_insurance i
+    JOIN api_patient_insurance l ON l.insurance_id = i.id
+    WHERE l.patient_id = target
+    ORDER BY i.authorization_expiry DESC NULLS LAST, i.id DESC
+    LIMIT 1;
+
+    -- Only existing summaries are updated: a patient being deleted loses its
+    -- summary before its links
+    UPDATE api_patientsummary SET
+        latest_ahi = study.ahi,
+        latest_study_date = study.date,
+        next_visit_date = visit.date,
+        next_visit_time = visit.time,
+        active_treatment_count = treatments.active,
+        authorization_status = coverage.authorization_status,
+        authorization_expiry = coverage.authorization_expiry,
+        expires_on = LEAST(visit.date + 1, treatments.changes_on)
+    WHERE patient_id = target;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+REFRESH_ALL_SQL = """
+SELECT api_refresh_patient_summary(patient_id) FROM api_patientsummary;
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0018_summary_ordering_indexes"),
+    ]
+
+    operations = [
+        migrations.RunSQL(REFRESH_SQL, RESTORE_SQL),
+        migrations.RunSQL(REFRESH_TRIGGERS_SQL, DROP_TRIGGERS_SQL),
+        migrations.RunSQL(REFRESH_ALL_SQL, REFRESH_ALL_SQL),
+    ]
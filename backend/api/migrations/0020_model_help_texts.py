@@ -0,0 +1,124 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:40
+
+from django.db import migrations, models
+
+import api.models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0019_summary_series_occurrences"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="customfielddefinition",
+            name="description",
+            field=models.TextField(
+                blank=True,
+                help_text="Detailed description of the field's purpose and usage",
+                null=True,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="customfielddefinition",
+            name="display_order",
+            field=models.IntegerField(
+                default=0,
+                help_text="Order in which the field should be displayed in forms",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="customfielddefinition",
+            name="is_active",
+            field=models.BooleanField(
+                default=True, help_text="Whether this field is currently in use"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="customfielddefinition",
+            name="is_required",
+            field=models.BooleanField(
+                default=False,
+                help_text="Whether this field must be filled for all patients",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="insurance",
+            name="authorization_expiry",
+            field=models.DateField(
+                blank=True,
+                help_text="When the current authorization expires",
+                null=True,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="insurance",
+            name="authorization_status",
+            field=models.CharField(
+                blank=True,
+                help_text="Current authorization status",
+                max_length=50,
+                null=True,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="patient",
+            name="id",
+            field=models.IntegerField(
+                default=api.models.Patient.generate_patient_id,
+                editable=False,
+                help_text="Unique patient identifier starting from 100000",
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="sleepstudy",
+            name="ahi",
+            field=models.FloatField(help_text="Apnea-Hypopnea Index"),
+        ),
+        migrations.AlterField(
+            model_name="sleepstudy",
+            name="file_url",
+            field=models.URLField(
+                blank=True, help_text="URL to the full sleep study report", null=True
+            ),
+        ),
+        migrations.AlterField(
+            model_name="sleepstudy",
+            name="rem_latency",
+            field=models.FloatField(help_text="Time to REM sleep in minutes"),
+        ),
+        migrations.AlterField(
+            model_name="sleepstudy",
+            name="sleep_efficiency",
+            field=models.FloatField(help_text="Sleep efficiency percentage"),
+        ),
+        migrations.AlterField(
+            model_name="treatment",
+            name="end_date",
+            field=models.DateField(
+                blank=True, help_text="Leave empty for ongoing treatments", null=True
+            ),
+        ),
+        migrations.AlterField(
+            model_name="user",
+            name="available_custom_fields",
+            field=models.ManyToManyField(
+                blank=True,
+                help_text="Custom fields this user can view and edit",
+                related_name="assigned_users",
+                to="api.customfielddefinition",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="visit",
+            name="zoom_link",
+            field=models.URLField(
+                blank=True,
+                help_text="Zoom meeting link for telehealth visits",
+                null=True,
+            ),
+        ),
+    ]
@@ -21,10 +21,20 @@ Key features:
 - Temporal data tracking (created/modified timestamps)
 - Multi-address support
 - Insurance and visit management
+- Token revocation tracking
+- Denormalized patient summaries for sortable, filterable lists
+- Precomputed patient chart documents
+- Patient change log for incremental sync
+- Transactional outbox for downstream consumers
+- Change counters for per-process cache invalidation
 """
 
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.contrib.postgres.fields import DateRangeField
+from django.contrib.postgres.indexes import GistIndex
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.validators import MinValueValidator
+from django.db import models, router, transaction
 from django.utils.translation import gettext_lazy as _
 
 
@@ -60,6 +70,23 @@ class User(AbstractUser):
         return self.email if self.email else self.username
 
 
+class RevokedToken(models.Model):
+    """
+    Denylist entry for a revoked JSON web token.
+
+    Tokens are identified by their unique JTI claim. Entries are only needed
+    until the token would have expired anyway, after which they are pruned,
+    keeping the denylist small enough to cache as a whole.
+    """
+
+    jti = models.CharField(max_length=255, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.jti
+
+
 class Address(models.Model):
     """
     Stores physical address information.
@@ -176,7 +203,40 @@ class PatientCustomField(models.Model):
         return None
 
 
-class SleepStudy(models.Model):
+class LinkedRecord(models.Model):
+    """
+    A record linked to patients, whose patient field database triggers keep in
+    sync with the links (see migration 0012_record_patient).
+
+    Updates leave the patient out, so saving an instance loaded before a link
+    changed does not overwrite the patient the triggers set. Saves run in a
+    transaction, which the record's outbox event is written in (see
+    api.signals).
+    """
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        """Saves the record atomically; updates write every field but the patient."""
+        if (
+            not self._state.adding
+            and not kwargs.get("force_insert")
+            and kwargs.get("update_fields") is None
+        ):
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and not field.generated
+                and field.name != "patient"
+            ]
+        using = kwargs.get("using") or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+
+
+class SleepStudy(LinkedRecord):
     """
     Records sleep study results and metrics.
 
@@ -198,9 +258,29 @@ class SleepStudy(models.Model):
         null=True,
         help_text="URL to the full sleep study report",
     )
+    patient = models.ForeignKey(
+        "Patient",
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        editable=False,
+        # Covered by the patient timeline index
+        db_index=False,
+        related_name="+",
+        help_text="Patient the study is linked to, kept in sync with the patient's studies",
+    )
+    modified_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Patient timelines (see api.timeline)
+            models.Index(
+                fields=["patient", "date", "id"], name="sleepstudy_patient_date_idx"
+            ),
+        ]
 
 
-class Treatment(models.Model):
+class Treatment(LinkedRecord):
     """
     Tracks patient treatments and medications.
 
@@ -209,6 +289,8 @@ class Treatment(models.Model):
     - Dosage and frequency tracking
     - Treatment duration tracking
     - Treatment notes
+    - Treatment period as a date range, for indexed overlap and containment
+      queries (e.g. "on CPAP at any time in March")
     """
 
     name = models.CharField(max_length=255)
@@ -222,9 +304,53 @@ class Treatment(models.Model):
         help_text="Leave empty for ongoing treatments",
     )
     notes = models.TextField(blank=True, null=True)
+    patient = models.ForeignKey(
+        "Patient",
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        editable=False,
+        # Covered by the patient timeline index
+        db_index=False,
+        related_name="+",
+        help_text="Patient the treatment is linked to, kept in sync with the patient's treatments",
+    )
+    period = models.GeneratedField(
+        expression=models.Func(
+            models.F("start_date"),
+            models.F("end_date"),
+            models.Value("[]"),
+            function="daterange",
+        ),
+        output_field=DateRangeField(),
+        db_persist=True,
+        help_text="Days of the treatment, both dates included; unbounded while ongoing",
+    )
+    modified_at = models.DateTimeField(auto_now=True)
 
-
-class Insurance(models.Model):
+    class Meta:
+        indexes = [
+            GistIndex(fields=["period"], name="treatment_period_idx"),
+            models.Index(fields=["start_date", "id"], name="treatment_start_idx"),
+            # Patient timelines (see api.timeline)
+            models.Index(
+                fields=["patient", "start_date", "id"],
+                name="treatment_patient_start_idx",
+            ),
+            models.Index(
+                fields=["patient", "end_date", "id"], name="treatment_patient_end_idx"
+            ),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(end_date__isnull=True)
+                | models.Q(end_date__gte=models.F("start_date")),
+                name="treatment_end_after_start",
+            ),
+        ]
+
+
+class Insurance(LinkedRecord):
     """
     Manages patient insurance information.
 
@@ -251,9 +377,19 @@ class Insurance(models.Model):
         null=True,
         help_text="When the current authorization expires",
     )
+    patient = models.ForeignKey(
+        "Patient",
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        editable=False,
+        related_name="+",
+        help_text="Patient the insurance is linked to, kept in sync with the patient's insurance",
+    )
+    modified_at = models.DateTimeField(auto_now=True)
 
 
-class Visit(models.Model):
+class Visit(LinkedRecord):
     """
     Manages patient visits and appointments.
 
@@ -262,6 +398,7 @@ class Visit(models.Model):
     - Status tracking
     - Zoom integration for telehealth
     - Notes support
+    - Occurrences of recurring visits (VisitSeries) once edited or completed
     """
 
     VISITS_TYPES = [
@@ -286,6 +423,96 @@ class Visit(models.Model):
         null=True,
         help_text="Zoom meeting link for telehealth visits",
     )
+    patient = models.ForeignKey(
+        "Patient",
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        editable=False,
+        # Covered by the patient timeline index
+        db_index=False,
+        related_name="+",
+        help_text="Patient the visit is linked to, kept in sync with the patient's appointments",
+    )
+    series = models.ForeignKey(
+        "VisitSeries",
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name="visits",
+        help_text="Series of the occurrence this visit replaces",
+    )
+    occurrence_date = models.DateField(
+        blank=True,
+        null=True,
+        help_text="Date of the replaced occurrence, which the visit may have moved from",
+    )
+    modified_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Calendar ranges in calendar order, and their keyset pages
+            models.Index(fields=["date", "time", "id"], name="visit_calendar_idx"),
+            models.Index(
+                fields=["status", "date", "time", "id"],
+                name="visit_status_calendar_idx",
+            ),
+            # Patient timelines (see api.timeline)
+            models.Index(
+                fields=["patient", "date", "time", "id"],
+                name="visit_patient_date_idx",
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["series", "occurrence_date"],
+                name="visit_unique_occurrence",
+            ),
+        ]
+
+
+class VisitSeries(models.Model):
+    """
+    A recurring visit, stored once (e.g. follow-ups every 30 days for a year).
+
+    Occurrences fall every interval_days from start_date up to end_date (or
+    indefinitely) and are expanded when calendars are read (see
+    api.recurrence). A Visit row is written for an occurrence only once it
+    is edited, cancelled or completed; it then replaces the occurrence.
+    """
+
+    patient = models.ForeignKey(
+        "Patient",
+        on_delete=models.CASCADE,
+        related_name="visit_series",
+    )
+    type = models.CharField(max_length=20, choices=Visit.VISITS_TYPES)
+    time = models.TimeField()
+    start_date = models.DateField(help_text="Date of the first occurrence")
+    interval_days = models.PositiveIntegerField(
+        validators=[MinValueValidator(1)],
+        help_text="Days between occurrences",
+    )
+    end_date = models.DateField(
+        blank=True,
+        null=True,
+        help_text="No occurrences after this date; leave empty for open-ended series",
+    )
+    notes = models.TextField(blank=True, null=True)
+    zoom_link = models.URLField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    modified_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "visit series"
+        indexes = [
+            models.Index(
+                fields=["start_date", "end_date"], name="visitseries_range_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"Every {self.interval_days} days from {self.start_date}"
 
 
 class Patient(models.Model):
@@ -297,6 +524,8 @@ class Patient(models.Model):
     - Comprehensive demographic information
     - Status tracking
     - Temporal data tracking
+    - Version counter for optimistic concurrency control
+    - Denormalized summary for sorting and filtering (PatientSummary)
     - Multiple relationship management:
         - Addresses
         - Custom fields
@@ -340,6 +569,11 @@ class Patient(models.Model):
     status = models.CharField(max_length=20, choices=PATIENT_STATUSES)
     created_at = models.DateTimeField(auto_now_add=True)
     modified_at = models.DateTimeField(auto_now=True)
+    version = models.PositiveIntegerField(
+        default=1,
+        editable=False,
+        help_text="Incremented on every update, for optimistic concurrency control",
+    )
 
     # Relationships
     addresses = models.ManyToManyField(Address, blank=True)
@@ -348,10 +582,257 @@ class Patient(models.Model):
         through="PatientCustomField",
         blank=True,
     )
-    studies = models.ManyToManyField(SleepStudy, blank=True)
-    treatments = models.ManyToManyField(Treatment, blank=True)
-    insurance = models.ManyToManyField(Insurance, blank=True)
-    appointments = models.ManyToManyField(Visit, blank=True)
+    # Records are queried by their own patient field (a foreign key kept in
+    # sync with these relationships), so these are queried as "patients"
+    studies = models.ManyToManyField(
+        SleepStudy, blank=True, related_query_name="patients"
+    )
+    treatments = models.ManyToManyField(
+        Treatment, blank=True, related_query_name="patients"
+    )
+    insurance = models.ManyToManyField(
+        Insurance, blank=True, related_query_name="patients"
+    )
+    appointments = models.ManyToManyField(
+        Visit, blank=True, related_query_name="patients"
+    )
 
     def __str__(self):
         return f"{self.first} {self.last}"
+
+    def claim_version(self, expected_version):
+        """
+        Advances the version if it still equals expected_version.
+
+        A single conditional UPDATE, so concurrent writers are detected
+        without reading the row for update. Must run in the transaction
+        making the changes: the updated row stays locked until it commits,
+        and a concurrent claim of the same version then fails.
+
+        Returns whether the version was claimed.
+        """
+        claimed = Patient.objects.filter(pk=self.pk, version=expected_version).update(
+            version=expected_version + 1
+        )
+        if claimed:
+            self.version = expected_version + 1
+        return bool(claimed)
+
+
+def _ordering_indexes(name, *fields):
+    """
+    Returns the indexes of patient list orderings by summary fields.
+
+    Lists sort patients without a value last in both directions, then by
+    patient, so each direction needs its own index.
+    """
+    return [
+        models.Index(
+            *(models.F(field).asc(nulls_last=True) for field in fields),
+            models.F("patient").asc(),
+            name=f"patientsummary_{name}_asc_idx",
+        ),
+        models.Index(
+            *(models.F(field).desc(nulls_last=True) for field in fields),
+            models.F("patient").desc(),
+            name=f"patientsummary_{name}_desc_idx",
+        ),
+    ]
+
+
+class PatientSummary(models.Model):
+    """
+    Denormalized per-patient figures for sorting and filtering patient lists.
+
+    Maintained by database triggers on patients, their records, visit series
+    and the relationship tables (see migrations 0010 and 0019), so it is
+    updated in the transaction changing the records, including bulk and raw
+    SQL changes. The next visit includes unwritten series occurrences.
+    Figures that change with the date alone (a visit passing, a treatment
+    starting or ending) are refreshed from expires_on on by
+    manage.py refresh_patient_summaries.
+    """
+
+    patient = models.OneToOneField(
+        Patient,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="summary",
+    )
+    latest_ahi = models.FloatField(
+        blank=True, null=True, help_text="AHI of the most recent sleep study"
+    )
+    latest_study_date = models.DateField(blank=True, null=True)
+    next_visit_date = models.DateField(
+        blank=True, null=True, help_text="Date of the next scheduled visit"
+    )
+    next_visit_time = models.TimeField(blank=True, null=True)
+    active_treatment_count = models.PositiveIntegerField(db_default=0)
+    authorization_status = models.CharField(
+        max_length=50,
+        blank=True,
+        null=True,
+        help_text="Authorization status of the insurance authorized the longest",
+    )
+    authorization_expiry = models.DateField(blank=True, null=True)
+    expires_on = models.DateField(
+        blank=True,
+        null=True,
+        help_text="Date from which the figures are outdated by the date alone",
+    )
+
+    class Meta:
+        indexes = [
+            *_ordering_indexes("ahi", "latest_ahi"),
+            *_ordering_indexes("visit", "next_visit_date", "next_visit_time"),
+            *_ordering_indexes("treat", "active_treatment_count"),
+            *_ordering_indexes("auth", "authorization_status"),
+            *_ordering_indexes("expiry", "authorization_expiry"),
+            models.Index(fields=["expires_on"], name="patientsummary_expires_idx"),
+        ]
+
+    def __str__(self):
+        return f"Summary of patient {self.patient_id}"
+
+
+class PatientChart(models.Model):
+    """
+    Precomputed chart document of a patient: the patient with every record.
+
+    The document is stored encoded, ready to be sent as a response body.
+    Changes to any part of the chart advance requested in the changing
+    transaction; the chart builder (manage.py build_patient_charts) then
+    rebuilds the document and sets built to the requested count it was
+    built for. The chart is current when built equals requested.
+    """
+
+    patient = models.OneToOneField(
+        Patient,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="chart",
+    )
+    requested = models.PositiveBigIntegerField(default=1)
+    built = models.PositiveBigIntegerField(default=0)
+    requested_at = models.DateTimeField()
+    built_at = models.DateTimeField(blank=True, null=True)
+    document = models.BinaryField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["requested_at"],
+                condition=models.Q(built__lt=models.F("requested")),
+                name="patientchart_stale_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Chart of patient {self.patient_id} ({self.built}/{self.requested})"
+
+
+class CurrentTransactionId(models.Func):
+    """The 64-bit ID of the current transaction (assigning one if needed)."""
+
+    template = "pg_current_xact_id()::text::bigint"
+    output_field = models.BigIntegerField()
+
+
+class PatientChange(models.Model):
+    """
+    Append-only log of patient changes, read by incremental sync clients.
+
+    Rows are written in the transaction making the change, so a change is
+    logged if and only if it commits. Rows are ordered by the ID of the
+    writing transaction (see api.changes), which unlike the row ID allows
+    telling when no earlier change can still commit.
+
+    A row without patient_id marks a change to every patient (or pruned
+    history) after which clients reload all patients.
+    """
+
+    transaction_id = models.BigIntegerField(db_default=CurrentTransactionId())
+    # Not a foreign key: rows of deleted patients serve as tombstones
+    patient_id = models.IntegerField(null=True, blank=True)
+    changed_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["transaction_id", "id"], name="patientchange_cursor_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.transaction_id}-{self.pk}: {self.patient_id or 'all'}"
+
+
+class OutboxEvent(models.Model):
+    """
+    Append-only outbox of domain events for downstream consumers.
+
+    Events are written in the transaction making the change and relayed to
+    consumers by manage.py relay_outbox (see api.outbox), in the order of
+    their writing transaction like PatientChange rows.
+    """
+
+    EVENT_TYPES = [
+        ("created", "Created"),
+        ("updated", "Updated"),
+        ("deleted", "Deleted"),
+    ]
+
+    transaction_id = models.BigIntegerField(db_default=CurrentTransactionId())
+    topic = models.CharField(max_length=50, help_text="Type of the changed object")
+    object_id = models.IntegerField()
+    event = models.CharField(max_length=20, choices=EVENT_TYPES)
+    payload = models.JSONField(
+        encoder=DjangoJSONEncoder,
+        blank=True,
+        null=True,
+        help_text="API representation of the object; empty for deletions",
+    )
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["transaction_id", "id"], name="outboxevent_cursor_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.topic} {self.object_id} {self.event}"
+
+
+class OutboxOffset(models.Model):
+    """
+    Position of an outbox consumer: every event up to it has been delivered.
+
+    Advanced only after the sink accepted a batch, so delivery is at least
+    once; consumers deduplicate by event ID.
+    """
+
+    consumer = models.CharField(max_length=100, unique=True)
+    transaction_id = models.BigIntegerField(default=0)
+    event_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.consumer}: {self.transaction_id}-{self.event_id}"
+
+
+class CacheVersion(models.Model):
+    """
+    Change counter of a model, for invalidating per-process caches.
+
+    Advanced in the transaction changing the model, along with a
+    notification (see api.local_cache). Caches compare it periodically to
+    catch notifications their process missed.
+    """
+
+    model = models.CharField(max_length=100, unique=True)
+    version = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.model}: {self.version}"
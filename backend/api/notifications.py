@@ -0,0 +1,217 @@
+"""
+This module provides Postgres LISTEN/NOTIFY based notifications.
+
+Each worker process keeps one dedicated connection listening for
+notifications, read by a background thread and dispatched to handlers
+registered per channel. NOTIFY is transactional: notifications are only
+delivered once the sending transaction commits.
+
+Features:
+- One LISTEN connection per process, shared by every channel
+- Automatic reconnection; handlers are told when notifications may have
+  been missed
+- Fork safety: the thread is (re)started in the process that uses it
+- Change events for patients and visits, sent by database triggers (see
+  migration 0008), fanned out to event stream subscribers
+- Subscriber backpressure: repeated changes are coalesced, and a
+  subscriber falling too far behind receives a single resync event
+
+Configuration (settings):
+- DATABASE_LISTEN_HOST / DATABASE_LISTEN_PORT: Server for LISTEN sessions,
+  which need a direct connection (pgbouncer transaction pooling drops them)
+- EVENT_STREAM_MAX_PENDING: Events queued per subscriber before a resync
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict, defaultdict
+
+import psycopg
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+logger = logging.getLogger(__name__)
+
+# Channel of the patient and visit change triggers
+CHANGES_CHANNEL = "stellarcare_changes"
+
+# Seconds between checks for new channels, and before reconnecting
+POLL_INTERVAL = 1.0
+RECONNECT_DELAY = 5.0
+
+
+class NotificationListener:
+    """
+    Background thread dispatching notifications to handlers.
+
+    Handlers are called in the listener thread with the payload of each
+    notification on their channel, or with None after (re)connecting, when
+    notifications may have been missed. Handlers must return quickly.
+    """
+
+    def __init__(self):
+        self._handlers = defaultdict(list)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def subscribe(self, channel, handler):
+        """
+        Calls handler with every notification on the channel.
+
+        Subscribing an already subscribed handler only makes sure the
+        listener runs in the current process.
+        """
+        with self._lock:
+            if handler not in self._handlers[channel]:
+                self._handlers[channel].append(handler)
+            if self._thread is None or self._pid != os.getpid():
+                # Not started, or started before a fork and lost with it
+                self._pid = os.getpid()
+                self._thread = threading.Thread(
+                    target=self._run, name="notification-listener", daemon=True
+                )
+                self._thread.start()
+
+    def unsubscribe(self, channel, handler):
+        with self._lock:
+            self._handlers[channel].remove(handler)
+
+    def _get_conninfo(self):
+        database = settings.DATABASES[DEFAULT_DB_ALIAS]
+        return psycopg.conninfo.make_conninfo(
+            dbname=database["NAME"],
+            user=database["USER"],
+            password=database["PASSWORD"],
+            host=settings.DATABASE_LISTEN_HOST,
+            port=settings.DATABASE_LISTEN_PORT,
+            application_name="stellarcare-listener",
+        )
+
+    def _dispatch(self, channel, payload):
+        with self._lock:
+            handlers = list(self._handlers[channel])
+        for handler in handlers:
+            try:
+                handler(payload)
+            except Exception:
+                logger.exception(f"Notification handler for {channel} failed")
+
+    def _run(self):
+        while True:
+            try:
+                with psycopg.connect(self._get_conninfo(), autocommit=True) as conn:
+                    listening = set()
+                    while True:
+                        with self._lock:
+                            channels = [
+                                channel
+                                for channel, handlers in self._handlers.items()
+                                if handlers and channel not in listening
+                            ]
+                        for channel in channels:
+                            conn.execute(f'LISTEN "{channel}"')
+                            listening.add(channel)
+                            # Anything sent before LISTEN was missed
+                            self._dispatch(channel, None)
+                        for notify in conn.notifies(timeout=POLL_INTERVAL):
+                            self._dispatch(notify.channel, notify.payload)
+            except psycopg.Error as e:
+                logger.warning(
+                    f"Notification listener disconnected, reconnecting in "
+                    f"{RECONNECT_DELAY:.0f}s: {e}"
+                )
+            # Every channel is listened to again, and told of the gap
+            threading.Event().wait(RECONNECT_DELAY)
+
+
+listener = NotificationListener()
+
+
+class Subscription:
+    """
+    Change events awaited by one event stream.
+
+    Pending events are keyed by object, so repeated changes of an object
+    are delivered once. When more than max_pending objects are pending,
+    they are replaced by a single resync event telling the client to
+    reload everything.
+    """
+
+    def __init__(self, topics, patient_ids=None, max_pending=None):
+        self.topics = set(topics)
+        self.patient_ids = set(patient_ids) if patient_ids is not None else None
+        self.max_pending = max_pending or settings.EVENT_STREAM_MAX_PENDING
+        self._pending = OrderedDict()
+        self._resync = False
+        self._ready = asyncio.Event()
+
+    def matches(self, event):
+        """Returns whether the event is one this subscriber asked for."""
+        if event["topic"] not in self.topics:
+            return False
+        return self.patient_ids is None or not self.patient_ids.isdisjoint(
+            event["patients"]
+        )
+
+    def put(self, event):
+        """Queues an event (None for a resync); called in the event loop."""
+        if event is None or len(self._pending) >= self.max_pending:
+            self._pending.clear()
+            self._resync = True
+        else:
+            key = (event["topic"], event["id"], tuple(event["patients"]))
+            self._pending.pop(key, None)
+            self._pending[key] = event
+        self._ready.set()
+
+    async def get(self):
+        """Returns the next event, or a resync event."""
+        await self._ready.wait()
+        if self._resync:
+            self._resync = False
+            event = {"topic": "resync"}
+        else:
+            _, event = self._pending.popitem(last=False)
+        if not self._resync and not self._pending:
+            self._ready.clear()
+        return event
+
+
+class ChangeHub:
+    """
+    Fans out patient and visit change notifications to subscriptions.
+
+    Subscriptions belong to the event loop serving the event streams; the
+    listener thread hands notifications over to that loop.
+    """
+
+    def __init__(self):
+        self._subscriptions = set()
+        self._loop = None
+
+    def subscribe(self, subscription):
+        """Starts delivering matching change events to the subscription."""
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+            listener.subscribe(CHANGES_CHANNEL, self._notify)
+        self._subscriptions.add(subscription)
+
+    def unsubscribe(self, subscription):
+        self._subscriptions.discard(subscription)
+
+    def _notify(self, payload):
+        # Called in the listener thread
+        event = json.loads(payload) if payload is not None else None
+        self._loop.call_soon_threadsafe(self._deliver, event)
+
+    def _deliver(self, event):
+        for subscription in list(self._subscriptions):
+            if event is None or subscription.matches(event):
+                subscription.put(event)
+
+
+hub = ChangeHub()
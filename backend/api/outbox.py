@@ -0,0 +1,201 @@
+"""
+This module provides the transactional outbox for downstream consumers.
+
+Changes to patients and their records append OutboxEvent rows in the same
+transaction as the change, so an event exists if and only if the change
+committed. The relay (manage.py relay_outbox) publishes events in batches to
+each consumer's sink and then advances the consumer's offset.
+
+Features:
+- Events written atomically with the change
+- Per-consumer offsets; a batch is re-sent until its sink accepts it
+  (at-least-once delivery, deduplicated by consumers on event ID)
+- Events read in commit-safe order (see api.changes)
+- Pluggable sinks: JSON lines file, HTTP endpoint, in-process queue
+- Pruning of events delivered to every consumer
+
+Configuration (settings):
+- OUTBOX_CONSUMERS: {name: {"SINK": class path, "OPTIONS": {...}}}
+- OUTBOX_RETENTION_DAYS: Days delivered events are kept
+"""
+
+import json
+import logging
+import os
+import queue
+import urllib.request
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS, connection, router, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .changes import ChangeToken, read_log
+from .models import OutboxEvent, OutboxOffset
+
+logger = logging.getLogger(__name__)
+
+
+def record_event(topic, object_id, event, payload=None):
+    """
+    Appends an event to the outbox.
+
+    Must be called in the transaction making the change (inside
+    transaction.atomic()); raises TransactionManagementError otherwise, as
+    in autocommit the event would commit separately from the change.
+    """
+    using = router.db_for_write(OutboxEvent)
+    if not transaction.get_connection(using).in_atomic_block:
+        raise transaction.TransactionManagementError(
+            f"The {topic} {event} event must be recorded in the transaction "
+            "making the change."
+        )
+    OutboxEvent.objects.using(using).create(
+        topic=topic, object_id=object_id, event=event, payload=payload
+    )
+
+
+def to_message(event):
+    """Returns the published representation of an event."""
+    return {
+        "id": event.id,
+        "topic": event.topic,
+        "object_id": event.object_id,
+        "event": event.event,
+        "payload": event.payload,
+        "created_at": event.created_at,
+    }
+
+
+class Sink:
+    """
+    Destination of a consumer's events.
+
+    publish() receives a batch of messages (see to_message()) and must only
+    return once they are stored or delivered; raising makes the relay retry
+    the same batch.
+    """
+
+    def publish(self, messages):
+        raise NotImplementedError
+
+
+class FileSink(Sink):
+    """Appends messages to a file as JSON lines, flushed to disk per batch."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def publish(self, messages):
+        with open(self.path, "a", encoding="utf-8") as file:
+            for message in messages:
+                file.write(json.dumps(message, cls=DjangoJSONEncoder) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+
+
+class HttpSink(Sink):
+    """POSTs each batch as {"events": [...]}; any non-2xx response fails it."""
+
+    def __init__(self, url, timeout=10, headers=None):
+        self.url = url
+        self.timeout = timeout
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+
+    def publish(self, messages):
+        body = json.dumps({"events": messages}, cls=DjangoJSONEncoder).encode()
+        request = urllib.request.Request(
+            self.url, data=body, headers=self.headers, method="POST"
+        )
+        # urlopen raises HTTPError for non-2xx responses
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+
+class QueueSink(Sink):
+    """Puts messages on an in-process queue, for consumers in the same process."""
+
+    queues = {}
+
+    def __init__(self, name="default", maxsize=0):
+        self.queue = self.queues.setdefault(name, queue.Queue(maxsize))
+
+    def publish(self, messages):
+        for message in messages:
+            self.queue.put(message)
+
+
+def get_sink(consumer):
+    """Returns the sink configured for a consumer in OUTBOX_CONSUMERS."""
+    config = settings.OUTBOX_CONSUMERS[consumer]
+    return import_string(config["SINK"])(**config.get("OPTIONS", {}))
+
+
+def relay_batch(consumer, sink, batch_size):
+    """
+    Publishes the consumer's next batch of events to its sink.
+
+    The offset is advanced after the sink accepted the batch; if the process
+    dies in between, the batch is published again. Returns the number of
+    events published and whether more are ready.
+    """
+    offset, _ = OutboxOffset.objects.get_or_create(consumer=consumer)
+    token = ChangeToken(offset.transaction_id, offset.event_id)
+    # Offsets must advance on the database the events were written to
+    events, next_token, has_more = read_log(
+        OutboxEvent.objects.all(), token, batch_size, DEFAULT_DB_ALIAS
+    )
+    if events:
+        sink.publish([to_message(event) for event in events])
+    if next_token != token:
+        OutboxOffset.objects.filter(pk=offset.pk).update(
+            transaction_id=next_token.transaction_id,
+            event_id=next_token.id,
+            updated_at=timezone.now(),
+        )
+    return len(events), has_more
+
+
+def acquire_consumer_lock(consumer):
+    """
+    Takes a session advisory lock so that one relay serves each consumer.
+
+    A session lock is used rather than a row lock, as it does not hold a
+    transaction open, which would hold back the horizon of every log reader.
+    Returns whether the lock was acquired.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_try_advisory_lock(hashtext('outbox'), hashtext(%s))",
+            [consumer],
+        )
+        return cursor.fetchone()[0]
+
+
+def prune_events():
+    """
+    Deletes events older than OUTBOX_RETENTION_DAYS delivered to every consumer.
+
+    Returns the number of events deleted.
+    """
+    offsets = list(
+        OutboxOffset.objects.filter(consumer__in=list(settings.OUTBOX_CONSUMERS))
+    )
+    if len(offsets) < len(settings.OUTBOX_CONSUMERS):
+        # A consumer has not started yet and needs every event
+        return 0
+
+    delivered = Q()
+    for offset in offsets:
+        delivered &= Q(transaction_id__lt=offset.transaction_id) | Q(
+            transaction_id=offset.transaction_id, id__lte=offset.event_id
+        )
+
+    before = timezone.now() - timedelta(days=settings.OUTBOX_RETENTION_DAYS)
+    deleted, _ = OutboxEvent.objects.filter(delivered, created_at__lt=before).delete()
+    if deleted:
+        logger.info(f"Pruned {deleted} delivered outbox events")
+    return deleted
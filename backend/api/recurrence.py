@@ -0,0 +1,147 @@
+"""
+This module provides the occurrences of recurring visits (VisitSeries).
+
+A series is stored once; its occurrences are expanded lazily, by generators,
+for the date range a calendar or schedule reads. An occurrence is written
+as a Visit only once it is edited, cancelled or completed (see
+materialize_occurrence()). That visit replaces the occurrence, even when
+moved to another date, so expansion skips the occurrence dates with a row.
+
+Features:
+- Occurrences generated in (date, time) order across any number of series
+- Open-ended series, expanded only within the requested range
+- Two queries per range: the overlapping series and their written
+  occurrences
+- Unsaved Visit instances for occurrences, serialized like stored visits
+
+Notes:
+- Patient summaries (next_visit) include the next unwritten occurrence
+  (see migration 0019_summary_series_occurrences); the patient's
+  appointments include written occurrences only
+"""
+
+import heapq
+import logging
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+
+from .models import Visit, VisitSeries
+
+logger = logging.getLogger(__name__)
+
+
+def occurrence_dates(series, first_day, last_day):
+    """Yields the dates of a series' occurrences from first_day to last_day."""
+    if series.end_date is not None:
+        last_day = min(last_day, series.end_date)
+    interval = timedelta(days=series.interval_days)
+    day = series.start_date
+    if day < first_day:
+        # Jump to the first occurrence on or after first_day
+        skipped = -(-(first_day - day).days // series.interval_days)
+        day += interval * skipped
+    while day <= last_day:
+        yield day
+        day += interval
+
+
+def is_occurrence(series, day):
+    """Returns whether a series has an occurrence on the given date."""
+    return any(occurrence_dates(series, day, day))
+
+
+def occurrence_key(visit):
+    """
+    Returns the calendar order key of a stored visit or an occurrence.
+
+    Occurrences, having no id, are keyed by their negated series id: unique,
+    as a series has one occurrence per date, and never equal to a visit's.
+    """
+    return (visit.date, visit.time, visit.pk or -visit.series_id)
+
+
+def _occurrence(series, day):
+    """Returns the unsaved visit of a series' occurrence on the given date."""
+    return Visit(
+        date=day,
+        time=series.time,
+        type=series.type,
+        status="Scheduled",
+        notes=series.notes,
+        zoom_link=series.zoom_link,
+        patient=series.patient,
+        series=series,
+        occurrence_date=day,
+    )
+
+
+def _expand(series, first_day, last_day, written):
+    for day in occurrence_dates(series, first_day, last_day):
+        if (series.pk, day) not in written:
+            yield _occurrence(series, day)
+
+
+def get_occurrences(first_day, last_day, types=None, using=None):
+    """
+    Returns a generator of the unwritten occurrences from first_day to last_day.
+
+    Occurrences are unsaved Visit instances with their patient loaded,
+    generated in occurrence_key() order. types optionally limits the visit
+    types.
+    """
+    series_queryset = (
+        VisitSeries.objects.using(using)
+        .select_related("patient")
+        .filter(start_date__lte=last_day)
+        .filter(Q(end_date__isnull=True) | Q(end_date__gte=first_day))
+    )
+    if types:
+        series_queryset = series_queryset.filter(type__in=types)
+    series_list = list(series_queryset)
+    if not series_list:
+        return iter(())
+
+    written = set(
+        Visit.objects.using(using)
+        .filter(
+            series__in=series_list,
+            occurrence_date__range=(first_day, last_day),
+        )
+        .values_list("series_id", "occurrence_date")
+    )
+    # Each series generates in date order
+    return heapq.merge(
+        *(_expand(series, first_day, last_day, written) for series in series_list),
+        key=occurrence_key,
+    )
+
+
+def materialize_occurrence(series, day, **changes):
+    """
+    Writes an occurrence of a series as a Visit, applying changes to it.
+
+    Returns the visit replacing the occurrence, updated with changes if it
+    was written before. Raises ValueError if the series has no occurrence on
+    the given date.
+    """
+    if not is_occurrence(series, day):
+        raise ValueError(f"The series has no occurrence on {day}.")
+
+    with transaction.atomic():
+        # Concurrent writes of the same occurrence wait for each other
+        series = (
+            VisitSeries.objects.select_for_update(of=("self",))
+            .select_related("patient")
+            .get(pk=series.pk)
+        )
+        visit = Visit.objects.filter(series=series, occurrence_date=day).first()
+        if visit is None:
+            visit = _occurrence(series, day)
+            logger.info(f"Writing occurrence {day} of visit series {series.pk}")
+        for field, value in changes.items():
+            setattr(visit, field, value)
+        visit.save()
+        series.patient.appointments.add(visit)
+    return visit
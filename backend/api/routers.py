@@ -0,0 +1,206 @@
+"""
+This module provides database routing for read replicas.
+
+Safe (read-only) API requests read from replica databases, while writes and
+everything outside a routed request use the primary.
+
+Features:
+- Request-scoped routing of reads to healthy replicas
+- Read-your-writes stickiness: users who just wrote read from the primary
+- Replica lag monitoring with automatic fallback to the primary
+- Migrations restricted to the primary
+
+Configuration (settings):
+- REPLICA_DATABASES: Aliases of the replica databases
+- REPLICA_STICKY_SECONDS: How long a user reads from the primary after a write
+- REPLICA_MAX_LAG_SECONDS: Replication lag above which a replica is skipped
+- REPLICA_LAG_CHECK_INTERVAL: Seconds between lag checks of a replica
+- REPLICA_RETRY_INTERVAL: Seconds before an unreachable replica is retried
+"""
+
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.utils.functional import SimpleLazyObject, empty
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# The request whose reads may be served by a replica, if any
+_replica_request = ContextVar("replica_request", default=None)
+
+# Last measured lag per replica alias: {alias: (next_check_at, lag_seconds)}
+_replica_lag = {}
+
+REPLICA_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(
+            EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0
+        )
+    END
+"""
+
+
+def _pin_key(user_id):
+    return f"replica:pinned:{user_id}"
+
+
+def _resolved_user(request):
+    """
+    Returns the request's user if it has already been resolved.
+
+    A lazy user that has not been evaluated yet is not resolved here, since
+    doing so would itself issue a query while a query is being routed.
+    """
+    user = request.__dict__.get("user")
+    if isinstance(user, SimpleLazyObject) and user._wrapped is empty:
+        return None
+    return user
+
+
+def is_replica_request(request):
+    """Returns whether reads for this request may be served by a replica."""
+    return request.method in SAFE_METHODS and request.path.startswith("/api/")
+
+
+def begin_request(request):
+    """
+    Marks the start of a request for routing purposes.
+
+    Returns a token to pass to end_request() once the response is ready.
+    """
+    return _replica_request.set(request if is_replica_request(request) else None)
+
+
+def end_request(token):
+    """Restores the routing state saved by begin_request()."""
+    _replica_request.reset(token)
+
+
+@contextmanager
+def use_primary():
+    """Routes the reads made within the block to the primary."""
+    token = _replica_request.set(None)
+    try:
+        yield
+    finally:
+        _replica_request.reset(token)
+
+
+def pin_to_primary(user):
+    """Routes the user's reads to the primary for REPLICA_STICKY_SECONDS."""
+    cache.set(_pin_key(user.pk), True, settings.REPLICA_STICKY_SECONDS)
+
+
+def record_write(request, response):
+    """Pins the requesting user to the primary after a successful write."""
+    if request.method in SAFE_METHODS or response.status_code >= 400:
+        return
+    user = _resolved_user(request)
+    if user is not None and user.is_authenticated:
+        pin_to_primary(user)
+
+
+def _is_pinned(request):
+    """Returns whether the request's user recently wrote and must read the primary."""
+    pinned = request.__dict__.get("_replica_pinned")
+    if pinned is not None:
+        return pinned
+
+    user = _resolved_user(request)
+    if user is None or not user.is_authenticated:
+        # Unknown yet; decide again once authentication has resolved the user
+        return False
+
+    pinned = cache.get(_pin_key(user.pk), False)
+    request._replica_pinned = pinned
+    return pinned
+
+
+def get_replica_lag(alias):
+    """
+    Returns the replication lag of a replica in seconds.
+
+    Results are cached per process for REPLICA_LAG_CHECK_INTERVAL seconds.
+    An unreachable replica reports infinite lag and is not retried for
+    REPLICA_RETRY_INTERVAL seconds.
+    """
+    now = time.monotonic()
+    next_check_at, lag = _replica_lag.get(alias, (None, None))
+    if next_check_at is not None and now < next_check_at:
+        return lag
+
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute(REPLICA_LAG_SQL)
+            lag = float(cursor.fetchone()[0])
+        next_check_at = now + settings.REPLICA_LAG_CHECK_INTERVAL
+    except DatabaseError as e:
+        logger.warning(f"Replica {alias} is unavailable: {e}")
+        lag = float("inf")
+        next_check_at = now + settings.REPLICA_RETRY_INTERVAL
+
+    _replica_lag[alias] = (next_check_at, lag)
+    return lag
+
+
+def get_healthy_replicas():
+    """Returns the replica aliases whose lag is within REPLICA_MAX_LAG_SECONDS."""
+    return [
+        alias
+        for alias in settings.REPLICA_DATABASES
+        if get_replica_lag(alias) <= settings.REPLICA_MAX_LAG_SECONDS
+    ]
+
+
+class ReplicaRouter:
+    """
+    Database router sending safe API reads to read replicas.
+
+    Reads go to a randomly chosen healthy replica when:
+    - The current request is a safe API request (see begin_request())
+    - The requesting user has not written within REPLICA_STICKY_SECONDS
+    - At least one replica is within REPLICA_MAX_LAG_SECONDS
+
+    Everything else, including all writes, uses the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        """Chooses a replica for eligible reads, otherwise the primary."""
+        request = _replica_request.get()
+        if request is None or not settings.REPLICA_DATABASES:
+            return DEFAULT_DB_ALIAS
+        if _is_pinned(request):
+            return DEFAULT_DB_ALIAS
+
+        # Follow relations on the database the related instance came from
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db is not None:
+            return instance._state.db
+
+        replicas = get_healthy_replicas()
+        if not replicas:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        """Sends all writes to the primary."""
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        """Allows relations between objects loaded from the primary or a replica."""
+        databases = {DEFAULT_DB_ALIAS, *settings.REPLICA_DATABASES}
+        return obj1._state.db in databases and obj2._state.db in databases
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        """Applies migrations to the primary only; replicas follow by replication."""
+        return db not in settings.REPLICA_DATABASES
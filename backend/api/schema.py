@@ -0,0 +1,180 @@
+"""
+This module provides the precomputed OpenAPI schema.
+
+Generating the schema introspects every view and serializer, which takes far
+longer than serving it. The rendered schema is therefore built once per code
+version, either at deploy time (manage.py build_schema) or lazily by the
+first request, and then served from memory.
+
+Features:
+- Rendered YAML and JSON schema, plus gzip-compressed variants
+- On-disk artifacts shared by all worker processes
+- Invalidation by code version (CODE_VERSION, or a hash of the source)
+- Stable ETags for conditional requests
+- OpenAPI extensions for the API's own authentication classes
+
+Configuration (settings):
+- CODE_VERSION: Deployed code version, e.g. the git commit; hashed from the
+  source when empty
+- SCHEMA_CACHE_DIR: Directory holding the built schema artifacts
+"""
+
+import gzip
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from importlib.metadata import version as package_version
+from pathlib import Path
+from typing import NamedTuple
+
+from django.conf import settings
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from drf_spectacular.settings import spectacular_settings
+
+logger = logging.getLogger(__name__)
+
+# Renderers used to build each schema format
+SCHEMA_RENDERERS = {
+    "yaml": OpenApiYamlRenderer,
+    "json": OpenApiJsonRenderer,
+}
+
+# Built schemas of the current process: {(version, format, api_version, lang): SchemaArtifact}
+_schemas = {}
+_build_lock = threading.Lock()
+_code_version = None
+
+
+class StatelessJWTScheme(SimpleJWTScheme):
+    """
+    Documents StatelessJWTAuthentication as the JWT bearer scheme (jwtAuth).
+
+    drf-spectacular matches authentication extensions by exact class, so
+    subclasses of JWTAuthentication need their own.
+    """
+
+    target_class = "api.authentication.StatelessJWTAuthentication"
+
+
+class SchemaArtifact(NamedTuple):
+    """A rendered schema with its ETag and gzip-compressed content."""
+
+    etag: str
+    content: bytes
+    gzip_content: bytes
+
+
+def get_code_version():
+    """
+    Returns the version of the running code.
+
+    Uses the CODE_VERSION setting when set. Otherwise hashes the application
+    source and the drf-spectacular version, so any change to views,
+    serializers or models yields a new version.
+    """
+    global _code_version
+    if _code_version is None:
+        if settings.CODE_VERSION:
+            _code_version = settings.CODE_VERSION
+        else:
+            digest = hashlib.sha256(package_version("drf-spectacular").encode())
+            source_dir = Path(__file__).resolve().parent
+            for path in sorted(source_dir.rglob("*.py")):
+                digest.update(str(path.relative_to(source_dir)).encode())
+                digest.update(path.read_bytes())
+            _code_version = digest.hexdigest()[:16]
+    return _code_version
+
+
+def _get_schema_path(schema_format, api_version=None, lang=None):
+    name = f"schema-{api_version or 'default'}-{lang or 'default'}.{schema_format}"
+    return Path(settings.SCHEMA_CACHE_DIR) / get_code_version() / name
+
+
+def _write_atomic(path, content):
+    """Writes a file so that concurrent readers never see it half-written."""
+    with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as file:
+        file.write(content)
+    os.replace(file.name, path)
+
+
+def _to_artifact(content, gzip_content=None):
+    if gzip_content is None:
+        # mtime=0 keeps the compressed bytes identical across builds
+        gzip_content = gzip.compress(content, mtime=0)
+    return SchemaArtifact(
+        etag=f'W/"{hashlib.sha256(content).hexdigest()[:32]}"',
+        content=content,
+        gzip_content=gzip_content,
+    )
+
+
+def build_schema(schema_format, api_version=None, lang=None):
+    """
+    Generates, renders and stores the schema in the given format.
+
+    The schema is generated the same way as by SpectacularAPIView with
+    SERVE_PUBLIC, and written to SCHEMA_CACHE_DIR for other processes.
+    """
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS(
+        urlconf=spectacular_settings.SERVE_URLCONF, api_version=api_version
+    )
+    schema = generator.get_schema(request=None, public=True)
+    renderer = SCHEMA_RENDERERS[schema_format]()
+    artifact = _to_artifact(renderer.render(schema, renderer_context={}))
+
+    path = _get_schema_path(schema_format, api_version, lang)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _write_atomic(path.with_name(f"{path.name}.gz"), artifact.gzip_content)
+    _write_atomic(path, artifact.content)
+    logger.info(f"Built {schema_format} schema at {path}")
+    return artifact
+
+
+def _load_schema(schema_format, api_version=None, lang=None):
+    """Returns the stored schema, or None if it has not been built."""
+    path = _get_schema_path(schema_format, api_version, lang)
+    try:
+        content = path.read_bytes()
+        gzip_content = path.with_name(f"{path.name}.gz").read_bytes()
+    except FileNotFoundError:
+        return None
+    return _to_artifact(content, gzip_content)
+
+
+def get_schema(schema_format, api_version=None, lang=None):
+    """
+    Returns the schema of the running code version in the given format.
+
+    Looks in memory first, then in SCHEMA_CACHE_DIR, and only generates the
+    schema when neither has it. Concurrent requests in one process wait for
+    a single build.
+    """
+    key = (get_code_version(), schema_format, api_version, lang)
+    artifact = _schemas.get(key)
+    if artifact is not None:
+        return artifact
+
+    with _build_lock:
+        artifact = _schemas.get(key)
+        if artifact is None:
+            artifact = _load_schema(schema_format, api_version, lang)
+        if artifact is None:
+            artifact = build_schema(schema_format, api_version, lang)
+        _schemas[key] = artifact
+    return artifact
+
+
+def prune_schemas():
+    """Removes schema artifacts built for other code versions."""
+    cache_dir = Path(settings.SCHEMA_CACHE_DIR)
+    if not cache_dir.is_dir():
+        return
+    for path in cache_dir.iterdir():
+        if path.is_dir() and path.name != get_code_version():
+            shutil.rmtree(path, ignore_errors=True)
+            logger.info(f"Removed stale schema artifacts {path}")
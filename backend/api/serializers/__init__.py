@@ -5,9 +5,17 @@ It implements a modular approach to serialization, organizing serializers by dom
 - Patient information and records
 - Medical data (treatments, studies)
 - Administrative data (visits, insurance)
+- Analytics responses (cohort statistics, treatment efficacy)
 """
 
+from .analytics import (  # noqa
+    SleepStudyStatisticsSerializer,
+    TreatmentEfficacySerializer,
+)
 from .auth import (  # noqa
+    ClaimsTokenObtainPairSerializer,
+    DenylistTokenRefreshSerializer,
+    TokenRevokeSerializer,
     UserChangePasswordErrorSerializer,
     UserChangePasswordSerializer,
     UserCreateErrorSerializer,
@@ -17,15 +25,20 @@ from .auth import (  # noqa
 )
 from .medical import (  # noqa
     SleepStudySerializer,
+    TreatmentPeriodSerializer,
     TreatmentSerializer,
 )
 from .patient import (  # noqa
     AddressSerializer,
     CustomFieldDefinitionSerializer,
     PatientCustomFieldSerializer,
+    PatientReferenceSerializer,
     PatientSerializer,
 )
 from .records import (  # noqa
+    CalendarVisitSerializer,
     InsuranceSerializer,
+    VisitScheduleSerializer,
     VisitSerializer,
+    VisitSeriesSerializer,
 )
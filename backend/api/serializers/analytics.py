@@ -0,0 +1,106 @@
+"""
+This module provides serializers for clinical analytics responses.
+
+Analytics results are computed as plain data (see api.analytics), so these
+serializers only document the response formats in the API schema.
+
+It implements serializers for:
+- Sleep study statistics of patient cohorts
+- Treatment efficacy by treatment type
+"""
+
+from rest_framework import serializers
+
+
+class PercentilesSerializer(serializers.Serializer):
+    """Percentiles of a distribution (see api.analytics.PERCENTILES)."""
+
+    p5 = serializers.FloatField()
+    p25 = serializers.FloatField()
+    p50 = serializers.FloatField()
+    p75 = serializers.FloatField()
+    p95 = serializers.FloatField()
+
+
+class HistogramBinSerializer(serializers.Serializer):
+    """A histogram bin; the last bin of unbounded metrics has no upper edge."""
+
+    def get_fields(self):
+        # "from" is a keyword, so it cannot be declared as an attribute
+        return {
+            "from": serializers.FloatField(),
+            "to": serializers.FloatField(allow_null=True),
+            "count": serializers.IntegerField(),
+        }
+
+
+class MetricStatisticsSerializer(serializers.Serializer):
+    """Distribution of a sleep study metric."""
+
+    mean = serializers.FloatField()
+    std = serializers.FloatField()
+    min = serializers.FloatField()
+    max = serializers.FloatField()
+    percentiles = PercentilesSerializer()
+    histogram = HistogramBinSerializer(many=True)
+
+
+class SleepStudyMetricsSerializer(serializers.Serializer):
+    """Distributions of the sleep study metrics, null without studies."""
+
+    ahi = MetricStatisticsSerializer(allow_null=True)
+    sleep_efficiency = MetricStatisticsSerializer(allow_null=True)
+    rem_latency = MetricStatisticsSerializer(allow_null=True)
+
+
+class AhiSeveritySerializer(serializers.Serializer):
+    """Number of studies per AHI severity bucket."""
+
+    normal = serializers.IntegerField()
+    mild = serializers.IntegerField()
+    moderate = serializers.IntegerField()
+    severe = serializers.IntegerField()
+
+
+class SleepStudyStatisticsSerializer(serializers.Serializer):
+    """Sleep study statistics of a patient cohort."""
+
+    cohort = serializers.DictField(
+        child=serializers.ListField(child=serializers.CharField())
+    )
+    studies = serializers.IntegerField()
+    patients = serializers.IntegerField()
+    metrics = SleepStudyMetricsSerializer()
+    severity = AhiSeveritySerializer()
+
+
+class DistributionSerializer(serializers.Serializer):
+    """Mean, standard deviation and percentiles of a distribution."""
+
+    mean = serializers.FloatField()
+    std = serializers.FloatField()
+    percentiles = PercentilesSerializer()
+
+
+class TreatmentTypeEfficacySerializer(serializers.Serializer):
+    """
+    Efficacy of a treatment type, from studies paired around its starts.
+
+    Distributions are null without paired studies.
+    """
+
+    patients = serializers.IntegerField()
+    paired = serializers.IntegerField()
+    before = DistributionSerializer(allow_null=True)
+    after = DistributionSerializer(allow_null=True)
+    change = DistributionSerializer(allow_null=True)
+    improved = serializers.IntegerField()
+    resolved = serializers.IntegerField()
+    days_to_follow_up = DistributionSerializer(allow_null=True)
+
+
+class TreatmentEfficacySerializer(serializers.Serializer):
+    """Efficacy of treatment types, keyed by type."""
+
+    computed_at = serializers.DateTimeField()
+    types = serializers.DictField(child=TreatmentTypeEfficacySerializer())
@@ -5,6 +5,7 @@ It implements serializers for:
 - User registration
 - Profile management
 - Password changes
+- Token issuing and refresh
 - Error handling
 
 Features:
@@ -12,6 +13,8 @@ Features:
 - Error message localization
 - Atomic transactions for user creation
 - Secure password handling
+- User claims embedded in access tokens
+- Revocation checks on token refresh
 """
 
 from django.contrib.auth import get_user_model
@@ -20,6 +23,13 @@ from django.core.exceptions import ValidationError
 from django.db import transaction
 from django.utils.translation import gettext_lazy as _
 from rest_framework import exceptions, serializers
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
+
+from ..authentication import ClaimsRefreshToken, is_token_revoked
 
 User = get_user_model()
 
@@ -183,3 +193,48 @@ class UserCreateErrorSerializer(serializers.Serializer):
     password_retype = serializers.ListSerializer(
         child=serializers.CharField(), required=False
     )
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    Token pair serializer embedding user claims.
+
+    The claims let StatelessJWTAuthentication build request.user without
+    loading the user row.
+    """
+
+    token_class = ClaimsRefreshToken
+
+
+class DenylistTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Token refresh serializer for claims-carrying tokens.
+
+    Features:
+    - Rejects revoked refresh tokens
+    - Renews the user claims in the issued access token
+    """
+
+    token_class = ClaimsRefreshToken
+
+    def validate(self, attrs):
+        if is_token_revoked(self.token_class(attrs["refresh"])):
+            raise InvalidToken(_("Token has been revoked"))
+        return super().validate(attrs)
+
+
+class TokenRevokeSerializer(serializers.Serializer):
+    """
+    Serializer for token revocation.
+
+    The access token used for the request is always revoked; a refresh
+    token may be passed to revoke it as well.
+    """
+
+    refresh = serializers.CharField(required=False)
+
+    def validate_refresh(self, value):
+        try:
+            return ClaimsRefreshToken(value)
+        except TokenError as e:
+            raise serializers.ValidationError(str(e)) from e
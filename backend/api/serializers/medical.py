@@ -17,6 +17,7 @@ Features:
 from rest_framework import serializers
 
 from ..models import SleepStudy, Treatment
+from .patient import PatientReferenceSerializer
 
 
 class SleepStudySerializer(serializers.ModelSerializer):
@@ -66,3 +67,18 @@ class TreatmentSerializer(serializers.ModelSerializer):
             "end_date",
             "notes",
         ]
+
+
+class TreatmentPeriodSerializer(TreatmentSerializer):
+    """
+    Serializer for treatments listed across patients by treatment period.
+
+    Features:
+    - Treatment details as in TreatmentSerializer
+    - The treatment's patient (see Treatment.patient), or null if unlinked
+    """
+
+    patient = PatientReferenceSerializer(read_only=True)
+
+    class Meta(TreatmentSerializer.Meta):
+        fields = TreatmentSerializer.Meta.fields + ["patient"]
@@ -12,11 +12,16 @@ Features:
 - Custom field value type management
 - Formatted address representation
 - Atomic operations for data integrity
+- Optimistic concurrency control of patient updates
+- Outbox events for patient changes
 """
 
+from django.db import transaction
 from rest_framework import serializers
 
+from ..exceptions import PreconditionFailed
 from ..models import Address, CustomFieldDefinition, Patient, PatientCustomField
+from ..outbox import record_event
 
 
 class AddressSerializer(serializers.ModelSerializer):
@@ -101,6 +106,8 @@ class PatientSerializer(serializers.ModelSerializer):
     - Nested relationship handling
     - Custom field value management
     - Atomic operations for data integrity
+    - Version-checked updates (optimistic concurrency control)
+    - Outbox event with the resulting representation per create/update
     - Complex validation rules
     """
 
@@ -118,6 +125,7 @@ class PatientSerializer(serializers.ModelSerializer):
         fields = "__all__"
         read_only_fields = ("id",)
 
+    @transaction.atomic
     def create(self, validated_data):
         """
         Creates a new patient with related data:
@@ -173,6 +181,7 @@ class PatientSerializer(serializers.ModelSerializer):
         if appointments:
             patient.appointments.set(appointments)
 
+        self._record_event(patient, "created")
         return patient
 
     def update(self, instance, validated_data):
@@ -182,8 +191,28 @@ class PatientSerializer(serializers.ModelSerializer):
         - Updates custom field values
         - Manages many-to-many relationships
 
-        Ensures atomic operations and data consistency.
+        Ensures atomic operations and data consistency. The update only
+        proceeds if the patient is still at expected_version (passed to
+        save(), defaulting to the version of the instance), otherwise
+        PreconditionFailed is raised and nothing is changed.
         """
+        expected_version = validated_data.pop("expected_version", instance.version)
+        with transaction.atomic():
+            if not instance.claim_version(expected_version):
+                raise PreconditionFailed(
+                    "The patient has been changed since it was read."
+                )
+            instance = self._update(instance, validated_data)
+            self._record_event(instance, "updated")
+            return instance
+
+    def _record_event(self, instance, event):
+        """Appends the patient's representation to the outbox."""
+        # Relations may have been prefetched before they changed
+        instance._prefetched_objects_cache = {}
+        record_event("patient", instance.pk, event, type(self)(instance).data)
+
+    def _update(self, instance, validated_data):
         addresses_data = validated_data.pop("addresses", [])
         studies = validated_data.pop("studies", None)
         treatments = validated_data.pop("treatments", None)
@@ -236,3 +265,11 @@ class PatientSerializer(serializers.ModelSerializer):
             instance.appointments.set(appointments)
 
         return instance
+
+
+class PatientReferenceSerializer(serializers.ModelSerializer):
+    """Compact reference to the patient of a record listed across patients."""
+
+    class Meta:
+        model = Patient
+        fields = ["id", "first", "last"]
@@ -16,7 +16,9 @@ Features:
 
 from rest_framework import serializers
 
-from ..models import Insurance, Visit
+from ..models import Insurance, Patient, Visit, VisitSeries
+from ..scheduling import check_schedulable, schedule_visit
+from .patient import PatientReferenceSerializer
 
 
 class VisitSerializer(serializers.ModelSerializer):
@@ -35,6 +37,90 @@ class VisitSerializer(serializers.ModelSerializer):
         fields = ["id", "date", "time", "type", "status", "notes", "zoom_link"]
 
 
+class CalendarVisitSerializer(VisitSerializer):
+    """
+    Serializer for visits listed across patients (clinic calendars).
+
+    Features:
+    - Visit details as in VisitSerializer
+    - The visit's patient (see Visit.patient), or null if unlinked
+    - Occurrences of visit series, with a null id until written
+    """
+
+    patient = PatientReferenceSerializer(read_only=True)
+
+    class Meta(VisitSerializer.Meta):
+        fields = VisitSerializer.Meta.fields + ["patient", "series", "occurrence_date"]
+        read_only_fields = ["series", "occurrence_date"]
+
+
+class VisitSeriesSerializer(serializers.ModelSerializer):
+    """
+    Serializer for recurring visits (see api.recurrence).
+
+    Features:
+    - Interval recurrence from a start date, open-ended or up to an end date
+    - The series' patient by ID
+    """
+
+    class Meta:
+        model = VisitSeries
+        fields = [
+            "id",
+            "patient",
+            "type",
+            "time",
+            "start_date",
+            "interval_days",
+            "end_date",
+            "notes",
+            "zoom_link",
+        ]
+
+    def validate(self, attrs):
+        start_date = attrs.get("start_date", getattr(self.instance, "start_date", None))
+        end_date = attrs.get("end_date", getattr(self.instance, "end_date", None))
+        if end_date is not None and end_date < start_date:
+            raise serializers.ValidationError(
+                {"end_date": "Must not be before start_date."}
+            )
+        return attrs
+
+
+class VisitScheduleSerializer(VisitSerializer):
+    """
+    Serializer for scheduling a visit (see api.scheduling).
+
+    Features:
+    - The visit's patient by ID
+    - Checks against clinic hours on validation
+    - Conflict checks against other visits on creation (409 Conflict)
+    - New visits are always Scheduled
+    """
+
+    patient = serializers.PrimaryKeyRelatedField(queryset=Patient.objects.all())
+
+    class Meta(VisitSerializer.Meta):
+        fields = VisitSerializer.Meta.fields + ["patient"]
+        read_only_fields = ["status"]
+
+    def validate(self, attrs):
+        try:
+            check_schedulable(attrs["date"], attrs["time"], attrs["type"])
+        except ValueError as e:
+            raise serializers.ValidationError(str(e)) from e
+        return attrs
+
+    def create(self, validated_data):
+        return schedule_visit(
+            validated_data.pop("patient"),
+            validated_data.pop("date"),
+            validated_data.pop("time"),
+            validated_data.pop("type"),
+            **validated_data,
+        )
+
+
 class InsuranceSerializer(serializers.ModelSerializer):
     """
     Serializer for insurance record management.
@@ -1,3 +1,4 @@
+import json
 from os import environ
 from pathlib import Path
 
@@ -61,6 +62,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "rest_framework_simplejwt",
     "drf_spectacular",
@@ -70,14 +72,17 @@ INSTALLED_APPS = [
 ######################################################################
 # Middleware
 ######################################################################
+# The session, auth and message middleware are skipped for bearer token API
+# requests, which never use the session (see api.middleware)
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    "django.contrib.sessions.middleware.SessionMiddleware",
+    "api.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
-    "django.contrib.auth.middleware.AuthenticationMiddleware",
-    "django.contrib.messages.middleware.MessageMiddleware",
+    "api.middleware.AuthenticationMiddleware",
+    "api.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "api.middleware.ReplicaRoutingMiddleware",
 ]
 
 ######################################################################
@@ -102,6 +107,30 @@ TEMPLATES = [
 ######################################################################
 # Database
 ######################################################################
+# Connection pooling (psycopg_pool). Every worker process keeps its own pool,
+# so size it to the number of threads serving requests in that process.
+DATABASE_POOL = environ.get("DATABASE_POOL", "1") == "1"
+
+# pgbouncer transaction pooling mode. Consecutive statements may run on
+# different server connections, so server-side cursors and prepared
+# statements must stay disabled.
+DATABASE_PGBOUNCER = environ.get("DATABASE_PGBOUNCER", "") == "1"
+
+DATABASE_OPTIONS = {}
+if DATABASE_POOL:
+    DATABASE_OPTIONS["pool"] = {
+        "name": "default",
+        "min_size": int(environ.get("DATABASE_POOL_MIN_SIZE") or 2),
+        "max_size": int(environ.get("DATABASE_POOL_MAX_SIZE") or 8),
+        # Seconds an idle connection above min_size is kept open
+        "max_idle": float(environ.get("DATABASE_POOL_MAX_IDLE") or 300),
+        # Seconds a request may wait for a free connection
+        "timeout": float(environ.get("DATABASE_POOL_TIMEOUT") or 10),
+    }
+if not DATABASE_PGBOUNCER:
+    # Prepare statements after they have been executed a few times
+    DATABASE_OPTIONS["prepare_threshold"] = 5
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
@@ -109,13 +138,178 @@ DATABASES = {
         "PASSWORD": environ.get("DATABASE_PASSWORD", "change-password"),
         "NAME": environ.get("DATABASE_NAME", "db"),
         "HOST": environ.get("DATABASE_HOST", "db"),
-        "PORT": "5432",
+        "PORT": environ.get("DATABASE_PORT", "5432"),
+        "OPTIONS": DATABASE_OPTIONS,
+        # Pooled connections are reused through the pool, not kept per thread
+        "CONN_MAX_AGE": 0 if DATABASE_POOL else int(environ.get("CONN_MAX_AGE") or 60),
+        # Validate connections on checkout from the pool or before reuse
+        "CONN_HEALTH_CHECKS": True,
+        "DISABLE_SERVER_SIDE_CURSORS": DATABASE_PGBOUNCER,
         "TEST": {
             "NAME": "test",
         },
     }
 }
 
+# Read replicas as comma-separated host[:port] entries. Safe API requests read
+# from a healthy replica; see api/routers.py.
+REPLICA_DATABASES = []
+for index, replica in enumerate(
+    filter(None, environ.get("DATABASE_REPLICA_HOSTS", "").split(",")), start=1
+):
+    host, port = replica.strip().partition(":")[::2]
+    alias = f"replica_{index}"
+    # Fail fast on an unreachable replica; reads then fall back to the primary
+    replica_options = {**DATABASE_OPTIONS, "connect_timeout": 2}
+    if "pool" in replica_options:
+        replica_options["pool"] = {
+            **replica_options["pool"],
+            "name": alias,
+            "timeout": 2,
+        }
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "PORT": port or DATABASES["default"]["PORT"],
+        "OPTIONS": replica_options,
+        "TEST": {"MIRROR": "default"},
+    }
+    REPLICA_DATABASES.append(alias)
+
+DATABASE_ROUTERS = ["api.routers.ReplicaRouter"]
+
+# Seconds a user keeps reading from the primary after a write
+REPLICA_STICKY_SECONDS = int(environ.get("REPLICA_STICKY_SECONDS") or 10)
+
+# Replication lag in seconds above which reads fall back to the primary
+REPLICA_MAX_LAG_SECONDS = float(environ.get("REPLICA_MAX_LAG_SECONDS") or 5)
+
+# Seconds between replication lag checks of each replica
+REPLICA_LAG_CHECK_INTERVAL = 2
+
+# Seconds before an unreachable replica is checked again
+REPLICA_RETRY_INTERVAL = 30
+
+# Server for LISTEN sessions (see api.notifications). They need a direct
+# connection to the primary, as pgbouncer transaction pooling drops them.
+DATABASE_LISTEN_HOST = (
+    environ.get("DATABASE_LISTEN_HOST") or DATABASES["default"]["HOST"]
+)
+DATABASE_LISTEN_PORT = (
+    environ.get("DATABASE_LISTEN_PORT") or DATABASES["default"]["PORT"]
+)
+
+######################################################################
+# Cache
+######################################################################
+# "file" (default) is shared by every worker on a node; "redis" is shared by
+# every node. "locmem" is per process, which breaks replica stickiness across
+# workers and is only meant for development.
+CACHE_BACKENDS = {
+    "locmem": ("django.core.cache.backends.locmem.LocMemCache", "stellarcare"),
+    "file": (
+        "django.core.cache.backends.filebased.FileBasedCache",
+        "/tmp/stellarcare-cache",
+    ),
+    "redis": ("django.core.cache.backends.redis.RedisCache", "redis://redis:6379/0"),
+}
+
+CACHE_BACKEND, CACHE_DEFAULT_LOCATION = CACHE_BACKENDS[
+    environ.get("CACHE_BACKEND") or "file"
+]
+
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKEND,
+        "LOCATION": environ.get("CACHE_LOCATION") or CACHE_DEFAULT_LOCATION,
+    }
+}
+
+# Seconds a cached patient response is kept (see api.cache)
+PATIENT_CACHE_TIMEOUT = int(environ.get("PATIENT_CACHE_TIMEOUT") or 300)
+
+# Seconds cached analytics results are kept (see api.analytics); any patient
+# change replaces them sooner
+ANALYTICS_CACHE_TIMEOUT = int(environ.get("ANALYTICS_CACHE_TIMEOUT") or 3600)
+
+# Seconds after which the stored treatment efficacy is recomputed on request
+# (see api.analytics); patient changes do not replace it
+TREATMENT_EFFICACY_MAX_AGE = int(environ.get("TREATMENT_EFFICACY_MAX_AGE") or 3600)
+
+# Seconds between checks of per-process caches for changes whose notification
+# was missed (see api.local_cache)
+LOCAL_CACHE_POLL_INTERVAL = int(environ.get("LOCAL_CACHE_POLL_INTERVAL") or 30)
+
+# Entries each per-process cache keeps, least recently used dropped first
+LOCAL_CACHE_MAX_ENTRIES = int(environ.get("LOCAL_CACHE_MAX_ENTRIES") or 1000)
+
+# Days patient change log rows are kept for incremental sync (see api.changes)
+PATIENT_CHANGES_RETENTION_DAYS = int(
+    environ.get("PATIENT_CHANGES_RETENTION_DAYS") or 30
+)
+
+######################################################################
+# Outbox
+######################################################################
+# Consumers of patient and record events, each relayed to its own sink by
+# manage.py relay_outbox (see api.outbox). Sinks: api.outbox.FileSink,
+# api.outbox.HttpSink, api.outbox.QueueSink.
+OUTBOX_CONSUMERS = {
+    "default": {
+        "SINK": "api.outbox.FileSink",
+        "OPTIONS": {
+            "path": environ.get("OUTBOX_FILE_PATH") or "/tmp/stellarcare-outbox.jsonl"
+        },
+    },
+}
+if environ.get("OUTBOX_HTTP_URL"):
+    OUTBOX_CONSUMERS["http"] = {
+        "SINK": "api.outbox.HttpSink",
+        "OPTIONS": {"url": environ["OUTBOX_HTTP_URL"]},
+    }
+
+# Days events are kept after every consumer received them
+OUTBOX_RETENTION_DAYS = int(environ.get("OUTBOX_RETENTION_DAYS") or 7)
+
+######################################################################
+# Event streams
+######################################################################
+# Patient and visit changes a stream may fall behind by before its client is
+# told to resync instead (see api.notifications)
+EVENT_STREAM_MAX_PENDING = int(environ.get("EVENT_STREAM_MAX_PENDING") or 100)
+
+# Seconds between keep-alive comments on idle streams
+EVENT_STREAM_KEEPALIVE = 15
+
+######################################################################
+# Scheduling
+######################################################################
+# Opening hours by ISO weekday (1 = Monday): periods of "HH:MM" start and end
+# times, in the clinic's time zone. CLINIC_HOURS takes the same as JSON, e.g.
+# {"1": [["09:00", "12:00"], ["13:00", "17:00"]], "6": [["09:00", "12:00"]]}.
+CLINIC_HOURS = {
+    int(weekday): periods
+    for weekday, periods in json.loads(
+        environ.get("CLINIC_HOURS")
+        or json.dumps({weekday: [["09:00", "17:00"]] for weekday in range(1, 6)})
+    ).items()
+}
+
+# Time zone of visit dates and times (see api.scheduling)
+CLINIC_TIME_ZONE = environ.get("CLINIC_TIME_ZONE") or "UTC"
+
+# Visits the clinic can hold at the same time (e.g. providers or rooms)
+CLINIC_CAPACITY = int(environ.get("CLINIC_CAPACITY") or 1)
+
+# Minutes a visit of each type takes
+VISIT_DURATIONS = {
+    "In-Person": int(environ.get("IN_PERSON_VISIT_MINUTES") or 30),
+    "Telehealth": int(environ.get("TELEHEALTH_VISIT_MINUTES") or 20),
+}
+
+# Minutes between the start times offered as free slots
+SCHEDULING_SLOT_MINUTES = int(environ.get("SCHEDULING_SLOT_MINUTES") or 15)
+
 ######################################################################
 # Authentication
 ######################################################################
@@ -174,11 +368,38 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.IsAuthenticated",
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "api.authentication.StatelessJWTAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ],
 }
 
+######################################################################
+# Simple JWT
+######################################################################
+SIMPLE_JWT = {
+    "TOKEN_OBTAIN_SERIALIZER": "api.serializers.ClaimsTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "api.serializers.DenylistTokenRefreshSerializer",
+}
+
+######################################################################
+# OpenAPI Schema
+######################################################################
+# Deployed code version (e.g. the git commit); schema artifacts are rebuilt
+# whenever it changes. When empty, a hash of the source is used instead.
+CODE_VERSION = environ.get("CODE_VERSION", "")
+
+SCHEMA_CACHE_DIR = environ.get("SCHEMA_CACHE_DIR") or "/tmp/stellarcare-schema"
+
+SPECTACULAR_SETTINGS = {
+    # Choice fields sharing a name (e.g. the patient and visit status) get
+    # their own enum components instead of generated names
+    "ENUM_NAME_OVERRIDES": {
+        "PatientStatusEnum": "api.models.Patient.PATIENT_STATUSES",
+        "VisitStatusEnum": "api.models.Visit.VISITS_STATUSES",
+        "VisitTypeEnum": "api.models.Visit.VISITS_TYPES",
+    },
+}
+
 ######################################################################
 # Unfold
 ######################################################################
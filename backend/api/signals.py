@@ -0,0 +1,225 @@
+"""
+This module provides signal receivers for the StellarCare application.
+
+Features:
+- Patient list cache invalidation on record changes, which may reorder
+  lists sorted or filtered by patient summaries
+- Chart rebuild requests on every change to a patient's chart, including
+  updates of linked records and visit series
+- Patient response cache invalidation and change logging on changes to:
+    - Patients
+    - Addresses
+    - Patient custom field values and definitions
+    - Patient relationships (the many-to-many through tables)
+    - Deletion of records linked to patients
+- Outbox events for patient deletions and record changes (patient creations
+  and updates are published by PatientSerializer and the admin)
+- Per-process cache invalidation on custom field definition and assignment
+  changes
+
+Notes:
+- Bulk operations that bypass signals (QuerySet.update(), raw SQL) must
+  invalidate the caches, log the change and request chart builds themselves
+  (see api.cache, api.local_cache, api.changes and api.charts)
+- Record events are atomic with changes made in a transaction, as by the
+  admin; deletions are always atomic
+"""
+
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .cache import (
+    invalidate_all_patients,
+    invalidate_patient_lists,
+    invalidate_patients,
+)
+from .changes import record_all_patients_changed, record_patient_changes
+from .charts import request_all_chart_builds, request_chart_builds
+from .local_cache import notify_model_changed
+from .models import (
+    Address,
+    CustomFieldDefinition,
+    Insurance,
+    Patient,
+    PatientCustomField,
+    SleepStudy,
+    Treatment,
+    User,
+    Visit,
+    VisitSeries,
+)
+from .outbox import record_event
+from .serializers import (
+    InsuranceSerializer,
+    SleepStudySerializer,
+    TreatmentSerializer,
+    VisitSerializer,
+)
+
+# Auto-created through tables of the patient relationships
+PATIENT_THROUGH_MODELS = [
+    Patient.addresses.through,
+    Patient.studies.through,
+    Patient.treatments.through,
+    Patient.insurance.through,
+    Patient.appointments.through,
+]
+
+# Models linked to patients through PATIENT_THROUGH_MODELS. Deleting one of
+# them removes its through rows without any m2m_changed or delete signal for
+# those rows, so the linked patients are collected before the deletion.
+PATIENT_RELATED_MODELS = [Address, SleepStudy, Treatment, Insurance, Visit]
+
+# Outbox topics and serializers of the record models
+RECORD_TOPICS = {
+    SleepStudy: ("sleep_study", SleepStudySerializer),
+    Treatment: ("treatment", TreatmentSerializer),
+    Insurance: ("insurance", InsuranceSerializer),
+    Visit: ("visit", VisitSerializer),
+}
+
+
+def patients_changed(patient_ids):
+    """
+    Invalidates the cached responses of the given patients, logs the change
+    and requests a rebuild of their charts.
+    """
+    patient_ids = set(patient_ids)
+    if patient_ids:
+        invalidate_patients(patient_ids)
+        record_patient_changes(patient_ids)
+        request_chart_builds(patient_ids)
+
+
+def all_patients_changed():
+    """
+    Invalidates every cached patient response, logs the change and requests
+    a rebuild of every chart.
+    """
+    invalidate_all_patients()
+    record_all_patients_changed()
+    request_all_chart_builds()
+
+
+@receiver(post_save, sender=Patient)
+@receiver(post_delete, sender=Patient)
+def invalidate_patient(sender, instance, **kwargs):
+    """Invalidates the cached responses of a saved or deleted patient."""
+    patients_changed([instance.pk])
+
+
+@receiver(post_delete, sender=Patient)
+def publish_patient_deleted(sender, instance, **kwargs):
+    """Publishes the deletion of a patient to the outbox."""
+    record_event("patient", instance.pk, "deleted")
+
+
+@receiver(post_save, sender=Address)
+def invalidate_address_patients(sender, instance, created, **kwargs):
+    """Invalidates the patients whose address was changed."""
+    if not created:
+        patients_changed(instance.patient_set.values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=PatientCustomField)
+@receiver(post_delete, sender=PatientCustomField)
+def invalidate_custom_field_patient(sender, instance, **kwargs):
+    """Invalidates the patient whose custom field value changed."""
+    patients_changed([instance.patient_id])
+
+
+@receiver(post_save, sender=CustomFieldDefinition)
+@receiver(post_delete, sender=CustomFieldDefinition)
+def invalidate_custom_field_definition(sender, instance, **kwargs):
+    """Invalidates every patient, as definitions are embedded in each chart."""
+    all_patients_changed()
+
+
+@receiver(post_save, sender=CustomFieldDefinition)
+@receiver(post_delete, sender=CustomFieldDefinition)
+@receiver(m2m_changed, sender=User.available_custom_fields.through)
+def invalidate_local_caches(sender, **kwargs):
+    """Evicts the per-process caches of custom field definitions and assignments."""
+    if kwargs.get("action", "post_").startswith("post_"):
+        notify_model_changed(sender)
+
+
+def invalidate_relationship_patients(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    """
+    Invalidates the patients of changed many-to-many relationships.
+
+    Handles changes made from either side, e.g. patient.addresses.add() as
+    well as address.patient_set.add().
+    """
+    if not action.startswith("post_"):
+        return
+    if not reverse:
+        patients_changed([instance.pk])
+    elif pk_set is not None:
+        patients_changed(pk_set)
+    else:
+        # Reverse clear: the affected patients are no longer known
+        all_patients_changed()
+
+
+def invalidate_related_patients(sender, instance, **kwargs):
+    """Invalidates the patients linked to a record about to be deleted."""
+    patients_changed(instance.patient_set.values_list("pk", flat=True))
+
+
+def invalidate_summary_lists(sender, instance, created, **kwargs):
+    """Invalidates patient lists, as the record may change patient summaries."""
+    if not created:
+        invalidate_patient_lists()
+
+
+def request_record_chart_builds(sender, instance, created, **kwargs):
+    """Requests a rebuild of the charts showing an updated record."""
+    if not created:
+        patient_ids = instance.patient_set.values_list("pk", flat=True)
+        request_chart_builds(patient_ids)
+
+
+@receiver(post_save, sender=VisitSeries)
+@receiver(post_delete, sender=VisitSeries)
+def invalidate_series_lists(sender, instance, **kwargs):
+    """Invalidates patient lists, as summaries include the next occurrence."""
+    invalidate_patient_lists()
+
+
+@receiver(post_save, sender=VisitSeries)
+@receiver(post_delete, sender=VisitSeries)
+def request_series_chart_build(sender, instance, **kwargs):
+    """Requests a rebuild of the chart showing a visit series."""
+    request_chart_builds([instance.patient_id])
+
+
+def publish_record_saved(sender, instance, created, **kwargs):
+    """Publishes a created or updated record to the outbox."""
+    topic, serializer_class = RECORD_TOPICS[sender]
+    event = "created" if created else "updated"
+    record_event(topic, instance.pk, event, serializer_class(instance).data)
+
+
+def publish_record_deleted(sender, instance, **kwargs):
+    """Publishes the deletion of a record to the outbox."""
+    topic, _ = RECORD_TOPICS[sender]
+    record_event(topic, instance.pk, "deleted")
+
+
+for through_model in PATIENT_THROUGH_MODELS:
+    m2m_changed.connect(invalidate_relationship_patients, sender=through_model)
+
+for related_model in PATIENT_RELATED_MODELS:
+    pre_delete.connect(invalidate_related_patients, sender=related_model)
+
+for record_model in RECORD_TOPICS:
+    post_save.connect(invalidate_summary_lists, sender=record_model)
+    post_save.connect(request_record_chart_builds, sender=record_model)
+    post_save.connect(publish_record_saved, sender=record_model)
+    post_delete.connect(publish_record_deleted, sender=record_model)
+
+# Custom field values added through patient.custom_fields are bulk created
+m2m_changed.connect(invalidate_relationship_patients, sender=PatientCustomField)
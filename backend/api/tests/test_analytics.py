@@ -0,0 +1,139 @@
+from datetime import timedelta
+
+import numpy as np
+import pytest
+from django.core.cache import cache
+from django.utils import timezone
+
+from api import analytics
+from api.analytics import STUDY_DTYPE, pair_studies
+from api.exceptions import ResultPending
+
+
+def studies(*rows):
+    """Returns (patient, date) studies, sorted as by load_studies()."""
+    array = np.array([(patient, day, 10.0) for patient, day in rows], STUDY_DTYPE)
+    return array[np.lexsort((array["date"], array["patient"]))]
+
+
+def pair(studies, *queries):
+    patients = np.array([patient for patient, _ in queries], dtype=np.int64)
+    days = np.array([day for _, day in queries], dtype="datetime64[D]")
+    before, after = pair_studies(studies, patients, days)
+    return before.tolist(), after.tolist()
+
+
+def test_pairs_last_before_and_first_on_or_after():
+    sorted_studies = studies((1, "2026-01-01"), (1, "2026-02-01"), (1, "2026-03-01"))
+    assert pair(sorted_studies, (1, "2026-02-01"), (1, "2026-02-15")) == (
+        [0, 1],
+        [1, 2],
+    )
+
+
+def test_pairs_stop_at_patient_boundaries():
+    # Patient 2's studies lie between patient 1's last and patient 3's first
+    sorted_studies = studies(
+        (1, "2026-01-01"),
+        (2, "2026-02-01"),
+        (2, "2026-04-01"),
+        (3, "2026-01-01"),
+    )
+    assert pair(
+        sorted_studies,
+        (1, "2026-03-01"),  # After patient 1's only study
+        (2, "2026-01-01"),  # Before patient 2's first study
+        (2, "2026-05-01"),  # After patient 2's last study
+        (3, "2025-12-01"),  # Before patient 3's only study
+        (3, "2026-06-01"),  # After the last study of all
+    ) == ([0, -1, 2, -1, 3], [-1, 1, -1, 3, -1])
+
+
+def test_patients_without_studies():
+    sorted_studies = studies((1, "2026-01-01"), (3, "2026-01-01"))
+    queries = [(patient, "2026-01-01") for patient in (0, 2, 4)]
+    assert pair(sorted_studies, *queries) == ([-1, -1, -1], [-1, -1, -1])
+
+
+def test_days_outside_the_study_dates():
+    sorted_studies = studies((1, "2026-01-01"), (2, "2026-01-01"))
+    assert pair(sorted_studies, (1, "2020-01-01"), (1, "2030-01-01")) == (
+        [-1, 0],
+        [0, -1],
+    )
+
+
+def test_no_studies():
+    assert pair(studies(), (1, "2026-01-01")) == ([-1], [-1])
+    assert pair(studies((1, "2026-01-01"))) == ([], [])
+
+
+EFFICACY = {"CPAP": {"patients": 2}, "BiPAP": {"patients": 1}}
+
+
+@pytest.fixture
+def computations(settings, monkeypatch):
+    """Counts efficacy computations, against an empty local memory cache."""
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    settings.TREATMENT_EFFICACY_MAX_AGE = 60
+    cache.clear()
+    computations = []
+
+    def compute():
+        computations.append(1)
+        return EFFICACY
+
+    monkeypatch.setattr(analytics, "compute_treatment_efficacy", compute)
+    monkeypatch.setattr(analytics, "EFFICACY_WAIT_TIMEOUT", 0.05)
+    monkeypatch.setattr(analytics, "EFFICACY_POLL_INTERVAL", 0.01)
+    return computations
+
+
+def store(age):
+    result = {"computed_at": timezone.now() - age, "types": {"CPAP": {}}}
+    cache.set(analytics.EFFICACY_CACHE_KEY, result, None)
+    return result
+
+
+def test_efficacy_computed_once_and_stored(computations):
+    assert analytics.get_treatment_efficacy()["types"] == EFFICACY
+    assert analytics.get_treatment_efficacy(["CPAP", "Other"])["types"] == {
+        "CPAP": {"patients": 2}
+    }
+    assert len(computations) == 1
+    assert cache.get(analytics.EFFICACY_LOCK_KEY) is None
+
+
+def test_stored_efficacy_served_until_outdated(computations):
+    stored = store(timedelta(seconds=30))
+    assert analytics.get_treatment_efficacy() == stored
+    assert not computations
+
+    store(timedelta(seconds=90))
+    assert analytics.get_treatment_efficacy()["types"] == EFFICACY
+    assert len(computations) == 1
+
+
+def test_outdated_efficacy_served_during_refresh(computations):
+    stored = store(timedelta(seconds=90))
+    cache.add(analytics.EFFICACY_LOCK_KEY, True)
+    assert analytics.get_treatment_efficacy() == stored
+    assert not computations
+
+
+def test_first_efficacy_awaited_during_computation(computations, monkeypatch):
+    cache.add(analytics.EFFICACY_LOCK_KEY, True)
+    # The other request stores its result while this one waits
+    monkeypatch.setattr(analytics.time, "sleep", lambda seconds: store(timedelta()))
+    assert analytics.get_treatment_efficacy()["types"] == {"CPAP": {}}
+    assert not computations
+
+
+def test_first_efficacy_pending_during_computation(computations):
+    cache.add(analytics.EFFICACY_LOCK_KEY, True)
+    with pytest.raises(ResultPending) as raised:
+        analytics.get_treatment_efficacy()
+    assert raised.value.wait == analytics.EFFICACY_RETRY_AFTER
+    assert not computations
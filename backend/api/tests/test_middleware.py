@@ -0,0 +1,42 @@
+import pytest
+from django.test import RequestFactory
+
+from api.checks import check_session_middleware
+from api.middleware import SessionMiddleware
+
+STOCK_SESSION = "django.contrib.sessions.middleware.SessionMiddleware"
+STOCK_AUTH = "django.contrib.auth.middleware.AuthenticationMiddleware"
+
+
+def session_set(path, **headers):
+    request = RequestFactory().get(path, **headers)
+    SessionMiddleware(lambda request: hasattr(request, "session"))(request)
+    return hasattr(request, "session")
+
+
+def test_session_skipped_for_bearer_token_api_requests():
+    assert not session_set("/api/patients/", HTTP_AUTHORIZATION="Bearer token")
+    assert session_set("/api/patients/")
+    assert session_set("/api/patients/", HTTP_AUTHORIZATION="Basic token")
+    assert session_set("/admin/", HTTP_AUTHORIZATION="Bearer token")
+
+
+def check_ids(settings, middleware):
+    settings.MIDDLEWARE = middleware
+    return [message.id for message in check_session_middleware(None)]
+
+
+def test_configured_middleware_passes(settings):
+    assert check_ids(settings, settings.MIDDLEWARE) == []
+
+
+@pytest.mark.parametrize(
+    "middleware, ids",
+    [
+        ([STOCK_SESSION, STOCK_AUTH], ["api.W001", "api.W001"]),
+        ([STOCK_SESSION, "api.middleware.AuthenticationMiddleware"], ["api.W001"]),
+        (["api.middleware.SessionMiddleware", STOCK_AUTH], ["api.E001"]),
+    ],
+)
+def test_stock_session_middleware(settings, middleware, ids):
+    assert check_ids(settings, middleware) == ids
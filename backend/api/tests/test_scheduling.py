@@ -0,0 +1,67 @@
+from api.scheduling import DaySchedule
+
+
+def busy(schedule):
+    return list(zip(schedule.starts, schedule.ends, strict=True))
+
+
+def test_busy_where_capacity_visits_overlap():
+    schedule = DaySchedule([(0, 60), (30, 90), (120, 150)], capacity=2)
+    assert busy(schedule) == [(30, 60)]
+
+
+def test_not_busy_below_capacity():
+    schedule = DaySchedule([(0, 60), (30, 90)], capacity=3)
+    assert busy(schedule) == []
+
+
+def test_back_to_back_visits_do_not_overlap():
+    schedule = DaySchedule([(0, 30), (30, 60)], capacity=2)
+    assert busy(schedule) == []
+
+
+def test_back_to_back_busy_intervals_merge():
+    schedule = DaySchedule([(30, 60), (0, 30), (60, 90)], capacity=1)
+    assert busy(schedule) == [(0, 90)]
+
+
+def test_capacity_sweep_over_many_visits():
+    # Occupancy: 1 from 0, 2 from 10, 3 from 20, 2 from 40, 3 from 50, 1 from 70
+    intervals = [(0, 80), (10, 40), (20, 70), (50, 70)]
+    assert busy(DaySchedule(intervals, capacity=3)) == [(20, 40), (50, 70)]
+    assert busy(DaySchedule(intervals, capacity=2)) == [(10, 70)]
+
+
+def test_conflict_returns_end_of_overlapping_interval():
+    schedule = DaySchedule([(30, 60), (90, 120)], capacity=1)
+    assert schedule.conflict(0, 30) is None
+    assert schedule.conflict(0, 31) == 60
+    assert schedule.conflict(59, 91) == 60
+    assert schedule.conflict(60, 90) is None
+    assert schedule.conflict(100, 110) == 120
+    assert schedule.conflict(120, 180) is None
+
+
+def test_free_slots_skip_busy_intervals():
+    schedule = DaySchedule([(30, 60)], capacity=1)
+    slots = list(schedule.free_slots((0, 120), duration=30, step=15))
+    assert slots == [0, 60, 75, 90]
+
+
+def test_free_slots_between_back_to_back_visits():
+    schedule = DaySchedule([(30, 60), (60, 90)], capacity=1)
+    slots = list(schedule.free_slots((0, 150), duration=30, step=30))
+    assert slots == [0, 90, 120]
+
+
+def test_free_slots_stay_on_period_grid():
+    # A busy interval ending off the grid resumes at the next grid minute
+    schedule = DaySchedule([(480, 505)], capacity=1)
+    slots = list(schedule.free_slots((470, 560), duration=20, step=15))
+    assert slots == [515, 530]
+
+
+def test_free_slots_not_before():
+    schedule = DaySchedule([], capacity=1)
+    slots = list(schedule.free_slots((0, 60), duration=15, step=15, not_before=20))
+    assert slots == [30, 45]
@@ -0,0 +1,151 @@
+import operator
+from datetime import date, time
+from types import SimpleNamespace
+
+import pytest
+
+from api import timeline
+from api.models import SleepStudy, Treatment, Visit
+
+PATIENT = 1
+DAY = date(2026, 3, 2)
+
+LOOKUPS = {
+    "": operator.eq,
+    "gte": operator.ge,
+    "lte": operator.le,
+    "isnull": lambda value, isnull: (value is None) == isnull,
+}
+
+
+class RecordQuerySet:
+    """An in-memory stand-in for the querysets read by timeline._read()."""
+
+    def __init__(self, records):
+        self.records = records
+
+    def _matching(self, conditions, lookups):
+        records = self.records
+        for condition in conditions:
+            records = [record for record in records if condition(record)]
+        for lookup, value in lookups.items():
+            name, _, kind = lookup.partition("__")
+            test = LOOKUPS[kind]
+            records = [r for r in records if test(getattr(r, name), value)]
+        return records
+
+    def filter(self, *conditions, **lookups):
+        return RecordQuerySet(self._matching(conditions, lookups))
+
+    def exclude(self, **lookups):
+        excluded = self._matching([], lookups)
+        return RecordQuerySet([r for r in self.records if r not in excluded])
+
+    def order_by(self, *names):
+        # Nulls sort last, as in Postgres
+        records = list(self.records)
+        for name in reversed(names):
+            field = name.lstrip("-")
+            records.sort(
+                key=lambda record: (
+                    getattr(record, field) is None,
+                    getattr(record, field),
+                ),
+                reverse=name.startswith("-"),
+            )
+        return RecordQuerySet(records)
+
+    def __getitem__(self, index):
+        return self.records[index]
+
+
+def seek_condition(model, fields, after, descending=False):
+    compare = operator.lt if descending else operator.gt
+
+    def condition(record):
+        key = tuple(getattr(record, field.attname) for field in fields)
+        return compare(key, tuple(after))
+
+    return condition
+
+
+def record(id, patient_id=PATIENT, **fields):
+    return SimpleNamespace(id=id, pk=id, patient_id=patient_id, **fields)
+
+
+@pytest.fixture
+def records(monkeypatch):
+    """Replaces the timeline sources' records with in-memory ones."""
+    records = {Treatment: [], SleepStudy: [], Visit: []}
+    sources = tuple(
+        source._replace(
+            model=SimpleNamespace(
+                _meta=source.model._meta,
+                objects=RecordQuerySet(records[source.model]),
+            )
+        )
+        for source in timeline.SOURCES
+    )
+    monkeypatch.setattr(timeline, "SOURCES", sources)
+    monkeypatch.setattr(timeline, "seek_condition", seek_condition)
+    return records
+
+
+def keys(entries):
+    return [entry.key for entry in entries]
+
+
+def test_entries_of_a_date_in_kind_and_time_order(records):
+    records[Treatment] += [
+        record(1, start_date=DAY, end_date=DAY),
+        record(2, start_date=date(2026, 3, 1), end_date=None),
+    ]
+    records[SleepStudy] += [record(3, date=DAY)]
+    records[Visit] += [
+        record(4, date=DAY, time=time(9)),
+        record(5, date=DAY, time=time(8)),
+    ]
+
+    entries = list(timeline.get_timeline(PATIENT, None, 10))
+    assert [(entry.kind, entry.record.id) for entry in entries] == [
+        ("treatment_start", 2),
+        ("treatment_start", 1),
+        ("sleep_study", 3),
+        ("treatment_end", 1),
+        ("visit", 5),
+        ("visit", 4),
+    ]
+    descending = list(timeline.get_timeline(PATIENT, None, 10, descending=True))
+    assert descending == entries[::-1]
+
+
+def test_other_patients_records_are_excluded(records):
+    records[SleepStudy] += [record(1, date=DAY), record(2, patient_id=2, date=DAY)]
+    entries = list(timeline.get_timeline(PATIENT, None, 10))
+    assert [entry.record.id for entry in entries] == [1]
+
+
+@pytest.mark.parametrize("descending", [False, True])
+@pytest.mark.parametrize("batch_size", [1, 2, 3, 50])
+def test_cursors_continue_after_ties_on_one_date(records, descending, batch_size):
+    # Many entries share the date, and the visits their time
+    records[Visit] += [record(id, date=DAY, time=time(9)) for id in range(10, 17)]
+    records[Visit] += [record(17, date=date(2026, 3, 3), time=time(8))]
+    records[SleepStudy] += [record(id, date=DAY) for id in (20, 21, 22)]
+    records[Treatment] += [record(30, start_date=DAY, end_date=DAY)]
+
+    expected = keys(timeline.get_timeline(PATIENT, None, 50, descending))
+    assert len(expected) == 13
+    assert expected == sorted(expected, reverse=descending)
+    for index, after in enumerate(expected):
+        entries = timeline.get_timeline(PATIENT, after, batch_size, descending)
+        assert keys(entries) == expected[index + 1 :]
+
+
+def test_cursor_of_a_removed_entry(records):
+    # A cursor continues after its key even once its entry is gone
+    records[Visit] += [record(id, date=DAY, time=time(9)) for id in (1, 3)]
+    after = (DAY, time(9), 2, 2)
+    assert [e.record.id for e in timeline.get_timeline(PATIENT, after, 1)] == [3]
+    descending = timeline.get_timeline(PATIENT, after, 1, descending=True)
+    assert [e.record.id for e in descending] == [1]
@@ -0,0 +1,115 @@
+"""
+This module provides patient timelines: one chronological feed of a
+patient's visits, sleep studies, and treatment starts and ends.
+
+Each kind of entry has a source, read in timeline order from an index on
+(patient, date, ...) in batches of at most a page, and the sources are
+merged lazily with a heap. A page therefore costs one short index range
+scan per source, however long the patient's history.
+
+Features:
+- Entries ordered by (date, time, kind, id), oldest or newest first
+- Keys naming an entry, to continue a timeline after it (keyset paging)
+- Sources read only as far as the merge consumes them
+
+Notes:
+- Records are found by their patient field, i.e. under the patient they
+  are linked to first (see migration 0012_record_patient)
+- Unwritten occurrences of visit series are not part of timelines
+- Entries without a time (all but visits) sort before the visits of
+  their date
+"""
+
+import heapq
+from collections import namedtuple
+from datetime import date, time
+
+from .keyset import seek_condition
+from .models import SleepStudy, Treatment, Visit
+
+# A source of timeline entries: records of model, dated by date_field
+TimelineSource = namedtuple(
+    "TimelineSource", ["kind", "model", "date_field", "time_field"]
+)
+
+# Sources in the order of their entries within a date and time
+SOURCES = (
+    TimelineSource("treatment_start", Treatment, "start_date", None),
+    TimelineSource("sleep_study", SleepStudy, "date", None),
+    TimelineSource("visit", Visit, "date", "time"),
+    TimelineSource("treatment_end", Treatment, "end_date", None),
+)
+
+# An entry of a timeline: key is (date, time, kind rank, record id)
+TimelineEntry = namedtuple("TimelineEntry", ["key", "kind", "record"])
+
+
+def parse_key(values):
+    """
+    Returns the timeline key of its string values, as in a cursor.
+
+    Raises ValueError if the values are not a key.
+    """
+    day, entry_time, rank, record_id = values
+    rank, record_id = int(rank), int(record_id)
+    if not 0 <= rank < len(SOURCES):
+        raise ValueError(f"Unknown timeline source {rank}.")
+    return (date.fromisoformat(day), time.fromisoformat(entry_time), rank, record_id)
+
+
+def _read(rank, patient_id, after, batch_size, descending):
+    """Yields the entries of a source after the key after, in timeline order."""
+    source = SOURCES[rank]
+    fields = [source.date_field, source.time_field, "id"]
+    fields = [source.model._meta.get_field(name) for name in fields if name]
+    queryset = source.model.objects.filter(patient_id=patient_id).order_by(
+        *(f"-{field.name}" if descending else field.name for field in fields)
+    )
+    if fields[0].null:
+        # Ongoing treatments have no end (yet)
+        queryset = queryset.exclude(**{f"{source.date_field}__isnull": True})
+
+    def key(record):
+        entry_time = getattr(record, source.time_field) if source.time_field else None
+        return (
+            getattr(record, source.date_field),
+            entry_time or time.min,
+            rank,
+            record.pk,
+        )
+
+    batch = queryset
+    if after is not None:
+        # The entries of the cursor's date are compared in full below
+        lookup = "lte" if descending else "gte"
+        batch = batch.filter(**{f"{source.date_field}__{lookup}": after[0]})
+    while True:
+        records = list(batch[:batch_size])
+        for record in records:
+            entry_key = key(record)
+            if after is None or (
+                entry_key < after if descending else entry_key > after
+            ):
+                yield TimelineEntry(entry_key, source.kind, record)
+        if len(records) < batch_size:
+            return
+        last = [getattr(records[-1], field.attname) for field in fields]
+        batch = queryset.filter(seek_condition(source.model, fields, last, descending))
+
+
+def get_timeline(patient_id, after, count, descending=False):
+    """
+    Returns a generator of a patient's timeline entries after the key after.
+
+    after is None for the start of the timeline. Each source is read in
+    batches of count entries, so the first count entries take one query
+    per source. descending orders the entries newest first.
+    """
+    return heapq.merge(
+        *(
+            _read(rank, patient_id, after, count, descending)
+            for rank in range(len(SOURCES))
+        ),
+        key=lambda entry: entry.key,
+        reverse=descending,
+    )
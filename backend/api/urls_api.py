@@ -0,0 +1,256 @@
+"""
+This module defines the URL routing configuration for the StellarCare REST API.
+
+It is the root URLconf of API-only workers (see api.settings_api) and is
+included by api.urls, which adds the admin and API documentation.
+
+URL patterns are organized into logical groups:
+1. Authentication endpoints
+2. User management
+3. Patient management
+4. Custom field configuration
+5. Medical records
+6. Administrative records
+7. Async (ASGI) read endpoints and event stream
+8. Operational metrics
+9. Clinical analytics
+
+Features:
+- RESTful API endpoints
+- Token-based authentication
+- Nested resource paths
+- Named URL patterns for reverse lookup
+"""
+
+from django.urls import include, path
+from rest_framework import routers
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+
+from .api import UserViewSet
+from .views import (
+    AppointmentDetailView,
+    AsyncAppointmentDetailView,
+    AsyncInsuranceDetailView,
+    AsyncPatientListView,
+    AsyncPatientQueryView,
+    AsyncSleepStudyDetailView,
+    AsyncTreatmentDetailView,
+    CustomFieldDefinitionAssignedView,
+    CustomFieldDefinitionAssignView,
+    CustomFieldDefinitionListCreateView,
+    CustomFieldDefinitionRetrieveUpdateDeleteView,
+    DatabasePoolMetricsView,
+    EventStreamView,
+    InsuranceDetailView,
+    PatientChangesView,
+    PatientChartView,
+    PatientCustomFieldListView,
+    PatientListCreateView,
+    PatientQueryView,
+    PatientRetrieveUpdateDeleteView,
+    PatientTimelineView,
+    SleepStudyDetailView,
+    SleepStudyStatisticsView,
+    TokenRevokeView,
+    TreatmentDetailView,
+    TreatmentEfficacyView,
+    TreatmentPeriodListView,
+    VisitCalendarView,
+    VisitOccurrenceView,
+    VisitScheduleView,
+    VisitSeriesDetailView,
+    VisitSeriesListCreateView,
+    VisitSlotsView,
+)
+
+# Router configuration for viewsets
+router = routers.DefaultRouter()
+router.register("users", UserViewSet, basename="api-users")
+
+# Authentication endpoints
+auth_patterns = [
+    path("api/token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
+    path("api/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+    path("api/token/revoke/", TokenRevokeView.as_view(), name="token_revoke"),
+]
+
+# User management endpoints (router)
+user_patterns = [
+    path("api/", include(router.urls)),
+]
+
+# Patient management endpoints
+patient_patterns = [
+    path("api/patients/", PatientListCreateView.as_view(), name="patient-list-create"),
+    path("api/patients/search/", PatientQueryView.as_view(), name="patient-search"),
+    path(
+        "api/patients/changes/",
+        PatientChangesView.as_view(),
+        name="patient-changes",
+    ),
+    path(
+        "api/patients/<str:pk>/",
+        PatientRetrieveUpdateDeleteView.as_view(),
+        name="patient-detail",
+    ),
+    path(
+        "api/patients/<int:pk>/chart/",
+        PatientChartView.as_view(),
+        name="patient-chart",
+    ),
+    path(
+        "api/patients/<int:pk>/timeline/",
+        PatientTimelineView.as_view(),
+        name="patient-timeline",
+    ),
+    path(
+        "api/patients/<int:patient_id>/custom-fields/",
+        PatientCustomFieldListView.as_view(),
+        name="patient-custom-fields",
+    ),
+]
+
+# Custom field configuration endpoints
+custom_field_patterns = [
+    path(
+        "api/custom-field-definitions/",
+        CustomFieldDefinitionListCreateView.as_view(),
+        name="custom-field-definition-list-create",
+    ),
+    path(
+        "api/custom-field-definitions/assigned/",
+        CustomFieldDefinitionAssignedView.as_view(),
+        name="custom-field-definition-assigned",
+    ),
+    path(
+        "api/custom-field-definitions/<int:pk>/",
+        CustomFieldDefinitionRetrieveUpdateDeleteView.as_view(),
+        name="custom-field-definition-detail",
+    ),
+    path(
+        "api/custom-field-definitions/<int:pk>/assign/",
+        CustomFieldDefinitionAssignView.as_view(),
+        name="custom-field-definition-assign",
+    ),
+]
+
+# Medical and administrative record endpoints
+record_patterns = [
+    path("api/visits/", VisitCalendarView.as_view(), name="visit-calendar"),
+    path("api/visits/slots/", VisitSlotsView.as_view(), name="visit-slots"),
+    path(
+        "api/visits/schedule/",
+        VisitScheduleView.as_view(),
+        name="visit-schedule",
+    ),
+    path(
+        "api/visit-series/",
+        VisitSeriesListCreateView.as_view(),
+        name="visit-series-list-create",
+    ),
+    path(
+        "api/visit-series/<int:pk>/",
+        VisitSeriesDetailView.as_view(),
+        name="visit-series-detail",
+    ),
+    path(
+        "api/visit-series/<int:pk>/occurrences/<str:occurrence_date>/",
+        VisitOccurrenceView.as_view(),
+        name="visit-occurrence",
+    ),
+    path(
+        "api/appointments/<int:pk>/",
+        AppointmentDetailView.as_view(),
+        name="appointment-detail",
+    ),
+    path(
+        "api/treatments/",
+        TreatmentPeriodListView.as_view(),
+        name="treatment-period-list",
+    ),
+    path(
+        "api/treatments/<int:pk>/",
+        TreatmentDetailView.as_view(),
+        name="treatment-detail",
+    ),
+    path(
+        "api/sleep-studies/<int:pk>/",
+        SleepStudyDetailView.as_view(),
+        name="sleep-study-detail",
+    ),
+    path(
+        "api/insurance/<int:pk>/",
+        InsuranceDetailView.as_view(),
+        name="insurance-detail",
+    ),
+]
+
+# Async read endpoints, mirroring the sync ones for ASGI deployments
+async_patterns = [
+    path("api/events/", EventStreamView.as_view(), name="event-stream"),
+    path(
+        "api/async/patients/",
+        AsyncPatientListView.as_view(),
+        name="async-patient-list",
+    ),
+    path(
+        "api/async/patients/search/",
+        AsyncPatientQueryView.as_view(),
+        name="async-patient-search",
+    ),
+    path(
+        "api/async/appointments/<int:pk>/",
+        AsyncAppointmentDetailView.as_view(),
+        name="async-appointment-detail",
+    ),
+    path(
+        "api/async/treatments/<int:pk>/",
+        AsyncTreatmentDetailView.as_view(),
+        name="async-treatment-detail",
+    ),
+    path(
+        "api/async/sleep-studies/<int:pk>/",
+        AsyncSleepStudyDetailView.as_view(),
+        name="async-sleep-study-detail",
+    ),
+    path(
+        "api/async/insurance/<int:pk>/",
+        AsyncInsuranceDetailView.as_view(),
+        name="async-insurance-detail",
+    ),
+]
+
+# Operational metrics endpoints
+metrics_patterns = [
+    path(
+        "api/metrics/db-pool/",
+        DatabasePoolMetricsView.as_view(),
+        name="metrics-db-pool",
+    ),
+]
+
+# Clinical analytics endpoints
+analytics_patterns = [
+    path(
+        "api/analytics/sleep-studies/",
+        SleepStudyStatisticsView.as_view(),
+        name="analytics-sleep-studies",
+    ),
+    path(
+        "api/analytics/treatment-efficacy/",
+        TreatmentEfficacyView.as_view(),
+        name="analytics-treatment-efficacy",
+    ),
+]
+
+# Combine all URL patterns
+urlpatterns = (
+    auth_patterns
+    + user_patterns
+    + patient_patterns
+    + custom_field_patterns
+    + record_patterns
+    + async_patterns
+    + metrics_patterns
+    + analytics_patterns
+)
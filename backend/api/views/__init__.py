@@ -2,19 +2,35 @@
 This package provides view classes for the StellarCare application.
 It implements a modular approach to views, organizing them by domain:
 - Patient management
+- Token management
 - Custom field configuration
 - Medical records
 - Administrative records
+- Clinical analytics
 
 Features:
 - RESTful API views
+- Async views for ASGI deployments
+- Server-Sent Events stream of changes
+- Operational metrics
 - Pagination support
 - Search functionality
 - Detailed logging
 - Error handling
 """
 
-from .base import CustomPagination  # noqa
+from .analytics import SleepStudyStatisticsView, TreatmentEfficacyView  # noqa
+from .asynchronous import (  # noqa
+    AsyncAppointmentDetailView,
+    AsyncInsuranceDetailView,
+    AsyncPatientListView,
+    AsyncPatientQueryView,
+    AsyncSleepStudyDetailView,
+    AsyncTreatmentDetailView,
+)
+from .auth import TokenRevokeView  # noqa
+from .base import AsyncCustomPagination, CustomPagination, KeysetPagination  # noqa
+from .events import EventStreamView  # noqa
 from .custom_fields import (  # noqa
     CustomFieldDefinitionAssignedView,
     CustomFieldDefinitionAssignView,
@@ -25,13 +41,24 @@ from .custom_fields import (  # noqa
 from .medical import (  # noqa
     SleepStudyDetailView,
     TreatmentDetailView,
+    TreatmentPeriodListView,
 )
+from .metrics import DatabasePoolMetricsView  # noqa
 from .patient import (  # noqa
+    PatientChangesView,
+    PatientChartView,
     PatientListCreateView,
     PatientQueryView,
     PatientRetrieveUpdateDeleteView,
+    PatientTimelineView,
 )
 from .records import (  # noqa
     AppointmentDetailView,
     InsuranceDetailView,
+    VisitCalendarView,
+    VisitOccurrenceView,
+    VisitScheduleView,
+    VisitSeriesDetailView,
+    VisitSeriesListCreateView,
+    VisitSlotsView,
 )
@@ -0,0 +1,118 @@
+"""
+This module provides views for clinical analytics.
+
+Features:
+- Sleep study statistics of patient cohorts
+- Treatment efficacy: AHI before and after treatment starts
+- Cached cohort results, recomputed after changes
+- Stored treatment efficacy, recomputed once outdated
+- Detailed logging
+"""
+
+import logging
+
+from drf_spectacular.utils import OpenApiParameter, OpenApiResponse, extend_schema
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ..analytics import AGE_BANDS, get_cohort_statistics, get_treatment_efficacy
+from ..models import Patient
+from ..serializers import SleepStudyStatisticsSerializer, TreatmentEfficacySerializer
+
+logger = logging.getLogger(__name__)
+
+# Cohort filters: {parameter: allowed values, or None for any}
+COHORT_FILTERS = {
+    "status": [value for value, _ in Patient.PATIENT_STATUSES],
+    "age": list(AGE_BANDS),
+    "insurance_provider": None,
+    "treatment_type": None,
+}
+
+
+class SleepStudyStatisticsView(APIView):
+    """
+    View for sleep study statistics of a patient cohort (see api.analytics).
+
+    Endpoints:
+    - GET: AHI, sleep efficiency and REM latency distributions
+
+    Query Parameters (comma-separated; all patients if none given):
+    - status: Patient statuses
+    - age: Age bands (0-17, 18-39, 40-64, 65+)
+    - insurance_provider: Insurance providers
+    - treatment_type: Treatment types, past or present
+
+    Response:
+    - cohort: The applied filters
+    - studies, patients: Number of studies and of their patients
+    - metrics: Per metric mean, std, min, max, percentiles and histogram
+      (null without studies)
+    - severity: Number of studies per AHI severity bucket
+    """
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                param,
+                str,
+                description=f"Comma-separated: {', '.join(allowed)}"
+                if allowed
+                else "Comma-separated",
+            )
+            for param, allowed in COHORT_FILTERS.items()
+        ],
+        responses=SleepStudyStatisticsSerializer,
+    )
+    def get(self, request):
+        """Returns the statistics of the requested cohort."""
+        cohort = {}
+        for param, allowed in COHORT_FILTERS.items():
+            if not request.query_params.get(param):
+                continue
+            values = request.query_params[param].split(",")
+            if allowed is not None and not set(values) <= set(allowed):
+                raise ValidationError({param: f"Must be one of {', '.join(allowed)}."})
+            cohort[param] = values
+
+        statistics = get_cohort_statistics(cohort)
+        return Response({"cohort": cohort, **statistics})
+
+
+class TreatmentEfficacyView(APIView):
+    """
+    View for the efficacy of treatment types (see api.analytics).
+
+    Endpoints:
+    - GET: AHI before and after treatment starts, by treatment type
+
+    Query Parameters:
+    - type: Treatment types (comma-separated; default: all)
+
+    Response:
+    - computed_at: When the efficacy was computed (see
+      TREATMENT_EFFICACY_MAX_AGE)
+    - types: Per treatment type the patients on it, the paired studies, the
+      AHI distributions before and after and of the change, and the
+      patients improved and resolved (see compute_treatment_efficacy())
+
+    Notes:
+    - 503 Service Unavailable with Retry-After while another request is
+      computing the first result
+    """
+
+    @extend_schema(
+        parameters=[OpenApiParameter("type", str, description="Comma-separated")],
+        responses={
+            200: TreatmentEfficacySerializer,
+            503: OpenApiResponse(
+                description="Another request is computing the first result; "
+                "retry after the Retry-After seconds"
+            ),
+        },
+    )
+    def get(self, request):
+        """Returns the efficacy of the requested treatment types."""
+        types = request.query_params.get("type")
+        return Response(get_treatment_efficacy(types.split(",") if types else None))
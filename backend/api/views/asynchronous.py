@@ -0,0 +1,164 @@
+"""
+This module provides async views for read-heavy endpoints served under ASGI.
+
+The views mirror their synchronous counterparts but use Django's async ORM,
+so a single ASGI worker can hold many concurrent slow-client connections
+without tying up a thread per request.
+
+Features:
+- Async patient listing with async pagination
+- Async patient search
+- Async medical and administrative record retrieval
+- Detailed logging
+"""
+
+import logging
+
+from django.db.models import Prefetch, Q
+from drf_spectacular.utils import OpenApiParameter, extend_schema
+from rest_framework import status
+from rest_framework.response import Response
+
+from ..models import Insurance, Patient, SleepStudy, Treatment, Visit
+from ..serializers import (
+    InsuranceSerializer,
+    PatientSerializer,
+    SleepStudySerializer,
+    TreatmentSerializer,
+    VisitSerializer,
+)
+from .base import AsyncAPIView, AsyncCustomPagination, AsyncRetrieveAPIView
+
+logger = logging.getLogger(__name__)
+
+
+def get_patient_queryset():
+    """
+    Returns the patient queryset used by the async views.
+
+    Every relation rendered by PatientSerializer is prefetched, because lazy
+    relation access is not allowed once serialization runs in the event loop.
+    Record relations only render primary keys, so only ids are loaded.
+    """
+    return Patient.objects.prefetch_related(
+        "addresses",
+        "patient_custom_fields",
+        "patient_custom_fields__field_definition",
+        Prefetch("studies", queryset=SleepStudy.objects.only("id").order_by("id")),
+        Prefetch("treatments", queryset=Treatment.objects.only("id").order_by("id")),
+        Prefetch("insurance", queryset=Insurance.objects.only("id").order_by("id")),
+        Prefetch("appointments", queryset=Visit.objects.only("id").order_by("id")),
+    )
+
+
+class AsyncPatientListView(AsyncAPIView):
+    """
+    Async view for listing patients.
+
+    Endpoints:
+    - GET: List all patients with pagination
+
+    Features:
+    - Async pagination support
+    - Ordering by creation date
+    - Same response format as PatientListCreateView
+    """
+
+    pagination_class = AsyncCustomPagination
+
+    @extend_schema(responses=PatientSerializer(many=True))
+    async def get(self, request):
+        """Lists patients, newest first."""
+        logger.info(
+            f"Processing async list request with params: {request.query_params}"
+        )
+        paginator = self.pagination_class()
+        queryset = get_patient_queryset().order_by("-created_at")
+        page = await paginator.apaginate_queryset(queryset, request, view=self)
+        serializer = PatientSerializer(page, many=True, context={"request": request})
+        logger.info(f"Returning {len(page)} patients")
+        return paginator.get_paginated_response(serializer.data)
+
+
+class AsyncPatientQueryView(AsyncAPIView):
+    """
+    Async view for searching patients.
+
+    Features:
+    - Search by ID (exact match)
+    - Search by name (case-insensitive partial match)
+    - Same behaviour and response format as PatientQueryView
+
+    Query Parameters:
+    - q: Search query (required)
+    """
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "q",
+                str,
+                required=True,
+                description="Patient ID, or part of a first, middle or last name",
+            )
+        ],
+        responses=PatientSerializer(many=True),
+    )
+    async def get(self, request):
+        """Handles patient search requests."""
+        query = request.query_params.get("q", None)
+        if not query:
+            return Response(
+                {"error": "Query parameter 'q' is required."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        logger.info(f"Searching patients with query: {query}")
+
+        if query.isdigit():
+            filters = Q(id=query)
+        else:
+            filters = (
+                Q(first__icontains=query)
+                | Q(last__icontains=query)
+                | Q(middle__icontains=query)
+            )
+        patients = [
+            patient
+            async for patient in get_patient_queryset()
+            .filter(filters)
+            .aiterator(chunk_size=100)
+        ]
+
+        logger.info(f"Found {len(patients)} matching patients")
+
+        serializer = PatientSerializer(patients, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class AsyncSleepStudyDetailView(AsyncRetrieveAPIView):
+    """Async view for retrieving sleep study details."""
+
+    queryset = SleepStudy.objects.all()
+    serializer_class = SleepStudySerializer
+
+
+class AsyncTreatmentDetailView(AsyncRetrieveAPIView):
+    """Async view for retrieving treatment details."""
+
+    queryset = Treatment.objects.all()
+    serializer_class = TreatmentSerializer
+
+
+class AsyncAppointmentDetailView(AsyncRetrieveAPIView):
+    """Async view for retrieving appointment details."""
+
+    queryset = Visit.objects.all()
+    serializer_class = VisitSerializer
+
+
+class AsyncInsuranceDetailView(AsyncRetrieveAPIView):
+    """Async view for retrieving insurance record details."""
+
+    queryset = Insurance.objects.all()
+    serializer_class = InsuranceSerializer
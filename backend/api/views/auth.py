@@ -0,0 +1,58 @@
+"""
+This module provides views for token management.
+
+Features:
+- Token revocation (logout)
+- Denylisting of access and refresh tokens
+"""
+
+import logging
+
+from drf_spectacular.utils import extend_schema
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from ..authentication import revoke_token
+from ..serializers import TokenRevokeSerializer
+
+logger = logging.getLogger(__name__)
+
+
+class TokenRevokeView(APIView):
+    """
+    View for revoking JSON web tokens.
+
+    Endpoints:
+    - POST: Revoke the access token used for the request, and optionally a
+      refresh token passed as "refresh"
+
+    Features:
+    - Revoked tokens are rejected for the rest of their lifetime
+    - Only tokens issued to the requesting user can be revoked
+    """
+
+    serializer_class = TokenRevokeSerializer
+
+    @extend_schema(request=TokenRevokeSerializer, responses={204: None})
+    def post(self, request):
+        """Revokes the request's access token and the given refresh token."""
+        serializer = TokenRevokeSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        refresh = serializer.validated_data.get("refresh")
+        user_id = refresh.get(jwt_settings.USER_ID_CLAIM) if refresh else None
+        if refresh is not None and str(user_id) != str(request.user.pk):
+            return Response(
+                {"refresh": ["Token was not issued to the current user"]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if request.auth is not None:
+            revoke_token(request.auth)
+        if refresh is not None:
+            revoke_token(refresh)
+
+        logger.info(f"Revoked tokens of user {request.user.username}")
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -3,15 +3,36 @@ This module provides base classes and common functionality for views.
 
 Features:
 - Custom pagination
+- Async pagination and retrieval for ASGI views
+- Keyset pagination for large, append-mostly lists
+- Conditional GET support (ETag / Last-Modified)
 - Response formatting
 - Logging configuration
 - Common utilities
 """
 
+import base64
+import hashlib
+import json
 import logging
+from itertools import islice
 
-from rest_framework.pagination import PageNumberPagination
+from adrf.views import APIView as AsyncAPIView
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.paginator import InvalidPage, Page
+from django.http import Http404
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import http_date
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from ..keyset import seek_condition
 
 logger = logging.getLogger(__name__)
 
@@ -59,3 +80,301 @@ class CustomPagination(PageNumberPagination):
                 "results": data,
             }
         )
+
+
+class ConditionalGetMixin:
+    """
+    Mixin answering conditional GET requests with 304 Not Modified.
+
+    Features:
+    - ETag derived from a cheap validator instead of the response body
+    - Last-Modified when the validator provides a modification time
+    - If-None-Match and If-Modified-Since handling (Django's rules)
+    - Responses are revalidated by clients on every use
+
+    Subclasses override get_validators(), which must not load or serialize
+    the resource; checking a validator should cost far less than a response.
+    Without validators, requests are handled unconditionally.
+    """
+
+    def get_validators(self):
+        """
+        Returns (state, last_modified) describing the current representation.
+
+        state is any value that changes whenever the response would, or None
+        when the resource cannot be validated (e.g. it does not exist), in
+        which case the request is handled as usual. last_modified is an
+        aware datetime, or None if no modification time is known.
+        """
+        return None, None
+
+    def get_etag(self, state):
+        """Returns the strong ETag of the representation in the given state."""
+        # Representations differ per query string and negotiated format
+        request = self.request
+        etag_source = (
+            f"{state}:{request.accepted_renderer.format}:{request.get_full_path()}"
+        )
+        return f'"{hashlib.sha256(etag_source.encode()).hexdigest()[:32]}"'
+
+    def get(self, request, *args, **kwargs):
+        """Returns 304 Not Modified if the client's copy is current."""
+        state, last_modified = self.get_validators()
+        if state is None:
+            return super().get(request, *args, **kwargs)
+
+        etag = self.get_etag(state)
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+
+        if response.status_code in (200, 304):
+            response.headers["ETag"] = etag
+            if timestamp is not None:
+                response.headers["Last-Modified"] = http_date(timestamp)
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ["Accept", "Authorization"])
+        return response
+
+
+class ModifiedAtConditionalGetMixin(ConditionalGetMixin):
+    """
+    Conditional GET for detail views of models with a modified_at field.
+
+    The validator is the object's modified_at, read with a single-column
+    query instead of loading and serializing the object.
+    """
+
+    def get_validators(self):
+        """Returns the object's modification time as state and Last-Modified."""
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        modified_at = (
+            self.get_queryset()
+            .filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+            .values_list("modified_at", flat=True)
+            .first()
+        )
+        return modified_at, modified_at
+
+
+class AsyncCustomPagination(CustomPagination):
+    """
+    Async variant of CustomPagination for views served under ASGI.
+
+    Features:
+    - Same page size, limits and response format as CustomPagination
+    - Count and page queries run through Django's async ORM
+    - Page rows are streamed with aiterator(), honouring prefetch_related
+    """
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Paginates a queryset without blocking the event loop.
+
+        Returns the list of objects on the requested page, or None if
+        pagination is disabled for the request.
+        """
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        # Prime the paginator's cached count so it never queries synchronously
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+
+        try:
+            number = paginator.validate_number(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(
+                page_number=page_number, message=str(exc)
+            )
+            raise NotFound(msg) from exc
+
+        bottom = (number - 1) * page_size
+        objects = [
+            obj
+            async for obj in queryset[bottom : bottom + page_size].aiterator(
+                chunk_size=page_size
+            )
+        ]
+        self.page = Page(objects, number, paginator)
+        return objects
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination over a fixed ordering of model fields.
+
+    Pages continue after the last row of the previous page, named by an
+    opaque cursor, instead of skipping rows with an offset: every page
+    costs one index range scan, however deep, and rows inserted meanwhile
+    neither repeat nor skip rows on later pages.
+
+    Subclasses set ordering to ascending field names whose last field is
+    unique (e.g. ("date", "time", "id")), backed by an index on them, and
+    may merge rows from elsewhere into the pages (see get_rows()).
+
+    Query Parameters:
+    - cursor: The next cursor of the previous page
+    - page_size: Rows per page (at most max_page_size)
+    """
+
+    ordering = ("id",)
+    page_size = 100
+    max_page_size = 500
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    invalid_cursor_message = "Invalid cursor."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Returns the rows of the requested page."""
+        self.model = queryset.model
+        queryset = queryset.order_by(*self.ordering)
+
+        def read(after, count):
+            rows = queryset
+            if after is not None:
+                rows = rows.filter(self.get_seek_condition(after))
+            return self.get_rows(rows[:count], after, view)
+
+        return self.paginate_rows(read, request)
+
+    def paginate_rows(self, read, request):
+        """
+        Returns the rows of the requested page, as read by read(after, count).
+
+        read returns an iterable of the rows after the key after (None on
+        the first page), in order; only its first count rows are taken.
+        """
+        self.request = request
+        page_size = self.get_page_size(request)
+        cursor = request.query_params.get(self.cursor_query_param)
+        after = self.decode_cursor(cursor) if cursor else None
+
+        # One extra row tells whether a next page exists
+        rows = list(islice(read(after, page_size + 1), page_size + 1))
+        self.next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            self.next_cursor = self.encode_cursor(rows[-1])
+        return rows
+
+    def get_rows(self, rows, after, view):
+        """
+        Returns the rows to page through, in ordering order.
+
+        rows are the rows of the queryset after the cursor key after (None
+        on the first page). Subclasses may merge in other rows after it,
+        keyed by get_key().
+        """
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def get_fields(self):
+        return [self.model._meta.get_field(name) for name in self.ordering]
+
+    def get_key(self, row):
+        """Returns the values of the ordering fields of a row."""
+        return tuple(getattr(row, field.attname) for field in self.get_fields())
+
+    def encode_cursor(self, row):
+        values = [str(value) for value in self.get_key(row)]
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    def decode_cursor(self, cursor):
+        """Returns the key named by a cursor; raises NotFound if invalid."""
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            if not isinstance(values, list):
+                raise ValueError(cursor)
+            return self.parse_key(values)
+        except (ValueError, TypeError, DjangoValidationError) as e:
+            raise NotFound(self.invalid_cursor_message) from e
+
+    def parse_key(self, values):
+        """Returns the key of a cursor's values; raises ValueError or ValidationError."""
+        fields = self.get_fields()
+        if len(values) != len(fields):
+            raise ValueError(values)
+        return tuple(
+            field.to_python(value) for field, value in zip(fields, values, strict=True)
+        )
+
+    def get_seek_condition(self, after):
+        """Returns the condition selecting the rows after the key after."""
+        return seek_condition(self.model, self.get_fields(), after)
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results to return per page.",
+                "schema": {"type": "integer"},
+            },
+        ]
+
+
+class AsyncRetrieveAPIView(AsyncAPIView):
+    """
+    Base class for read-only async detail views.
+
+    Features:
+    - Single-row lookup with aget()
+    - 404 handling consistent with DRF generic views
+    - Sync serialization of the already loaded instance
+
+    Subclasses set queryset and serializer_class like a RetrieveAPIView.
+    """
+
+    queryset = None
+    serializer_class = None
+    lookup_field = "pk"
+
+    async def get(self, request, *args, **kwargs):
+        """Retrieves a single object by its lookup field."""
+        try:
+            instance = await self.queryset.all().aget(
+                **{self.lookup_field: kwargs[self.lookup_field]}
+            )
+        except self.queryset.model.DoesNotExist as exc:
+            raise Http404 from exc
+        serializer = self.serializer_class(instance, context={"request": request})
+        return Response(serializer.data)
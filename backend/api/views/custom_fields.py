@@ -5,24 +5,37 @@ Features:
 - Custom field definition CRUD
 - Field assignment to users
 - Value management for patients
+- Conditional GET support for the definition list
+- Per-process caching of definition listings (see api.local_cache)
 - Access control
 """
 
 import logging
 
+from django.db.models import Count, Max
 from rest_framework import generics, status
 from rest_framework.response import Response
 
-from ..models import CustomFieldDefinition, PatientCustomField
+from ..local_cache import LocalCache
+from ..models import CustomFieldDefinition, PatientCustomField, User
 from ..serializers import (
     CustomFieldDefinitionSerializer,
     PatientCustomFieldSerializer,
 )
+from .base import ConditionalGetMixin
 
 logger = logging.getLogger(__name__)
 
+# Definition listings, evicted on definition and assignment changes
+definition_cache = LocalCache(
+    "custom field definitions",
+    [CustomFieldDefinition, User.available_custom_fields.through],
+)
+
 
-class CustomFieldDefinitionListCreateView(generics.ListCreateAPIView):
+class CustomFieldDefinitionListCreateView(
+    ConditionalGetMixin, generics.ListCreateAPIView
+):
     """
     View for managing custom field definitions.
 
@@ -33,6 +46,8 @@ class CustomFieldDefinitionListCreateView(generics.ListCreateAPIView):
     Features:
     - Automatic user assignment
     - Ordered listing
+    - Conditional GET (304 Not Modified)
+    - Per-process response cache
     - Creation logging
     - Error handling
     """
@@ -40,6 +55,31 @@ class CustomFieldDefinitionListCreateView(generics.ListCreateAPIView):
     queryset = CustomFieldDefinition.objects.all().order_by("display_order", "name")
     serializer_class = CustomFieldDefinitionSerializer
 
+    def get_validators(self):
+        """
+        Returns the latest modification time and the number of definitions.
+
+        Creations and updates advance the latest modification time, deletions
+        change the count. Deleting an older definition leaves the latest
+        modification time unchanged, so no Last-Modified is sent.
+        """
+        state = definition_cache.get_or_set(
+            "validators",
+            lambda: self.get_queryset().aggregate(
+                latest=Max("modified_at"), count=Count("id")
+            ),
+        )
+        return f"{state['latest']}:{state['count']}", None
+
+    def list(self, request, *args, **kwargs):
+        """Lists the definitions, from the per-process cache when possible."""
+        list_definitions = super().list
+        data = definition_cache.get_or_set(
+            ("list", request.build_absolute_uri()),
+            lambda: list_definitions(request, *args, **kwargs).data,
+        )
+        return Response(data)
+
     def create(self, request, *args, **kwargs):
         """
         Creates a new custom field definition and assigns it to the creating user.
@@ -80,16 +120,28 @@ class CustomFieldDefinitionAssignedView(generics.ListAPIView):
     Features:
     - User-specific field listing
     - Ordered display
+    - Per-process response cache
     - Access control
     """
 
     serializer_class = CustomFieldDefinitionSerializer
 
+    def list(self, request, *args, **kwargs):
+        """Lists the user's fields, from the per-process cache when possible."""
+        list_assigned = super().list
+        data = definition_cache.get_or_set(
+            ("assigned", request.user.pk, request.build_absolute_uri()),
+            lambda: list_assigned(request, *args, **kwargs).data,
+        )
+        return Response(data)
+
     def get_queryset(self):
         """Returns only custom fields assigned to the current user."""
         user = self.request.user
-        logger.info(f"Fetching assigned custom fields for user: {user.email}")
-        return user.available_custom_fields.all().order_by("display_order", "name")
+        logger.info(f"Fetching assigned custom fields for user: {user.username}")
+        return CustomFieldDefinition.objects.filter(assigned_users=user.pk).order_by(
+            "display_order", "name"
+        )
 
 
 class CustomFieldDefinitionRetrieveUpdateDeleteView(
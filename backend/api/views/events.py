@@ -0,0 +1,165 @@
+"""
+This module provides the Server-Sent Events stream of patient and visit changes.
+
+Changes are sent by database triggers with Postgres NOTIFY and relayed to
+streams by api.notifications. Events only say what changed; clients fetch
+the changed patients and visits from the REST endpoints.
+
+Features:
+- Per-client filtering by topic and by patient
+- Backpressure: repeated changes are coalesced, and clients falling behind
+  are told to resync
+- Keep-alive comments on idle streams
+- Resync after reconnects, when events may have been missed
+- Served under ASGI only
+
+Event format:
+    id: 42
+    event: patient | visit | resync
+    data: {"op": "INSERT" | "UPDATE" | "DELETE", "id": 7, "patients": [7]}
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, OpenApiResponse, extend_schema
+from rest_framework import status
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.response import Response
+
+from ..notifications import Subscription, hub
+from .base import AsyncAPIView
+
+logger = logging.getLogger(__name__)
+
+TOPICS = ("patient", "visit")
+
+# Milliseconds clients wait before reconnecting a dropped stream
+RETRY_DELAY = 5000
+
+# Event IDs, only used to detect reconnects through Last-Event-ID
+event_ids = itertools.count(1)
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Renders error responses to event stream clients as an error event."""
+
+    media_type = "text/event-stream"
+    format = "event-stream"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return f"event: error\ndata: {json.dumps(data)}\n\n".encode()
+
+
+def format_event(event):
+    """Returns an event as an event stream message."""
+    # Events are shared by every stream, so they are not modified
+    data = json.dumps({key: value for key, value in event.items() if key != "topic"})
+    return f"id: {next(event_ids)}\nevent: {event['topic']}\ndata: {data}\n\n"
+
+
+class EventStreamView(AsyncAPIView):
+    """
+    View streaming patient and visit changes as Server-Sent Events.
+
+    Endpoints:
+    - GET: Open an event stream
+
+    Query Parameters:
+    - topics: Comma-separated topics to receive (patient, visit; default all)
+    - patients: Comma-separated patient IDs to receive changes for
+      (default all patients)
+
+    Notes:
+    - A resync event means changes may have been missed (the client fell
+      behind, or the stream or listener reconnected); clients reload the
+      data they display
+    - Streams hold a connection open, so they are only served by ASGI
+      workers (SERVER_WORKER_MODE=asgi)
+    """
+
+    renderer_classes = [JSONRenderer, EventStreamRenderer]
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "topics", str, description="Comma-separated topics (patient, visit)"
+            ),
+            OpenApiParameter(
+                "patients", str, description="Comma-separated patient IDs"
+            ),
+        ],
+        responses={
+            (200, "text/event-stream"): OpenApiResponse(
+                OpenApiTypes.STR, description="Stream of patient and visit changes"
+            )
+        },
+    )
+    async def get(self, request):
+        """Opens a stream of the changes selected by the query parameters."""
+        if not isinstance(request._request, ASGIRequest):
+            return Response(
+                {"error": "Event streams require an ASGI worker."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+
+        topics = request.query_params.get("topics")
+        topics = topics.split(",") if topics else TOPICS
+        if not set(topics) <= set(TOPICS):
+            return Response(
+                {"error": f"Query parameter 'topics' must be in {', '.join(TOPICS)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        patient_ids = request.query_params.get("patients")
+        try:
+            patient_ids = (
+                [int(patient_id) for patient_id in patient_ids.split(",")]
+                if patient_ids
+                else None
+            )
+        except ValueError:
+            return Response(
+                {"error": "Query parameter 'patients' must be patient IDs."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        subscription = Subscription(topics, patient_ids)
+        # A reconnecting client may have missed events while disconnected
+        resync = "HTTP_LAST_EVENT_ID" in request.META
+        logger.info(
+            f"Opening event stream for {request.user}: topics {topics}, "
+            f"patients {patient_ids or 'all'}"
+        )
+        response = StreamingHttpResponse(
+            self.stream(subscription, resync), content_type="text/event-stream"
+        )
+        response["Cache-Control"] = "no-cache"
+        # Stop proxies such as nginx from buffering the stream
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    async def stream(self, subscription, resync):
+        """Yields the subscription's events until the client disconnects."""
+        hub.subscribe(subscription)
+        try:
+            yield f"retry: {RETRY_DELAY}\n\n"
+            if resync:
+                subscription.put(None)
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        subscription.get(), settings.EVENT_STREAM_KEEPALIVE
+                    )
+                except TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_event(event)
+        finally:
+            hub.unsubscribe(subscription)
+            logger.info("Closed event stream")
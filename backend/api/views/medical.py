@@ -4,26 +4,97 @@ This module provides views for medical record management.
 Features:
 - Sleep study record access
 - Treatment record management
+- Treatments by period across patients (overlap and containment queries)
 - Read-only operations
+- Conditional GET support
 - Access control
 """
 
 import logging
+from datetime import date
 
+from django.db.backends.postgresql.psycopg_any import DateRange
 from rest_framework import generics
+from rest_framework.exceptions import ValidationError
 
 from ..models import SleepStudy, Treatment
-from ..serializers import SleepStudySerializer, TreatmentSerializer
+from ..serializers import (
+    SleepStudySerializer,
+    TreatmentPeriodSerializer,
+    TreatmentSerializer,
+)
+from .base import KeysetPagination, ModifiedAtConditionalGetMixin
 
 logger = logging.getLogger(__name__)
 
+# Lookups of the treatment period against a window, by the match parameter
+PERIOD_MATCHES = {
+    # Treated at any time in the window
+    "overlap": "period__overlap",
+    # Treated throughout the window
+    "contains": "period__contains",
+}
 
-class SleepStudyDetailView(generics.RetrieveAPIView):
+# Query parameters of treatment period filters on the treatment list
+TREATMENT_PARAMS = {
+    "type": "type",
+    "on": "active_on",
+    "from": "from",
+    "to": "to",
+    "match": "match",
+}
+
+
+def get_treatment_filters(params, names=TREATMENT_PARAMS):
+    """
+    Returns Treatment filters from type and period query parameters.
+
+    names maps "type", "on" (a date treated on), "from" and "to" (an
+    inclusive window, either end open) and "match" (one of PERIOD_MATCHES)
+    to the parameter names. Period filters are answered by the
+    treatment_period_idx index.
+    Raises ValidationError (400) for invalid values.
+    """
+    dates = {}
+    for role in ("on", "from", "to"):
+        param = names[role]
+        if params.get(param):
+            try:
+                dates[role] = date.fromisoformat(params[param])
+            except ValueError as e:
+                raise ValidationError({param: "Invalid date."}) from e
+
+    filters = {}
+    if params.get(names["type"]):
+        filters["type__in"] = params[names["type"]].split(",")
+    if "on" in dates:
+        filters["period__contains"] = dates["on"]
+    if "from" in dates or "to" in dates:
+        if "from" in dates and "to" in dates and dates["to"] < dates["from"]:
+            raise ValidationError({names["to"]: f"Must not be before {names['from']}."})
+        match = params.get(names["match"]) or "overlap"
+        if match not in PERIOD_MATCHES:
+            raise ValidationError(
+                {names["match"]: f"Must be one of {', '.join(PERIOD_MATCHES)}."}
+            )
+        window = DateRange(dates.get("from"), dates.get("to"), "[]")
+        filters[PERIOD_MATCHES[match]] = window
+    return filters
+
+
+class TreatmentPeriodPagination(KeysetPagination):
+    """Pages of treatments by start date, backed by the treatment_start_idx index."""
+
+    ordering = ("start_date", "id")
+
+
+class SleepStudyDetailView(ModifiedAtConditionalGetMixin, generics.RetrieveAPIView):
     """
     View for retrieving sleep study details.
 
     Features:
     - Read-only access
+    - Conditional GET (304 Not Modified)
     - Detailed study metrics
     - File attachment handling
 
@@ -36,12 +107,13 @@ class SleepStudyDetailView(generics.RetrieveAPIView):
     serializer_class = SleepStudySerializer
 
 
-class TreatmentDetailView(generics.RetrieveAPIView):
+class TreatmentDetailView(ModifiedAtConditionalGetMixin, generics.RetrieveAPIView):
     """
     View for retrieving treatment details.
 
     Features:
     - Read-only access
+    - Conditional GET (304 Not Modified)
     - Treatment history
     - Dosage and frequency information
 
@@ -52,3 +124,50 @@ class TreatmentDetailView(generics.RetrieveAPIView):
 
     queryset = Treatment.objects.all()
     serializer_class = TreatmentSerializer
+
+
+class TreatmentPeriodListView(generics.ListAPIView):
+    """
+    View for listing treatments across patients by treatment period.
+
+    Endpoints:
+    - GET: Treatments by start date, e.g. "on CPAP at any time in March"
+
+    Features:
+    - Period filters answered by a GiST index on the treatment period
+    - The patient of each treatment, loaded in the same query
+    - Keyset pagination
+
+    Query Parameters:
+    - type: Comma-separated treatment types
+    - active_on: Date the treatment is active on (YYYY-MM-DD)
+    - from, to: Window (YYYY-MM-DD, inclusive; either may be omitted)
+    - match: overlap (default, active at any time in the window) or
+      contains (active throughout the window)
+    - patient: Patient ID
+    - cursor, page_size: See KeysetPagination
+    """
+
+    serializer_class = TreatmentPeriodSerializer
+    pagination_class = TreatmentPeriodPagination
+
+    def get_queryset(self):
+        return Treatment.objects.select_related("patient").only(
+            *TreatmentSerializer.Meta.fields, "patient__first", "patient__last"
+        )
+
+    def filter_queryset(self, queryset):
+        """
+        Applies the type, period and patient parameters.
+
+        Raises ValidationError (400) for invalid values.
+        """
+        params = self.request.query_params
+        filters = get_treatment_filters(params)
+        patient_id = params.get("patient")
+        if patient_id:
+            if not patient_id.isdigit():
+                raise ValidationError({"patient": "Invalid value."})
+            filters["patient_id"] = patient_id
+        logger.info(f"Listing treatments: {filters}")
+        return queryset.filter(**filters)
@@ -0,0 +1,52 @@
+"""
+This module provides views for operational metrics.
+
+Features:
+- Database connection pool statistics
+- Staff-only access
+"""
+
+import logging
+
+from drf_spectacular.utils import extend_schema
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ..db import get_pool_stats
+
+logger = logging.getLogger(__name__)
+
+# Numeric counters of each pool, keyed by database alias
+POOL_STATS_SCHEMA = {
+    "type": "object",
+    "additionalProperties": {
+        "type": "object",
+        "additionalProperties": {"type": "number"},
+    },
+}
+
+
+class DatabasePoolMetricsView(APIView):
+    """
+    View for inspecting database connection pool statistics.
+
+    Endpoints:
+    - GET: Pool statistics of the worker process serving the request
+
+    Features:
+    - Pool size, availability and saturation
+    - Wait time of requests queued for a connection
+    - Connection and request error counters
+
+    Notes:
+    - Each worker process has its own pool; repeated requests may be
+      answered by different workers
+    """
+
+    permission_classes = [IsAdminUser]
+
+    @extend_schema(responses={200: POOL_STATS_SCHEMA})
+    def get(self, request):
+        """Returns pool statistics keyed by database alias."""
+        return Response(get_pool_stats())
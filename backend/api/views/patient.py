@@ -5,24 +5,155 @@ Features:
 - Patient CRUD operations
 - Search functionality
 - Pagination
+- Ordering and filtering of lists by patient summaries
+- Response caching of patient details and list pages
+- Conditional GETs answered from the cache version tokens
+- Optimistic concurrency control of updates (If-Match)
+- Incremental sync of changed patients
+- Precomputed chart documents served as stored
+- Patient timelines of all record types, in date order
 - Detailed logging
 """
 
 import logging
+from datetime import UTC, date, datetime
+from functools import partial
 
-from django.db.models import Q
-from rest_framework import generics, status
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import router
+from django.db.models import F, Q
+from django.http import HttpResponse
+from django.utils.http import parse_etags
+from drf_spectacular.utils import (
+    OpenApiParameter,
+    PolymorphicProxySerializer,
+    extend_schema,
+    extend_schema_view,
+    inline_serializer,
+)
+from rest_framework import generics, serializers, status
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from ..models import Patient
-from ..serializers import PatientSerializer
-from .base import CustomPagination
+from ..cache import cached_response, get_patient_list_version, get_patient_version
+from ..changes import ChangeToken, get_changes, get_current_token
+from ..charts import CHART_RECORDS, build_chart
+from ..exceptions import PreconditionFailed, PreconditionRequired
+from ..models import Patient, PatientChange, PatientChart, Treatment
+from ..routers import use_primary
+from ..serializers import (
+    PatientSerializer,
+    SleepStudySerializer,
+    TreatmentSerializer,
+    VisitSerializer,
+)
+from ..timeline import get_timeline
+from ..timeline import parse_key as parse_timeline_key
+from .base import ConditionalGetMixin, CustomPagination, KeysetPagination
+from .medical import get_treatment_filters
 
 logger = logging.getLogger(__name__)
 
+# Orderings of patient lists by the ordering parameter ("-" for descending).
+# Summary columns sort patients without a value last in both directions.
+PATIENT_ORDERINGS = {
+    "created_at": [F("created_at")],
+    "name": [F("last"), F("first")],
+    "latest_ahi": [F("summary__latest_ahi")],
+    "next_visit": [F("summary__next_visit_date"), F("summary__next_visit_time")],
+    "active_treatments": [F("summary__active_treatment_count")],
+    "authorization_status": [F("summary__authorization_status")],
+    "authorization_expiry": [F("summary__authorization_expiry")],
+}
 
-class PatientListCreateView(generics.ListCreateAPIView):
+# Serializers of the records of timeline entries, by entry kind
+TIMELINE_SERIALIZERS = {
+    "treatment_start": TreatmentSerializer,
+    "sleep_study": SleepStudySerializer,
+    "visit": VisitSerializer,
+    "treatment_end": TreatmentSerializer,
+}
+
+
+def _parse_bool(value):
+    if value not in ("true", "false"):
+        raise ValueError(value)
+    return value == "true"
+
+
+def _parse_missing(value):
+    """Parses a has_... parameter into an isnull lookup value."""
+    return not _parse_bool(value)
+
+
+def _parse_list(value):
+    return value.split(",")
+
+
+# Filters of patient lists: {parameter: (lookup, parser)}
+PATIENT_FILTERS = {
+    "status": ("status__in", _parse_list),
+    "ahi_min": ("summary__latest_ahi__gte", float),
+    "ahi_max": ("summary__latest_ahi__lte", float),
+    "has_next_visit": ("summary__next_visit_date__isnull", _parse_missing),
+    "next_visit_after": ("summary__next_visit_date__gte", date.fromisoformat),
+    "next_visit_before": ("summary__next_visit_date__lte", date.fromisoformat),
+    "active_treatments_min": ("summary__active_treatment_count__gte", int),
+    "active_treatments_max": ("summary__active_treatment_count__lte", int),
+    "authorization_status": ("summary__authorization_status__in", _parse_list),
+    "authorization_expires_before": (
+        "summary__authorization_expiry__lt",
+        date.fromisoformat,
+    ),
+}
+
+# Query parameters of treatment filters on patient lists (see
+# get_treatment_filters())
+PATIENT_TREATMENT_PARAMS = {
+    "type": "treatment_type",
+    "on": "treated_on",
+    "from": "treated_from",
+    "to": "treated_to",
+    "match": "treated_match",
+}
+
+
+def _parse_etag_version(etag):
+    """Returns the patient version named by a strong ETag, or None."""
+    if etag.startswith("W/"):
+        return None
+    version = etag.strip('"').partition(".")[0]
+    return int(version) if version.isdigit() else None
+
+
+class PatientVersionMixin(ConditionalGetMixin):
+    """
+    Validates patient responses by their response cache version.
+
+    The version is read once per request and used both as the HTTP validator
+    and as the cache key, so checking it needs no serialization. Views that
+    do not override get_version() are not validated.
+    """
+
+    def get_version(self):
+        """Returns the cache version of the requested resource, or None."""
+        return None
+
+    def get_cached_version(self):
+        if not hasattr(self, "_version"):
+            self._version = self.get_version()
+        return self._version
+
+    def get_validators(self):
+        """Returns the version token and the time of the last change."""
+        version = self.get_cached_version()
+        if version is None:
+            return None, None
+        return version.token, datetime.fromtimestamp(version.changed_at, UTC)
+
+
+class PatientListCreateView(PatientVersionMixin, generics.ListCreateAPIView):
     """
     View for listing and creating patients.
 
@@ -32,9 +163,26 @@ class PatientListCreateView(generics.ListCreateAPIView):
 
     Features:
     - Pagination support
-    - Ordering by creation date
+    - Ordering and filtering by patient summaries (see PatientSummary)
+    - Cached list pages (see api.cache)
+    - Conditional GET (304 Not Modified)
     - Detailed logging
     - Error handling
+
+    Query Parameters:
+    - ordering: One of PATIENT_ORDERINGS, prefixed with "-" for descending
+      order (default: -created_at)
+    - status, authorization_status: Comma-separated values
+    - ahi_min, ahi_max: Range of the latest AHI
+    - has_next_visit: true or false
+    - next_visit_after, next_visit_before: Range of the next visit date
+      (YYYY-MM-DD, inclusive)
+    - active_treatments_min, active_treatments_max: Range of the number of
+      active treatments
+    - authorization_expires_before: Authorization expiry date (YYYY-MM-DD)
+    - treatment_type, treated_on, treated_from, treated_to, treated_match:
+      Patients with a treatment of the type and period (see
+      TreatmentPeriodListView), e.g. on CPAP at any time in March
     """
 
     serializer_class = PatientSerializer
@@ -42,30 +190,76 @@ class PatientListCreateView(generics.ListCreateAPIView):
 
     def get_queryset(self):
         """Returns optimized queryset with prefetched related fields."""
-        queryset = (
-            Patient.objects.all()
-            .order_by("-created_at")
-            .prefetch_related(
-                "addresses",
-                "patient_custom_fields",
-                "patient_custom_fields__field_definition",
-            )
+        queryset = Patient.objects.all().prefetch_related(
+            "addresses",
+            "patient_custom_fields",
+            "patient_custom_fields__field_definition",
         )
         logger.info(f"Fetching patients. Query params: {self.request.query_params}")
         return queryset
 
+    def filter_queryset(self, queryset):
+        """
+        Applies the filter and ordering parameters.
+
+        Raises ValidationError (400) for invalid values.
+        """
+        params = self.request.query_params
+        filters = {}
+        for param, (lookup, parse) in PATIENT_FILTERS.items():
+            if params.get(param):
+                try:
+                    filters[lookup] = parse(params[param])
+                except ValueError as e:
+                    raise ValidationError({param: "Invalid value."}) from e
+
+        treatment_filters = get_treatment_filters(params, PATIENT_TREATMENT_PARAMS)
+        if treatment_filters:
+            filters["pk__in"] = Treatment.objects.filter(**treatment_filters).values(
+                "patient_id"
+            )
+
+        ordering = params.get("ordering") or "-created_at"
+        descending = ordering.startswith("-")
+        fields = PATIENT_ORDERINGS.get(ordering.removeprefix("-"))
+        if fields is None:
+            raise ValidationError(
+                {"ordering": f"Must be one of {', '.join(PATIENT_ORDERINGS)}."}
+            )
+        order_by = [
+            field.desc(nulls_last=True) if descending else field.asc(nulls_last=True)
+            for field in fields
+        ]
+        # Stable pages when the ordered values are equal
+        order_by.append(F("id").desc() if descending else F("id").asc())
+        if fields[0].name.startswith("summary__"):
+            # Every patient has a summary (see migration 0010); an inner join
+            # lets the ordering be read from the summary's ordering indexes
+            filters["summary__isnull"] = False
+        return queryset.filter(**filters).order_by(*order_by)
+
+    def get_version(self):
+        return get_patient_list_version()
+
     def list(self, request, *args, **kwargs):
         """
         Lists patients with detailed logging.
         Includes request parameters and response size in logs.
         """
         logger.info(f"Processing list request with params: {request.query_params}")
-        response = super().list(request, *args, **kwargs)
+        response = cached_response(
+            request,
+            "patient:list",
+            self.get_cached_version(),
+            partial(super().list, request, *args, **kwargs),
+        )
         logger.info(f"Returning {len(response.data['results'])} patients")
         return response
 
 
-class PatientRetrieveUpdateDeleteView(generics.RetrieveUpdateDestroyAPIView):
+class PatientRetrieveUpdateDeleteView(
+    PatientVersionMixin, generics.RetrieveUpdateDestroyAPIView
+):
     """
     View for managing individual patients.
 
@@ -76,8 +270,19 @@ class PatientRetrieveUpdateDeleteView(generics.RetrieveUpdateDestroyAPIView):
 
     Features:
     - Full CRUD operations
+    - Cached patient details (see api.cache)
+    - Conditional GET (304 Not Modified)
+    - Conditional updates (If-Match required: 428 Precondition Required
+      without it, 412 Precondition Failed if outdated)
     - Validation of updates
     - Cascading deletion handling
+
+    Notes:
+    - The ETag starts with the patient version ("<version>.<digest>"), and
+      If-Match is compared on the version only, so clients may also send
+      the version from the response body (If-Match: "<version>")
+    - If-Match: * updates unconditionally, for clients that mean to
+      overwrite whatever is current
     """
 
     serializer_class = PatientSerializer
@@ -90,6 +295,72 @@ class PatientRetrieveUpdateDeleteView(generics.RetrieveUpdateDestroyAPIView):
             "patient_custom_fields__field_definition",
         )
 
+    def get_version(self):
+        return get_patient_version(self.kwargs["pk"])
+
+    def get_validators(self):
+        """Returns the patient version and the response cache validators."""
+        try:
+            pk = Patient._meta.pk.to_python(self.kwargs["pk"])
+        except DjangoValidationError:
+            # Not a patient id: the object lookup answers 404 Not Found
+            return None, None
+        version = (
+            Patient.objects.filter(pk=pk).values_list("version", flat=True).first()
+        )
+        if version is None:
+            return None, None
+        cache_state, last_modified = super().get_validators()
+        return (version, cache_state), last_modified
+
+    def get_etag(self, state):
+        """Returns the ETag, prefixed with the patient version for If-Match."""
+        version, cache_state = state
+        return f'"{version}.{super().get_etag(cache_state)[1:-1]}"'
+
+    def get_expected_version(self, instance):
+        """
+        Returns the patient version the request is allowed to update.
+
+        Raises PreconditionRequired without If-Match, and PreconditionFailed
+        if If-Match does not name the current version. With If-Match: *, the
+        version read by this request is expected, which still detects writes
+        racing with the request.
+        """
+        if_match = self.request.headers.get("If-Match")
+        if if_match is None:
+            logger.warning(
+                f"Rejecting update of patient {instance.pk} without If-Match"
+            )
+            raise PreconditionRequired()
+        if parse_etags(if_match) == ["*"]:
+            return instance.version
+        versions = {_parse_etag_version(etag) for etag in parse_etags(if_match)}
+        if instance.version not in versions:
+            raise PreconditionFailed("The patient has been changed since it was read.")
+        return instance.version
+
+    def perform_update(self, serializer):
+        serializer.save(expected_version=self.get_expected_version(serializer.instance))
+
+    def update(self, request, *args, **kwargs):
+        """Updates the patient and returns the ETag of the new version."""
+        response = super().update(request, *args, **kwargs)
+        # The update is committed, so the new validators can be read
+        state, _ = self.get_validators()
+        if state is not None:
+            response.headers["ETag"] = self.get_etag(state)
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        """Returns the patient, from the response cache when possible."""
+        return cached_response(
+            request,
+            f"patient:detail:{self.kwargs['pk']}",
+            self.get_cached_version(),
+            partial(super().retrieve, request, *args, **kwargs),
+        )
+
 
 class PatientQueryView(APIView):
     """
@@ -148,3 +419,241 @@ class PatientQueryView(APIView):
 
         serializer = PatientSerializer(patients, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class PatientChangesView(APIView):
+    """
+    View for incremental sync of patients.
+
+    Endpoints:
+    - GET: Patients created, modified or deleted since a sync token
+
+    Query Parameters:
+    - since: Token from a previous response. Without it, only the current
+      token is returned; fetch it before a full load of the patient list.
+
+    Response:
+    - token: Token to pass as since in the next request
+    - has_more: Whether more changes are ready (request again right away)
+    - reset: Whether every patient may have changed; clients reload the
+      full list, then continue from token
+    - patients: Current data of created or modified patients
+    - deleted: IDs of deleted patients (tombstones)
+
+    Features:
+    - Cost proportional to the changes, not to the number of patients
+    - Changes are never skipped, even with out-of-order commits
+    """
+
+    # Maximum change log rows read per request
+    page_size = 500
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter("since", str, description="Token from a previous response")
+        ],
+        responses=inline_serializer(
+            "PatientChanges",
+            {
+                "token": serializers.CharField(),
+                "has_more": serializers.BooleanField(),
+                "reset": serializers.BooleanField(),
+                "patients": PatientSerializer(many=True),
+                "deleted": serializers.ListField(child=serializers.IntegerField()),
+            },
+        ),
+    )
+    def get(self, request):
+        """Returns the patients changed since the given token."""
+        since = request.query_params.get("since")
+        if since is None:
+            return Response(
+                {
+                    "token": str(get_current_token()),
+                    "has_more": False,
+                    "reset": False,
+                    "patients": [],
+                    "deleted": [],
+                }
+            )
+
+        try:
+            token = ChangeToken.parse(since)
+        except ValueError:
+            return Response(
+                {"error": "Query parameter 'since' is not a valid token."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Patients must be read from the database the changes were read from,
+        # or a lagging replica could return data older than the token
+        using = router.db_for_read(PatientChange)
+        patient_ids, reset, next_token, has_more = get_changes(
+            token, self.page_size, using=using
+        )
+        patients = {
+            patient.pk: patient
+            for patient in Patient.objects.using(using)
+            .filter(pk__in=patient_ids)
+            .prefetch_related(
+                "addresses",
+                "patient_custom_fields",
+                "patient_custom_fields__field_definition",
+            )
+        }
+        logger.info(
+            f"Patient changes since {token}: {len(patients)} changed, "
+            f"{len(patient_ids) - len(patients)} deleted, reset={reset}"
+        )
+
+        serializer = PatientSerializer(
+            [patients[pk] for pk in patient_ids if pk in patients],
+            many=True,
+            context={"request": request},
+        )
+        return Response(
+            {
+                "token": str(next_token),
+                "has_more": has_more,
+                "reset": reset,
+                "patients": serializer.data,
+                "deleted": [pk for pk in patient_ids if pk not in patients],
+            }
+        )
+
+
+@extend_schema_view(
+    get=extend_schema(
+        responses=inline_serializer(
+            "PatientChartDocument",
+            {
+                "patient_id": serializers.IntegerField(),
+                "version": serializers.IntegerField(),
+                "built_at": serializers.DateTimeField(),
+                "patient": PatientSerializer(),
+                **{
+                    key: serializer_class(many=True)
+                    for key, (_, _, serializer_class) in CHART_RECORDS.items()
+                },
+            },
+        )
+    )
+)
+class PatientChartView(ConditionalGetMixin, generics.RetrieveAPIView):
+    """
+    View serving a patient's chart document (see api.charts).
+
+    Endpoints:
+    - GET: The patient with addresses, custom fields and every linked record
+
+    Features:
+    - Stored document sent as is, without serialization
+    - Conditional GET (304 Not Modified) on the chart version
+    - On-demand build of charts not built for the latest change yet, so a
+      chart never lags behind a change the client has seen
+    """
+
+    def get_validators(self):
+        """Returns the version and build time of a current chart."""
+        chart = (
+            PatientChart.objects.filter(patient_id=self.kwargs["pk"])
+            .values_list("built", "requested", "built_at")
+            .first()
+        )
+        if chart is None or chart[0] < chart[1]:
+            return None, None
+        built, _, built_at = chart
+        return built, built_at
+
+    def retrieve(self, request, *args, **kwargs):
+        """Returns the stored chart document, building it if outdated."""
+        patient_id = self.kwargs["pk"]
+        document = (
+            PatientChart.objects.filter(
+                patient_id=patient_id, built__gte=F("requested")
+            )
+            .values_list("document", flat=True)
+            .first()
+        )
+        if document is None:
+            logger.info(f"Building outdated chart of patient {patient_id} on demand")
+            with use_primary():
+                chart = build_chart(patient_id)
+            if chart is None:
+                raise NotFound("Patient not found.")
+            _, document = chart
+        return HttpResponse(document, content_type="application/json")
+
+
+class TimelinePagination(KeysetPagination):
+    """Pages of a patient's timeline, continued after a timeline key."""
+
+    def get_key(self, row):
+        return row.key
+
+    def parse_key(self, values):
+        return parse_timeline_key(values)
+
+
+class PatientTimelineView(APIView):
+    """
+    View serving a patient's timeline (see api.timeline).
+
+    Endpoints:
+    - GET: Visits, sleep studies, and treatment starts and ends in date order
+
+    Features:
+    - Keyset pagination: each page reads a few index rows per record type,
+      however long the patient's history
+
+    Query Parameters:
+    - order: "asc" (oldest first, default) or "desc" (newest first)
+    - cursor, page_size: See KeysetPagination
+
+    Response:
+    - next: Link to the next page, or null
+    - results: Entries with kind, date, time (visits only) and record
+    """
+
+    pagination_class = TimelinePagination
+
+    @extend_schema(
+        parameters=[OpenApiParameter("order", str, enum=["asc", "desc"])],
+        responses=inline_serializer(
+            "TimelineEntry",
+            {
+                "kind": serializers.ChoiceField(list(TIMELINE_SERIALIZERS)),
+                "date": serializers.DateField(),
+                "time": serializers.TimeField(allow_null=True),
+                "record": PolymorphicProxySerializer(
+                    "TimelineRecord",
+                    list(dict.fromkeys(TIMELINE_SERIALIZERS.values())),
+                    resource_type_field_name=None,
+                ),
+            },
+            many=True,
+        ),
+    )
+    def get(self, request, pk):
+        """Returns a page of the patient's timeline."""
+        order = request.query_params.get("order", "asc")
+        if order not in ("asc", "desc"):
+            raise ValidationError({"order": "Must be one of asc, desc."})
+        if not Patient.objects.filter(pk=pk).exists():
+            raise NotFound("Patient not found.")
+
+        paginator = self.pagination_class()
+        entries = paginator.paginate_rows(
+            partial(get_timeline, pk, descending=order == "desc"), request
+        )
+        return paginator.get_paginated_response(
+            [
+                {
+                    "kind": entry.kind,
+                    "date": entry.key[0],
+                    "time": entry.record.time if entry.kind == "visit" else None,
+                    "record": TIMELINE_SERIALIZERS[entry.kind](entry.record).data,
+                }
+                for entry in entries
+            ]
+        )
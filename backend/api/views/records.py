@@ -3,27 +3,73 @@ This module provides views for administrative record management.
 
 Features:
 - Appointment management
+- Visit calendar across patients, by date range
+- Free slot search and conflict-checked scheduling of visits
+- Recurring visit series, with occurrences written only when edited
 - Insurance record access
 - Read-only operations
+- Conditional GET support
 - Access control
 """
 
+import heapq
 import logging
+from datetime import date
 
-from rest_framework import generics
+from django.shortcuts import get_object_or_404
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, extend_schema, inline_serializer
+from rest_framework import generics, serializers
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-from ..models import Insurance, Visit
-from ..serializers import InsuranceSerializer, VisitSerializer
+from ..models import Insurance, Visit, VisitSeries
+from ..recurrence import get_occurrences, materialize_occurrence, occurrence_key
+from ..scheduling import clinic_now, find_free_slots, get_duration
+from ..serializers import (
+    CalendarVisitSerializer,
+    InsuranceSerializer,
+    VisitScheduleSerializer,
+    VisitSerializer,
+    VisitSeriesSerializer,
+)
+from .base import CustomPagination, KeysetPagination, ModifiedAtConditionalGetMixin
 
 logger = logging.getLogger(__name__)
 
+# Filters of the visit calendar with a fixed set of values: {parameter: choices}
+VISIT_CHOICE_FILTERS = {
+    "status": Visit.VISITS_STATUSES,
+    "type": Visit.VISITS_TYPES,
+}
 
-class AppointmentDetailView(generics.RetrieveAPIView):
+
+class VisitCalendarPagination(KeysetPagination):
+    """
+    Pages of visits in calendar order, backed by the visit_calendar_idx index.
+
+    Unwritten occurrences of visit series are merged into the pages as they
+    are expanded, keyed by occurrence_key().
+    """
+
+    ordering = ("date", "time", "id")
+
+    def get_key(self, row):
+        return occurrence_key(row)
+
+    def get_rows(self, rows, after, view):
+        occurrences = view.get_occurrences(after)
+        return heapq.merge(rows, occurrences, key=occurrence_key)
+
+
+class AppointmentDetailView(ModifiedAtConditionalGetMixin, generics.RetrieveAPIView):
     """
     View for retrieving appointment details.
 
     Features:
     - Read-only access
+    - Conditional GET (304 Not Modified)
     - Visit scheduling information
     - Telehealth integration
     - Status tracking
@@ -37,12 +83,269 @@ class AppointmentDetailView(generics.RetrieveAPIView):
     serializer_class = VisitSerializer
 
 
-class InsuranceDetailView(generics.RetrieveAPIView):
+class VisitCalendarView(generics.ListAPIView):
+    """
+    View for listing visits across patients (clinic calendars).
+
+    Endpoints:
+    - GET: Visits within a date range, in calendar order
+
+    Features:
+    - Keyset pagination: each page is one index range scan, however deep
+    - The patient of each visit, loaded in the same query
+    - Occurrences of visit series in the range (see api.recurrence)
+    - Filtering by status and type
+
+    Query Parameters:
+    - start, end: Date range (YYYY-MM-DD, inclusive), required
+    - status, type: Comma-separated values
+    - cursor, page_size: See KeysetPagination
+    """
+
+    serializer_class = CalendarVisitSerializer
+    pagination_class = VisitCalendarPagination
+
+    def get_queryset(self):
+        return Visit.objects.select_related("patient").only(
+            *VisitSerializer.Meta.fields,
+            "series",
+            "occurrence_date",
+            "patient__first",
+            "patient__last",
+        )
+
+    def filter_queryset(self, queryset):
+        """
+        Applies the range and filter parameters.
+
+        Raises ValidationError (400) for missing or invalid values.
+        """
+        params = self.request.query_params
+        filters = {}
+        for param, lookup in (("start", "date__gte"), ("end", "date__lte")):
+            if not params.get(param):
+                raise ValidationError({param: "This parameter is required."})
+            try:
+                filters[lookup] = date.fromisoformat(params[param])
+            except ValueError as e:
+                raise ValidationError({param: "Invalid date."}) from e
+
+        for param, choices in VISIT_CHOICE_FILTERS.items():
+            if params.get(param):
+                values = params[param].split(",")
+                allowed = [value for value, _ in choices]
+                if not set(values) <= set(allowed):
+                    raise ValidationError(
+                        {param: f"Must be one of {', '.join(allowed)}."}
+                    )
+                filters[f"{param}__in"] = values
+
+        logger.info(f"Listing calendar visits: {filters}")
+        self.calendar_filters = filters
+        return queryset.filter(**filters)
+
+    def get_occurrences(self, after):
+        """Returns the filtered series occurrences after the key after, in order."""
+        filters = self.calendar_filters
+        if "Scheduled" not in filters.get("status__in", ["Scheduled"]):
+            return iter(())
+        first_day = filters["date__gte"]
+        if after is not None:
+            first_day = max(first_day, after[0])
+        occurrences = get_occurrences(
+            first_day, filters["date__lte"], types=filters.get("type__in")
+        )
+        if after is None:
+            return occurrences
+        return (
+            occurrence
+            for occurrence in occurrences
+            if occurrence_key(occurrence) > after
+        )
+
+
+class VisitSlotsView(APIView):
+    """
+    View for finding free visit slots (see api.scheduling).
+
+    Endpoints:
+    - GET: The next free slots for a visit type
+
+    Query Parameters:
+    - type: Visit type, required
+    - start: First date searched (YYYY-MM-DD, default: today)
+    - days: Number of dates searched (default: 31, at most 366)
+    - count: Maximum number of slots (default: 10, at most 100)
+
+    Response:
+    - type, duration: The visit type and its minutes
+    - slots: Free slots in time order, each with date and time
+    """
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "type",
+                str,
+                required=True,
+                enum=[value for value, _ in Visit.VISITS_TYPES],
+            ),
+            OpenApiParameter("start", OpenApiTypes.DATE),
+            OpenApiParameter("days", int),
+            OpenApiParameter("count", int),
+        ],
+        responses=inline_serializer(
+            "VisitSlots",
+            {
+                "type": serializers.ChoiceField(Visit.VISITS_TYPES),
+                "duration": serializers.IntegerField(),
+                "slots": inline_serializer(
+                    "VisitSlot",
+                    {
+                        "date": serializers.DateField(),
+                        "time": serializers.TimeField(),
+                    },
+                    many=True,
+                ),
+            },
+        ),
+    )
+    def get(self, request):
+        """Returns the next free slots."""
+        params = request.query_params
+        visit_type = params.get("type")
+        types = [value for value, _ in Visit.VISITS_TYPES]
+        if visit_type not in types:
+            raise ValidationError({"type": f"Must be one of {', '.join(types)}."})
+        try:
+            start = (
+                date.fromisoformat(params["start"])
+                if params.get("start")
+                else clinic_now().date()
+            )
+        except ValueError as e:
+            raise ValidationError({"start": "Invalid date."}) from e
+        limits = {}
+        for param, default, maximum in (("days", 31, 366), ("count", 10, 100)):
+            try:
+                limits[param] = int(params.get(param) or default)
+            except ValueError as e:
+                raise ValidationError({param: "Invalid value."}) from e
+            if not 1 <= limits[param] <= maximum:
+                raise ValidationError({param: f"Must be between 1 and {maximum}."})
+
+        slots = find_free_slots(visit_type, start, limits["days"], limits["count"])
+        return Response(
+            {
+                "type": visit_type,
+                "duration": get_duration(visit_type),
+                "slots": [{"date": day, "time": slot} for day, slot in slots],
+            }
+        )
+
+
+class VisitScheduleView(generics.CreateAPIView):
+    """
+    View for scheduling visits (see api.scheduling).
+
+    Endpoints:
+    - POST: Schedule a visit for a patient
+
+    Features:
+    - Rejects times outside clinic hours or in the past (400 Bad Request)
+    - Rejects times taken by other visits (409 Conflict)
+    """
+
+    serializer_class = VisitScheduleSerializer
+
+
+class VisitSeriesListCreateView(generics.ListCreateAPIView):
+    """
+    View for listing and creating recurring visit series.
+
+    Endpoints:
+    - GET: List series with pagination
+    - POST: Create a series; its occurrences appear in calendars at once
+
+    Query Parameters:
+    - patient: Patient ID
+    """
+
+    serializer_class = VisitSeriesSerializer
+    pagination_class = CustomPagination
+
+    def get_queryset(self):
+        queryset = VisitSeries.objects.order_by("id")
+        patient_id = self.request.query_params.get("patient")
+        if patient_id:
+            if not patient_id.isdigit():
+                raise ValidationError({"patient": "Invalid value."})
+            queryset = queryset.filter(patient_id=patient_id)
+        return queryset
+
+
+class VisitSeriesDetailView(generics.RetrieveUpdateDestroyAPIView):
+    """
+    View for retrieving, updating and deleting recurring visit series.
+
+    Notes:
+    - Changes apply to every unwritten occurrence; written ones are kept as
+      they are, also when the series is deleted
+    """
+
+    queryset = VisitSeries.objects.all()
+    serializer_class = VisitSeriesSerializer
+
+
+class VisitOccurrenceView(APIView):
+    """
+    View for editing an occurrence of a recurring visit series.
+
+    Endpoints:
+    - PATCH: Update an occurrence, e.g. to move, cancel or complete it
+
+    Features:
+    - Writes the occurrence as a Visit on its first edit
+    - Accepts the fields of VisitSerializer
+
+    URL Parameters:
+    - pk: Series ID
+    - occurrence_date: Date of the occurrence (YYYY-MM-DD)
+    """
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "occurrence_date", OpenApiTypes.DATE, OpenApiParameter.PATH
+            ),
+        ],
+        request=VisitSerializer,
+        responses=CalendarVisitSerializer,
+    )
+    def patch(self, request, pk, occurrence_date):
+        """Writes or updates the occurrence and returns its visit."""
+        series = get_object_or_404(VisitSeries, pk=pk)
+        try:
+            day = date.fromisoformat(occurrence_date)
+        except ValueError as e:
+            raise NotFound("Invalid occurrence date.") from e
+
+        serializer = VisitSerializer(data=request.data, partial=True)
+        serializer.is_valid(raise_exception=True)
+        try:
+            visit = materialize_occurrence(series, day, **serializer.validated_data)
+        except ValueError as e:
+            raise NotFound(str(e)) from e
+        return Response(CalendarVisitSerializer(visit).data)
+
+
+class InsuranceDetailView(ModifiedAtConditionalGetMixin, generics.RetrieveAPIView):
     """
     View for retrieving insurance record details.
 
     Features:
     - Read-only access
+    - Conditional GET (304 Not Modified)
     - Policy information
     - Authorization status
     - Coverage details
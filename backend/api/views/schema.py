@@ -0,0 +1,68 @@
+"""
+This module provides the view serving the OpenAPI schema.
+
+It is imported by api.urls directly rather than re-exported from api.views, so
+API-only workers (api.urls_api) never load drf_spectacular's schema generation
+and renderers; views only use its lightweight decorators (drf_spectacular.utils).
+
+Features:
+- Precomputed schema, built once per code version
+- ETag-based conditional requests
+- Precompressed gzip responses
+"""
+
+from django.http import HttpResponse
+from django.middleware.gzip import re_accepts_gzip
+from django.utils import translation
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from drf_spectacular.views import SpectacularAPIView
+
+from ..schema import get_schema
+
+
+class CachedSpectacularAPIView(SpectacularAPIView):
+    """
+    SpectacularAPIView serving a precomputed schema.
+
+    Features:
+    - YAML or JSON via content negotiation, as SpectacularAPIView
+    - 304 Not Modified for a matching If-None-Match
+    - gzip-compressed body when the client accepts it
+
+    Notes:
+    - The schema is public (SERVE_PUBLIC), so it does not depend on the user
+    - Schemas are rebuilt when the code version changes (see api.schema)
+    """
+
+    # The docstring above would replace the endpoint description in the schema
+    __doc__ = SpectacularAPIView.__doc__
+
+    def _get_schema_response(self, request):
+        """Returns the precomputed schema in the negotiated format."""
+        version = (
+            self.api_version or request.version or self._get_version_parameter(request)
+        )
+        renderer = request.accepted_renderer
+        lang = translation.get_language() if request.GET.get("lang") else None
+        artifact = get_schema(renderer.format, api_version=version, lang=lang)
+
+        response = get_conditional_response(request, etag=artifact.etag)
+        if response is None:
+            if re_accepts_gzip.search(request.headers.get("Accept-Encoding", "")):
+                response = HttpResponse(artifact.gzip_content)
+                response.headers["Content-Encoding"] = "gzip"
+            else:
+                response = HttpResponse(artifact.content)
+            response.headers["Content-Type"] = (
+                f"{renderer.media_type}; charset={renderer.charset}"
+                if renderer.charset
+                else renderer.media_type
+            )
+            response.headers["Content-Disposition"] = (
+                f'inline; filename="{self._get_filename(request, version)}"'
+            )
+
+        response.headers["ETag"] = artifact.etag
+        response.headers["Cache-Control"] = "no-cache"
+        patch_vary_headers(response, ["Accept", "Accept-Encoding"])
+        return response
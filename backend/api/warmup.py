@@ -0,0 +1,127 @@
+"""
+This module provides warm-up routines for application server processes.
+
+Warm-up runs once before a process starts accepting traffic so that the first
+requests served by a fresh worker do not pay for lazy initialisation.
+
+Features:
+- URL resolver population
+- DRF and simplejwt settings and class import resolution
+- Model metadata (field and relation caches)
+- Serializer field construction for every routed view
+- Database reachability check per worker (replicas optional)
+"""
+
+import logging
+import time
+
+from django.apps import apps
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+from django.urls import get_resolver
+from rest_framework.settings import api_settings
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from .db import close_pools
+
+logger = logging.getLogger(__name__)
+
+# DRF settings that are imported lazily on first access
+PRELOADED_API_SETTINGS = [
+    "DEFAULT_RENDERER_CLASSES",
+    "DEFAULT_PARSER_CLASSES",
+    "DEFAULT_AUTHENTICATION_CLASSES",
+    "DEFAULT_PERMISSION_CLASSES",
+    "DEFAULT_PAGINATION_CLASS",
+    "DEFAULT_CONTENT_NEGOTIATION_CLASS",
+    "DEFAULT_METADATA_CLASS",
+    "DEFAULT_VERSIONING_CLASS",
+]
+
+# simplejwt settings that are imported lazily on first access
+PRELOADED_JWT_SETTINGS = [
+    "AUTH_TOKEN_CLASSES",
+    "USER_AUTHENTICATION_RULE",
+]
+
+
+def _iter_views(patterns):
+    """Yields the view classes behind every URL pattern, including nested ones."""
+    for pattern in patterns:
+        if hasattr(pattern, "url_patterns"):
+            yield from _iter_views(pattern.url_patterns)
+            continue
+        view_class = getattr(pattern.callback, "cls", None) or getattr(
+            pattern.callback, "view_class", None
+        )
+        if view_class is not None:
+            yield view_class
+
+
+def warm_up():
+    """
+    Performs process-wide warm-up.
+
+    Intended to run in the application server master before workers are
+    forked, so the warmed state is shared copy-on-write by every worker.
+
+    Process:
+    1. Populates the URL resolver (reverse lookups and route matching)
+    2. Resolves lazily imported DRF and simplejwt settings
+    3. Builds the field and relation caches of every model
+    4. Builds the serializer fields of every routed view
+    """
+    started = time.perf_counter()
+
+    resolver = get_resolver()
+    resolver.reverse_dict  # noqa: B018 - populates the resolver caches
+
+    for setting in PRELOADED_API_SETTINGS:
+        getattr(api_settings, setting)
+    for setting in PRELOADED_JWT_SETTINGS:
+        getattr(jwt_settings, setting)
+
+    for model in apps.get_models():
+        model._meta.get_fields()
+
+    serializers = set()
+    for view_class in _iter_views(resolver.url_patterns):
+        serializer_class = getattr(view_class, "serializer_class", None)
+        if serializer_class is not None:
+            serializers.add(serializer_class)
+
+    for serializer_class in serializers:
+        try:
+            serializer_class().fields  # noqa: B018 - builds the field mapping
+        except Exception as e:
+            logger.warning(f"Could not warm up serializer {serializer_class}: {e}")
+
+    # Never carry database connections or pools across a fork
+    close_pools()
+
+    logger.info(
+        f"Warm-up complete: {len(serializers)} serializers in "
+        f"{(time.perf_counter() - started) * 1000:.1f}ms"
+    )
+
+
+def warm_up_worker():
+    """
+    Performs per-worker warm-up after fork.
+
+    Checks that the primary database is reachable so a worker that cannot
+    serve requests fails before it is handed any traffic. Unreachable read
+    replicas only log a warning: the router falls back to the primary until
+    they recover. With connection pooling enabled this also opens the
+    worker's pools.
+    """
+    for connection in connections.all():
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+        except OperationalError as e:
+            if connection.alias == DEFAULT_DB_ALIAS:
+                raise
+            logger.warning(f"Database {connection.alias} is unreachable: {e}")
+        # Hand the connection back (to the pool, if any) until a request needs it
+        connection.close()
+    logger.info("Worker warm-up complete")
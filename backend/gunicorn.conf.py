@@ -0,0 +1,87 @@
+"""
+Gunicorn configuration for serving the StellarCare API in production.
+
+Replaces ``manage.py runserver`` (single process, autoreloading) with a
+pre-forking application server behind nginx.
+
+Features:
+- WSGI (threaded sync workers) or ASGI (uvicorn workers) serving
+- Application preloading in the master process
+- Worker count sized from the CPU count
+- Worker recycling after a bounded number of requests
+- Graceful shutdown
+- Warm-up before any traffic is accepted
+
+Usage:
+    gunicorn -c gunicorn.conf.py
+    SERVER_WORKER_MODE=asgi gunicorn -c gunicorn.conf.py
+
+Environment:
+- SERVER_BIND: Address to bind to (default 0.0.0.0:8000)
+- SERVER_WORKER_MODE: "wsgi" or "asgi" (default wsgi)
+- WEB_CONCURRENCY: Number of workers (default 2 * CPU count + 1)
+- SERVER_THREADS: Threads per WSGI worker (default 4)
+- SERVER_MAX_REQUESTS: Requests before a worker is recycled (default 1000)
+- SERVER_TIMEOUT: Seconds before a silent worker is killed (default 30)
+- SERVER_GRACEFUL_TIMEOUT: Seconds to finish in-flight requests (default 30)
+- DJANGO_SETTINGS_MODULE: api.settings_api for API-only workers (default api.settings)
+"""
+
+import multiprocessing
+from os import environ
+
+######################################################################
+# Application
+######################################################################
+worker_mode = environ.get("SERVER_WORKER_MODE") or "wsgi"
+
+if worker_mode == "asgi":
+    wsgi_app = "api.asgi:application"
+    worker_class = "uvicorn_worker.UvicornWorker"
+else:
+    wsgi_app = "api.wsgi:application"
+    worker_class = "gthread"
+    threads = int(environ.get("SERVER_THREADS") or 4)
+
+# Load Django once in the master; workers share the imported code copy-on-write
+preload_app = True
+
+######################################################################
+# Workers
+######################################################################
+bind = environ.get("SERVER_BIND") or "0.0.0.0:8000"
+workers = int(environ.get("WEB_CONCURRENCY") or multiprocessing.cpu_count() * 2 + 1)
+
+# Recycle workers to bound memory growth; jitter avoids simultaneous restarts
+max_requests = int(environ.get("SERVER_MAX_REQUESTS") or 1000)
+max_requests_jitter = max(1, max_requests // 10)
+
+timeout = int(environ.get("SERVER_TIMEOUT") or 30)
+graceful_timeout = int(environ.get("SERVER_GRACEFUL_TIMEOUT") or 30)
+keepalive = 5
+
+######################################################################
+# Logging
+######################################################################
+accesslog = "-"
+errorlog = "-"
+
+# nginx terminates TLS and sets X-Forwarded-* headers
+forwarded_allow_ips = environ.get("SERVER_FORWARDED_ALLOW_IPS") or "*"
+
+
+######################################################################
+# Hooks
+######################################################################
+def on_starting(server):
+    """Warms up the preloaded application before any socket is bound."""
+    from api.warmup import warm_up
+
+    warm_up()
+
+
+def post_worker_init(worker):
+    """Warms up each worker before it starts accepting connections."""
+    from api.warmup import warm_up_worker
+
+    warm_up_worker()
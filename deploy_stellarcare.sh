@@ -203,6 +203,8 @@ done
 
 # Start regular services
 echo "[INFO] Starting regular services..."
+export SERVER_MODE=production
+export CODE_VERSION="$(git rev-parse HEAD)"
 docker-compose up -d
 
 # Wait for containers to be ready
@@ -16,6 +16,7 @@ import { getServerSession } from 'next-auth'
  * @param {Patient} originalPatient - The original patient data before updates
  * @returns {Promise<Patient>} The updated patient data from the API
  * @throws {Error} If user is not authenticated with message 'You must be logged in to update a patient'
+ * @throws {Error} If the patient was changed by someone else since it was loaded (412)
  * @throws {Error} If the API request fails
  *
  * @example
@@ -85,7 +86,11 @@ export async function updatePatient(
     const response = await api.request.request<Patient>({
       method: 'PUT',
       url: `/api/patients/${patientId}/`,
-      body: updateData
+      headers: { 'If-Match': `"${originalPatient.version}"` },
+      body: updateData,
+      errors: {
+        412: 'This patient was changed by someone else. Reload to see their changes.'
+      }
     })
     return response
   } catch (error) {
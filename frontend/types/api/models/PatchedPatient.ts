@@ -17,6 +17,7 @@ export type PatchedPatient = {
     status?: PatientStatusEnum;
     readonly created_at?: string;
     readonly modified_at?: string;
+    readonly version?: number;
     studies?: Array<number>;
     treatments?: Array<number>;
     insurance?: Array<number>;